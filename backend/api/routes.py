@@ -1,29 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from backend.db.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
+from backend.db import queries
+from backend.db.database import get_async_db, get_db
 from backend.services import auth
-from backend.utils.security import get_password_hash, get_current_user
+from backend.services import audit_grants, imports, summaries
+from backend.services.case_cache import bump_version, case_response
+from backend.services.exports import EXPORT_FORMATS, stream_case_export
+from backend.services.anchoring import enqueue_anchor, unanchored_error
+from backend.services.verification import (
+    MirrorCaseContract,
+    PrefetchedCaseContract,
+    chain_index_to_log_id,
+    chain_read,
+    latest_anchor,
+    latest_anchors,
+    mirror_case_logs,
+    stream_case_verification,
+    verify_log_entry
+)
+from backend.utils import passwords
+from backend.utils.security import get_current_user, get_current_user_async
 from backend.utils.id_generator import generate_case_id, generate_log_id
+from backend.utils import blockchain_async
+from backend.utils.pagination import keyset_page
 
 from backend.db import models
 from datetime import datetime, timezone
-from typing import List
+from typing import List, Optional, Union
 from fastapi import Path
-from sqlalchemy import func
 from web3 import Web3
-import hashlib
+import asyncio
 
 from backend.utils.blockchain import (
-    create_case_on_chain,
-    add_log_to_case,
-    finalize_case_on_chain,
     ensure_blockchain,
-    update_case_status_on_chain,
-    factory_contract,
-    get_case_contract,
-    add_log_version_to_case,
     generate_log_string,
-    generate_log_hash
+    generate_log_hash,
+    generate_final_hash
 )
 
 from backend.db.models import (
@@ -32,18 +48,22 @@ from backend.db.models import (
     ProgressLog,
     ProgressLogHistory,
     CaseStatusChange,
-    CaseAuditAccess
+    ChainAnchor,
+    ArchivedProgressLog,
+    case_tables
 ) 
 
 
 from backend.schemas import (
     RegisterData,
     LoginData,
+    RefreshData,
     UserOut,
     CaseData,
     CaseOut,
     ProgressLogData,
     ProgressLogOut,
+    ProgressLogLiteOut,
     EditProgressLogData,
     ProgressLogHistoryOut,
     CaseSummaryOut,
@@ -51,7 +71,9 @@ from backend.schemas import (
     UpdateCaseStatusData,
     ContractCreate,
     ContractOut,
-    ClientSignContract
+    ClientSignContract,
+    ChainAnchorOut,
+    AuditGrantOut
 )
 
 router = APIRouter()
@@ -61,24 +83,40 @@ router = APIRouter()
 # --------------------
 
 @router.post("/register")
-def register_user(data: RegisterData, db: Session = Depends(get_db)):
-    existing_user = db.query(models.User).filter(models.User.email == data.email).first()
+async def register_user(data: RegisterData, db: AsyncSession = Depends(get_async_db)):
+    existing_user = await db.scalar(select(models.User).where(models.User.email == data.email))
+    await db.commit()  # no connection held while hashing
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User with this email already exists"
         )
 
-    hashed_password = get_password_hash(data.password)
+    # In the password-hashing pool, so a burst of sign-ups does not tie up the threadpool
+    hashed_password = await passwords.password_hasher.hash(data.password)
     user = models.User(email=data.email, password=hashed_password, role=data.role.value)
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Registered by a concurrent request meanwhile
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User with this email already exists"
+        )
     return {"msg": "User created", "user_id": user.id}
 
 @router.post("/login")
-def login_user(data: LoginData, db: Session = Depends(get_db)):
-    return auth.login_user(db, data.email, data.password)
+async def login_user(data: LoginData, db: AsyncSession = Depends(get_async_db)):
+    return await auth.login_user(db, data.email, data.password)
+
+@router.post("/refresh")
+async def refresh_token(data: RefreshData, db: AsyncSession = Depends(get_async_db)):
+    return await auth.refresh_session(db, data.refresh_token)
+
+@router.post("/logout")
+async def logout(data: RefreshData, everywhere: bool = False, db: AsyncSession = Depends(get_async_db)):
+    return await auth.logout_user(db, data.refresh_token, everywhere)
 
 @router.get("/me", response_model=UserOut)
 def get_current_user_info(current_user: User = Depends(get_current_user)):
@@ -104,6 +142,7 @@ def create_case(data: CaseData, current_user: User = Depends(get_current_user),
     )
     db.add(case)
     db.flush()
+    summaries.create_summary(db, case)
 
     # Add contract
     contract = models.CaseContract(
@@ -121,12 +160,17 @@ def create_case(data: CaseData, current_user: User = Depends(get_current_user),
 
 
 @router.get("/my_cases", response_model=list[CaseOut])
-def get_my_cases(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    if current_user.role == "lawyer":
-        cases = db.query(Case).filter(Case.lawyer_id == current_user.id).all()
-    else:
-        cases = db.query(Case).filter(Case.client_id == current_user.id).all()
-    return cases
+async def get_my_cases(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    case_status: Optional[str] = Query(None, alias="status"),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Oldest first, one page at a time; the next page's cursor comes back in X-Next-Cursor
+    query, sort_column, id_column = queries.my_cases(current_user.role, current_user.id, case_status)
+    return await keyset_page(db, query, sort_column, id_column, response, cursor, limit)
 
 @router.post("/contract", response_model=ContractOut)
 def create_contract(data: ContractCreate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
@@ -175,52 +219,70 @@ def get_contract(
 
 
 @router.post("/contract/{case_id}/sign", response_model=ContractOut)
-def sign_contract(case_id: str, data: ClientSignContract, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    ensure_blockchain()
+async def sign_contract(case_id: str, data: ClientSignContract, current_user: User = Depends(get_current_user_async), db: AsyncSession = Depends(get_async_db)):
+    await blockchain_async.ensure_blockchain()
     if current_user.role != "client":
         raise HTTPException(status_code=403, detail="Only clients can sign contracts")
 
-    case = db.query(Case).filter(Case.id == case_id, Case.client_id == current_user.id).first()
+    # The deployment below needs both parties' emails
+    case = await db.scalar(select(Case).options(joinedload(Case.lawyer), joinedload(Case.client)).where(
+        Case.id == case_id, Case.client_id == current_user.id
+    ))
     if not case:
         raise HTTPException(status_code=404, detail="Case not found or unauthorized")
+    lawyer_email, client_email = case.lawyer.email, case.client.email
 
-    contract = db.query(models.CaseContract).filter(models.CaseContract.case_id == case_id).first()
+    contract = await db.scalar(select(models.CaseContract).where(models.CaseContract.case_id == case_id))
     if not contract:
         raise HTTPException(status_code=404, detail="Contract not found")
 
     # Client signs
     contract.client_signed = True
     contract.client_signature = data.client_signature
-    db.commit()
+    await db.run_sync(bump_version, case_id)
+    await db.commit()
 
     # Deploy only when both have signed
     if contract.lawyer_signed and contract.client_signed:
         try:
-            tx_hash, tx_receipt = create_case_on_chain(case.id, case.lawyer.email, case.client.email)
-            case.on_chain_address = factory_contract.functions.getCaseAddress(case.id).call()
+            tx_hash, case_address = await blockchain_async.create_case_on_chain(case.id, lawyer_email, client_email)
+            case.on_chain_address = case_address
             case.on_chain_tx = tx_hash
+            change = CaseStatusChange(
+                case_id=case.id,
+                old_status=case.status,
+                new_status="active",
+                changed_by=current_user.id,
+                changed_at=datetime.now(timezone.utc),
+                reason="Contract signed by both parties"
+            )
+            db.add(change)
+            await db.run_sync(summaries.record_status_change, case, case.status, change.changed_at)
+            await db.run_sync(bump_version, case.id)
             case.status = "active"
-            db.commit()
+            await db.commit()
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             raise HTTPException(status_code=500, detail=f"Blockchain transaction failed: {str(e)}")
 
-    db.refresh(contract)
+    await db.refresh(contract)
     return contract
 
 @router.put("/update_case_status/{case_id}")
-def update_case_status(
+async def update_case_status(
     case_id: str,
     data: UpdateCaseStatusData,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    ensure_blockchain()
-    case = db.query(Case).filter(Case.id == case_id).first()
+    await blockchain_async.ensure_blockchain()
+    case = await db.get(Case, case_id)
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
     if current_user.role != "lawyer" or case.lawyer_id != current_user.id:
         raise HTTPException(status_code=403, detail="Unauthorized")
+    if case.archived_at:
+        raise HTTPException(status_code=409, detail="Case is archived")
 
     # Determine new status
     if data.status == "other":
@@ -228,7 +290,7 @@ def update_case_status(
             raise HTTPException(status_code=400, detail="Custom status required for 'other'")
         new_status = data.custom_status.lower().replace(" ", "_")
     else:
-        new_status = data.status
+        new_status = data.status.value
 
     # --- Blockchain update ---
     from web3 import Web3
@@ -237,24 +299,25 @@ def update_case_status(
 
     if new_status != "closed":
         try:
-            update_case_status_on_chain(case.on_chain_address, status_hash)
+            await blockchain_async.update_case_status_on_chain(case.on_chain_address, status_hash)
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             raise HTTPException(status_code=500, detail=f"Blockchain status update failed: {str(e)}")
     else:
-        # If closing, finalize with full logs (your existing behavior)
-        logs = db.query(ProgressLog).filter(
+        # The final hash must cover logs that are already on-chain
+        error = await db.run_sync(unanchored_error, case.id)
+        if error:
+            raise HTTPException(status_code=409, detail=f"Cannot close case: {error}")
+
+        # If closing, finalize with full logs (your existing behavior), in the
+        # (timestamp, id) order generate_final_hash is defined over
+        logs = (await db.scalars(select(ProgressLog).where(
             ProgressLog.case_id == case.id
-        ).order_by(ProgressLog.timestamp).all()
+        ).order_by(ProgressLog.timestamp, ProgressLog.id))).all()
 
-        concatenated_hashes = ''.join([
-            hashlib.sha256(
-                f"{l.case_id}|{l.id}|{l.description}|{l.time_spent}|{l.timestamp.isoformat()}".encode()
-            ).hexdigest()
-            for l in logs
-        ])
-        final_hash = Web3.keccak(text=concatenated_hashes)
-        finalize_case_on_chain(case.on_chain_address, final_hash)
+        final_hash = generate_final_hash(logs)
+        await blockchain_async.finalize_case_on_chain(case.on_chain_address, final_hash)
+        case.final_hash = final_hash.hex()  # checked again when the case is archived
 
     # --- Log status change in DB ---
     change = CaseStatusChange(
@@ -262,13 +325,16 @@ def update_case_status(
         old_status=case.status,
         new_status=new_status,
         changed_by=current_user.id,
+        changed_at=datetime.now(timezone.utc),
         reason=data.reason.strip() if data.reason and data.reason.strip() != "string" else "Updated by lawyer"
     )
     db.add(change)
+    await db.run_sync(summaries.record_status_change, case, case.status, change.changed_at)
+    await db.run_sync(bump_version, case.id)
 
     # Update case
     case.status = new_status
-    db.commit()
+    await db.commit()
 
     return {"msg": f"Case status updated to '{case.status}'"}
 
@@ -277,12 +343,18 @@ def generate_status_hash(status, changed_by, timestamp):
     return Web3.keccak(text=f"{status}|{changed_by}|{timestamp}")
 
 @router.get("/case_status_history/{case_id}", response_model=List[CaseStatusChangeOut])
-def get_case_status_history(
+async def get_case_status_history(
     case_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    case = db.query(Case).filter(Case.id == case_id).first()
+    case = await db.get(Case, case_id)
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
 
@@ -291,8 +363,11 @@ def get_case_status_history(
        (current_user.role == "client" and case.client_id != current_user.id):
         raise HTTPException(status_code=403, detail="Unauthorized")
 
-    changes = db.query(CaseStatusChange).filter(CaseStatusChange.case_id == case_id).order_by(CaseStatusChange.changed_at.desc()).all()
-    return changes
+    # Newest first, paged like /case_logs
+    query, sort_column, id_column = queries.case_status_history(case_id, case_tables(case), from_date, to_date)
+    async def page():
+        return await keyset_page(db, query, sort_column, id_column, response, cursor, limit, descending=True)
+    return await case_response(request, response, case, current_user.role, List[CaseStatusChangeOut], page)
 
 
 @router.post("/log_progress")
@@ -301,7 +376,6 @@ def log_progress(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    ensure_blockchain()
     if current_user.role != "lawyer":
         raise HTTPException(status_code=403, detail="Only lawyers can log progress")
 
@@ -309,11 +383,16 @@ def log_progress(
     case = db.query(Case).filter(Case.id == data.case_id, Case.lawyer_id == current_user.id).first()
     if not case:
         raise HTTPException(status_code=404, detail="Case not found or unauthorized")
+    if not case.on_chain_address:
+        raise HTTPException(status_code=400, detail="Case not on blockchain")
+    if case.archived_at:
+        raise HTTPException(status_code=409, detail="Case is archived")
 
-    log_id = generate_log_id(db, data.case_id)
+    log_id, sequence = generate_log_id(db, data.case_id)
     log = ProgressLog(
         id=log_id,
         case_id=data.case_id,
+        sequence=sequence,
         lawyer_id=current_user.id,
         description=data.description,
         time_spent=data.time_spent,
@@ -321,37 +400,61 @@ def log_progress(
     )
     db.add(log)
     db.flush()
-    
-    
-    log_hash = generate_log_hash(data.case_id, log_id, data.description, data.time_spent, log.timestamp)
 
-    add_log_to_case(case.on_chain_address, log_hash)
-    
+    # Anchored on-chain by the background worker
+    enqueue_anchor(db, log, kind="add_log")
+    summaries.record_log_added(db, log)
+    bump_version(db, case.id)
+
     db.commit()
     db.refresh(log)
-    
-    summary = db.query(models.CaseSummary).filter(models.CaseSummary.case_id == data.case_id).first()
-    if summary:
-        summary.total_logs += 1
-        summary.total_time_spent += data.time_spent
 
-    else:
-        summary = models.CaseSummary(
-            case_id=data.case_id,
-            summary_text="",
-            total_logs=1,
-            total_time_spent=data.time_spent
-        )
-    db.add(summary)
-    db.commit()
+    return {"msg": "Progress logged (anchoring pending)", "log_id": log.id, "anchor_status": "pending"}
+
+
+@router.post("/import_logs/{case_id}")
+async def import_progress_logs(
+    case_id: str,
+    request: Request,
+    current_user: User = Depends(get_current_user_async)
+):
+    """
+    Import many time entries at once: a JSON array of {description, time_spent, timestamp?}
+    or a CSV with those columns (Content-Type: text/csv). Either every row is imported or none.
+    """
+    if current_user.role != "lawyer":
+        raise HTTPException(status_code=403, detail="Only lawyers can log progress")
 
-    return {"msg": "Progress logged", "log_id": log.id}
+    body = await request.body()
+    # All database work off the event loop: thousands of rows take a moment to parse, hash and insert
+    result = await asyncio.to_thread(
+        imports.import_into_case, case_id, current_user.id, body, request.headers.get("content-type", "")
+    )
+    return {"msg": f"Imported {result['imported']} logs (anchoring pending as one batch)", **result, "anchor_status": "pending"}
 
 
-@router.get("/case_logs/{case_id}", response_model=List[ProgressLogOut])
-def get_case_logs(case_id: str, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+@router.get("/case_logs/{case_id}", response_model=Union[List[ProgressLogOut], List[ProgressLogLiteOut]])
+async def get_case_logs(
+    case_id: str,
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    is_edited: Optional[bool] = None,
+    view: str = Query("full", pattern="^(full|lite)$"),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Logs of a case in (timestamp, sequence) order, at most `limit` per page. Pass the
+    X-Next-Cursor header of a response as `cursor` to get the next page.
+    view=lite leaves out descriptions. Sending the ETag back in If-None-Match
+    gets a 304 while the case is unchanged.
+    """
     # Ensure user is involved in the case
-    case = db.query(Case).filter(Case.id == case_id).first()
+    case = await db.get(Case, case_id)
 
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
@@ -362,8 +465,13 @@ def get_case_logs(case_id: str, current_user: User = Depends(get_current_user),
     if current_user.role == "client" and case.client_id != current_user.id:
         raise HTTPException(status_code=403, detail="Unauthorized: not your case")
 
-    logs = db.query(ProgressLog).filter(ProgressLog.case_id == case_id).all()
-    return [ProgressLogOut.model_validate(log) for log in logs]
+    lite = view == "lite"
+    out = ProgressLogLiteOut if lite else ProgressLogOut
+    query, sort_column, id_column = queries.case_logs(case_id, case_tables(case), from_date, to_date, is_edited, lite)
+
+    async def page():
+        return await keyset_page(db, query, sort_column, id_column, response, cursor, limit, scalars=not lite)
+    return await case_response(request, response, case, current_user.role, List[out], page)
 
 
 @router.put("/edit_log/{log_id}")
@@ -375,57 +483,80 @@ def edit_progress_log(
 ):
     log = db.query(ProgressLog).filter(ProgressLog.id == log_id).first()
     if not log:
+        if db.get(ArchivedProgressLog, log_id):
+            raise HTTPException(status_code=409, detail="Log belongs to an archived case")
         raise HTTPException(status_code=404, detail="Log not found")
     if current_user.role != "lawyer" or log.lawyer_id != current_user.id:
         raise HTTPException(status_code=403, detail="Unauthorized to edit this log")
 
+    case = db.query(Case).filter(Case.id == log.case_id).first()
+    if not case or not case.on_chain_address:
+        raise HTTPException(status_code=400, detail="Case not on blockchain")
+
     # Save old version to history (including old timestamp)
+    new_timestamp = datetime.now(timezone.utc)
     history = ProgressLogHistory(
         log_id=log.id,
         old_description=log.description,
         old_time_spent=log.time_spent,
         old_timestamp=log.timestamp,  # <-- NEW: store original timestamp
-        edited_at=datetime.now(timezone.utc),
+        edited_at=new_timestamp,
         edited_by=current_user.id
     )
     db.add(history)
 
     # Update log in DB (assign new timestamp)
-    new_timestamp = datetime.now(timezone.utc)
     log.description = data.description
     log.time_spent = data.time_spent
     log.timestamp = new_timestamp
     log.is_edited = True
+
+    # --- Blockchain: new version is anchored by the background worker ---
+    enqueue_anchor(db, log, kind="add_log_version")
+    summaries.record_log_edited(db, log, history.old_time_spent, new_timestamp)
+    bump_version(db, case.id)
+
     db.commit()
     db.refresh(log)
 
-    # --- Blockchain: Post updated version ---
-    case = db.query(Case).filter(Case.id == log.case_id).first()
-    if not case or not case.on_chain_address:
-        raise HTTPException(status_code=400, detail="Case not on blockchain")
+    return {"msg": "Log updated (new version anchoring pending)", "log_id": log.id, "anchor_status": "pending"}
 
-    # Compute new log hash using the new timestamp
-    new_log_hash = generate_log_hash(log.case_id, log.id, log.description, log.time_spent, log.timestamp)
 
-    parent_index = int(log.id.split('-')[-1]) - 1
+@router.get("/log_history/{log_id}", response_model=List[ProgressLogHistoryOut])
+async def get_log_history(
+    log_id: str,
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Confirm log exists and user is involved in the case
+    log = await db.get(ProgressLog, log_id) or await db.get(ArchivedProgressLog, log_id)
+    if not log:
+        raise HTTPException(status_code=404, detail="Log not found")
 
-    try:
-        add_log_version_to_case(case.on_chain_address, parent_index, new_log_hash)
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail=f"Blockchain log update failed: {str(e)}")
+    case = await db.get(Case, log.case_id)
+    if not case:
+        raise HTTPException(status_code=404, detail="Case not found")
 
-    return {"msg": "Log updated (new version posted on-chain)", "log_id": log.id}
+    if current_user.role == "lawyer" and case.lawyer_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Unauthorized: not your log")
 
+    if current_user.role == "client" and case.client_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Unauthorized: not your log")
 
-@router.get("/log_history/{log_id}", response_model=List[ProgressLogHistoryOut])
-def get_log_history(
+    # Return the history
+    async def history():
+        return (await db.scalars(queries.log_history(log_id, case_tables(case)))).all()
+    return await case_response(request, response, case, current_user.role, List[ProgressLogHistoryOut], history)
+
+@router.get("/anchor_status/{log_id}", response_model=List[ChainAnchorOut])
+def get_anchor_status(
     log_id: str,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    # Confirm log exists and user is involved in the case
-    log = db.query(ProgressLog).filter(ProgressLog.id == log_id).first()
+    log = db.get(ProgressLog, log_id) or db.get(ArchivedProgressLog, log_id)
     if not log:
         raise HTTPException(status_code=404, detail="Log not found")
 
@@ -439,17 +570,23 @@ def get_log_history(
     if current_user.role == "client" and case.client_id != current_user.id:
         raise HTTPException(status_code=403, detail="Unauthorized: not your log")
 
-    # Return the history
-    history = db.query(ProgressLogHistory).filter(ProgressLogHistory.log_id == log_id).all()
-    return history
+    # One entry per anchored version of the log, oldest first
+    Anchor = case_tables(case).anchor
+    anchors = db.query(Anchor).filter(Anchor.log_id == log_id).order_by(Anchor.id).all()
+    return anchors
 
 @router.get("/case_summary/{case_id}", response_model=CaseSummaryOut)
-def get_case_summary(
+async def get_case_summary(
     case_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    case = db.query(Case).filter(Case.id == case_id).first()
+    # Case, both parties and the summary row in one query
+    case = await db.scalar(select(Case).options(
+        joinedload(Case.lawyer), joinedload(Case.client), joinedload(Case.summary)
+    ).where(Case.id == case_id))
 
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
@@ -459,18 +596,24 @@ def get_case_summary(
     if current_user.role == "client" and case.client_id != current_user.id:
         raise HTTPException(status_code=403, detail="Unauthorized: not your case")
 
-    total_logs = db.query(ProgressLog).filter(ProgressLog.case_id == case_id).count()
-    total_time_spent = db.query(func.sum(ProgressLog.time_spent)).filter(ProgressLog.case_id == case_id).scalar() or 0
-    return CaseSummaryOut(
-        case_id=case.id,
-        title=case.title,
-        status=case.status,
-        created_at=case.created_at.isoformat(),
-        lawyer_email=case.lawyer.email,
-        client_email=case.client.email,
-        total_logs=total_logs,
-        total_time_spent=total_time_spent
-    )
+    # Aggregates are kept current by the writes; no scan of progress_logs here
+    async def build():
+        summary = await db.run_sync(summaries.get_summary, case)
+        return CaseSummaryOut(
+            case_id=case.id,
+            title=case.title,
+            status=case.status,
+            created_at=case.created_at.isoformat(),
+            lawyer_email=case.lawyer.email,
+            client_email=case.client.email,
+            total_logs=summary.total_logs,
+            total_time_spent=summary.total_time_spent,
+            edit_count=summary.edit_count,
+            last_activity_at=summary.last_activity_at,
+            status_since=summary.status_since,
+            status_durations=summaries.status_durations(summary, case.status)
+        )
+    return await case_response(request, response, case, current_user.role, CaseSummaryOut, build, summary=True)
     
 from datetime import timedelta
 
@@ -490,127 +633,205 @@ def grant_audit_access(
     if current_user.id not in [case.lawyer_id, case.client_id]:
         raise HTTPException(status_code=403, detail="Unauthorized to grant access")
 
-    access = CaseAuditAccess(
-        case_id=case_id,
-        auditor_email=auditor_email,
-        granted_by=current_user.id,
-        expires_at=datetime.now(timezone.utc) + timedelta(hours=expiry_hours)
+    # Replaces an earlier grant to the same auditor
+    audit_grants.grant_access(
+        db, case_id, auditor_email, current_user.id, datetime.now(timezone.utc) + timedelta(hours=expiry_hours)
     )
-    db.add(access)
-    db.commit()
     return {"msg": f"Audit access granted to {auditor_email} for {expiry_hours} hours"}
 
+def check_verify_source(source: str):
+    # "chain" reads the node directly, "mirror" reads the chain indexer's local copy
+    if source not in ("chain", "mirror"):
+        raise HTTPException(status_code=400, detail="source must be 'chain' or 'mirror'")
+
+async def prefetch_case_contract(case_address: str, reads: list) -> PrefetchedCaseContract:
+    """Fetch the given chain_read() entries concurrently for verify_log_entry."""
+    reads = sorted({read for read in reads if read})
+    fetch = {"log": blockchain_async.get_case_log, "batch": blockchain_async.get_batch}
+    entries = await asyncio.gather(*(fetch[kind](case_address, index) for kind, index in reads))
+    logs, batches = {}, {}
+    for (kind, index), entry in zip(reads, entries):
+        (logs if kind == "log" else batches)[index] = entry
+    return PrefetchedCaseContract(case_address, logs, batches)
+
 def check_audit_access(case_id: str, current_user: User, db: Session):
-    access = db.query(CaseAuditAccess).filter(
-        CaseAuditAccess.case_id == case_id,
-        CaseAuditAccess.auditor_email == current_user.email,
-        CaseAuditAccess.expires_at > datetime.now(timezone.utc)
-    ).first()
-    if not access:
+    if not audit_grants.has_access(db, case_id, current_user.email):
+        raise HTTPException(status_code=403, detail="No active audit access for this case")
+
+async def check_audit_access_async(case_id: str, current_user: User, db: AsyncSession):
+    if not await db.run_sync(audit_grants.has_access, case_id, current_user.email):
         raise HTTPException(status_code=403, detail="No active audit access for this case")
 
 
+@router.get("/audit/my_grants", response_model=List[AuditGrantOut])
+def my_audit_grants(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    if current_user.role != "auditor":
+        raise HTTPException(status_code=403, detail="Only auditors can access this endpoint")
+    return audit_grants.grants_of(db, current_user.email)
+
+
 @router.get("/audit/verify_log/{case_id}/{log_id}")
-def verify_log(
+async def verify_log(
     case_id: str,
     log_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    source: str = "chain",
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     if current_user.role != "auditor":
         raise HTTPException(status_code=403, detail="Only auditors can access this endpoint")
-    check_audit_access(case_id, current_user, db)
+    check_verify_source(source)
+    await check_audit_access_async(case_id, current_user, db)
     """
     Verify a single log by recomputing its hash and comparing with the on-chain stored hash.
     """
-    # Fetch log from DB
-    log = db.query(ProgressLog).filter(ProgressLog.id == log_id, ProgressLog.case_id == case_id).first()
-    if not log:
-        raise HTTPException(status_code=404, detail="Log not found")
-
-    
-    
-    # Recompute hash using the same logic used during logging
-    recomputed_hash = generate_log_hash(log.case_id, log.id, log.description, log.time_spent, log.timestamp)
-
-    # Fetch on-chain hash
-    case = db.query(Case).filter(Case.id == case_id).first()
+    case = await db.get(Case, case_id)
     if not case or not case.on_chain_address:
         raise HTTPException(status_code=404, detail="Case not found or not on-chain")
 
-    case_contract = get_case_contract(case.on_chain_address)
+    # Fetch log from DB (the archive tables once the case is archived)
+    tables = case_tables(case)
+    log = await db.scalar(select(tables.log).where(tables.log.id == log_id, tables.log.case_id == case_id))
+    if not log:
+        raise HTTPException(status_code=404, detail="Log not found")
+
+    # Recompute the hash and check it against the on-chain entry (or batch root) of its latest version
+    anchor, versions = await db.run_sync(latest_anchor, log.id, tables)
     try:
-        # logs are stored in order, log index = sequence - 1
-        log_index = int(log.id.split('-')[-1]) - 1
-        log_hash_on_chain, _, version, parent_index = case_contract.functions.getLog(log_index).call()
+        if source == "mirror":
+            # The mirror answers from the database, so verify inside the session
+            response_data, parent_index = await db.run_sync(lambda session: verify_log_entry(
+                MirrorCaseContract(session, case.on_chain_address), log, anchor, versions or 1
+            ))
+        else:
+            case_contract = await prefetch_case_contract(case.on_chain_address, [chain_read(log, anchor)])
+            response_data, parent_index = verify_log_entry(case_contract, log, anchor, versions or 1)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch log from blockchain: {str(e)}")
 
-    response_data = {
-    "log_id": log.id,
-    "verified": recomputed_hash == log_hash_on_chain,
-    "on_chain_hash": log_hash_on_chain.hex(),
-    "recomputed_hash": recomputed_hash.hex(),
-    "version": version
-    }
-    
-    if version > 1:
+    if parent_index is not None:
         response_data["parent_log_index"] = parent_index
 
     return response_data
 
 @router.get("/audit/verify_case/{case_id}")
-def verify_case_logs(
+async def verify_case_logs(
     case_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    source: str = "chain",
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     if current_user.role != "auditor":
         raise HTTPException(status_code=403, detail="Only auditors can access this endpoint")
-    check_audit_access(case_id, current_user, db)
+    check_verify_source(source)
+    await check_audit_access_async(case_id, current_user, db)
 
-    case = db.query(Case).filter(Case.id == case_id).first()
+    case = await db.get(Case, case_id)
     if not case or not case.on_chain_address:
         raise HTTPException(status_code=404, detail="Case not found or not on-chain")
 
-    logs = db.query(ProgressLog).filter(ProgressLog.case_id == case_id).order_by(ProgressLog.timestamp).all()
-    case_contract = get_case_contract(case.on_chain_address)
-
-    grouped_results = {}
-    index_to_log_id = {}
-
-    for log in logs:
-        log_index = int(log.id.split('-')[-1]) - 1
-        index_to_log_id[log_index] = log.id  # Map blockchain index → log ID
-
-    for log in logs:
-        recomputed_hash = generate_log_hash(log.case_id, log.id, log.description, log.time_spent, log.timestamp)
-        log_index = int(log.id.split('-')[-1]) - 1
-        log_hash_on_chain, _, version, parent_index = case_contract.functions.getLog(log_index).call()
-
-        log_data = {
-            "log_id": log.id,
-            "verified": recomputed_hash == log_hash_on_chain,
-            "on_chain_hash": log_hash_on_chain.hex(),
-            "recomputed_hash": recomputed_hash.hex(),
-            "version": version
-        }
-
-        if version > 1:
-            parent_log_id = index_to_log_id.get(parent_index)
-            if parent_log_id and parent_log_id in grouped_results:
-                grouped_results[parent_log_id]["edits"].append(log_data)
+    tables = case_tables(case)
+    logs = (await db.scalars(
+        select(tables.log).where(tables.log.case_id == case_id).order_by(tables.log.timestamp, tables.log.sequence)
+    )).all()
+    anchors = await db.run_sync(latest_anchors, case_id, tables=tables)
+    index_to_log_id = await db.run_sync(chain_index_to_log_id, logs, tables)  # Map blockchain index → log ID
+    batch_roots = {}  # each batch root is fetched from the chain once
+
+    def group(case_contract, chain_logs):
+        grouped_results = {}
+        for log in logs:
+            anchor, versions = anchors.get(log.id, (None, 1))
+            log_data, parent_index = verify_log_entry(case_contract, log, anchor, versions, batch_roots, chain_logs)
+            version = log_data["version"]
+
+            if version > 1:
+                parent_log_id = index_to_log_id.get(parent_index)
+                if parent_log_id and parent_log_id in grouped_results:
+                    grouped_results[parent_log_id]["edits"].append(log_data)
+                else:
+                    grouped_results[log.id] = {
+                        "original": None,
+                        "edits": [log_data]
+                    }
             else:
                 grouped_results[log.id] = {
-                    "original": None,
-                    "edits": [log_data]
+                    "original": log_data,
+                    "edits": []
                 }
-        else:
-            grouped_results[log.id] = {
-                "original": log_data,
-                "edits": []
-            }
+        return grouped_results
+
+    if source == "mirror":
+        # The mirror answers from the database, so verify inside the session
+        grouped_results = await db.run_sync(lambda session: group(
+            MirrorCaseContract(session, case.on_chain_address), mirror_case_logs(session, case.on_chain_address)
+        ))
+    else:
+        # Read the whole on-chain logs array in a few paged calls instead of one getLog per log,
+        # and every batch root the logs need, all concurrently
+        batch_reads = [chain_read(log, anchors.get(log.id, (None, 1))[0]) for log in logs]
+        chain_logs, case_contract = await asyncio.gather(
+            blockchain_async.get_case_logs_on_chain(case.on_chain_address) if logs else asyncio.sleep(0, []),
+            prefetch_case_contract(case.on_chain_address, [read for read in batch_reads if read and read[0] == "batch"])
+        )
+        grouped_results = group(case_contract, chain_logs)
 
     grouped_list = list(grouped_results.values())
 
     return {"case_id": case.id, "logs": grouped_list}
+
+
+@router.get("/audit/verify_case/{case_id}/stream")
+def stream_verify_case_logs(
+    case_id: str,
+    source: str = "chain",
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Streaming variant of verify_case for large cases: one NDJSON line per log
+    ({"type": "log", "group_id": ..., ...}) as soon as it is checked, then a
+    {"type": "summary"} line with pass/fail counts and timing.
+    """
+    if current_user.role != "auditor":
+        raise HTTPException(status_code=403, detail="Only auditors can access this endpoint")
+    check_verify_source(source)
+    check_audit_access(case_id, current_user, db)
+
+    case = db.query(Case).filter(Case.id == case_id).first()
+    if not case or not case.on_chain_address:
+        raise HTTPException(status_code=404, detail="Case not found or not on-chain")
+
+    return StreamingResponse(
+        stream_case_verification(case.id, case.on_chain_address, source, case_tables(case)),
+        media_type="application/x-ndjson"
+    )
+
+
+@router.get("/case_export/{case_id}")
+def export_case(
+    case_id: str,
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    gzip: bool = False,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    The whole case as one download: a "case" record, then its logs, their
+    edit history and its status changes. NDJSON has one {"type": ...} object
+    per line; CSV has a record_type column. gzip=true compresses the stream.
+    """
+    case = db.query(Case).filter(Case.id == case_id).first()
+    if not case:
+        raise HTTPException(status_code=404, detail="Case not found")
+    if current_user.role == "auditor":
+        check_audit_access(case_id, current_user, db)
+    elif current_user.id not in [case.lawyer_id, case.client_id]:
+        raise HTTPException(status_code=403, detail="Unauthorized: not your case")
+
+    filename = f"{case.id}.{export_format}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        stream_case_export(case.id, export_format, gzip),
+        media_type="application/gzip" if gzip else EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -0,0 +1,141 @@
+"""
+Write throughput of log_progress under concurrent load, per engine profile.
+
+    python -m backend.db.benchmark                                   # SQLite: basic vs tuned profile
+    python -m backend.db.benchmark --url postgresql://... --profiles basic postgresql
+
+Each profile gets a fresh database (a temporary SQLite file, or the tables
+of --url recreated), one lawyer and one case. --threads workers then call
+the log_progress route with their own session, like concurrent requests,
+while --readers workers keep listing the case's logs. The run reports logs
+written per second and how many requests failed (e.g. "database is locked").
+Do not point --url at a database you need: its tables are dropped.
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from sqlalchemy.orm import sessionmaker
+
+from backend.api.routes import log_progress
+from backend.db.database import Base, make_engine
+from backend.db.models import Case, ProgressLog, User
+from backend.schemas import ProgressLogData
+from backend.utils.pagination import DEFAULT_PAGE_SIZE
+
+
+def _seed(session_factory) -> tuple:
+    db = session_factory()
+    try:
+        lawyer = User(email="bench-lawyer@x", password="-", role="lawyer", is_verified=True)
+        client = User(email="bench-client@x", password="-", role="client", is_verified=True)
+        db.add_all([lawyer, client])
+        db.flush()
+        case = Case(
+            id=f"C-{lawyer.id}-{client.id}-01",
+            title="benchmark",
+            status="active",
+            lawyer_id=lawyer.id,
+            client_id=client.id,
+            on_chain_address="0x" + "00" * 20
+        )
+        db.add(case)
+        db.commit()
+        return lawyer.id, case.id
+    finally:
+        db.close()
+
+
+def run_profile(url: str, profile: str, threads: int, logs_per_thread: int, readers: int = 0) -> dict:
+    engine = make_engine(url, profile)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    lawyer_id, case_id = _seed(session_factory)
+    errors = Counter()
+    start_gate = threading.Barrier(threads + readers)
+    writing = threading.Event()
+    writing.set()
+
+    def worker():
+        start_gate.wait()
+        for i in range(logs_per_thread):
+            db = session_factory()
+            try:
+                # Same shape as a request: read the user, then write the log
+                user = db.get(User, lawyer_id)
+                log_progress(ProgressLogData(case_id=case_id, description=f"bench {i}", time_spent=1), user, db)
+            except Exception as e:
+                db.rollback()
+                errors[str(e).splitlines()[0][:80]] += 1
+            finally:
+                db.close()
+
+    def reader():
+        start_gate.wait()
+        while writing.is_set():
+            db = session_factory()
+            try:
+                # One /case_logs page
+                db.query(ProgressLog).filter(ProgressLog.case_id == case_id).order_by(
+                    ProgressLog.timestamp, ProgressLog.id
+                ).limit(DEFAULT_PAGE_SIZE).all()
+            except Exception as e:
+                errors[f"read: {str(e).splitlines()[0][:74]}"] += 1
+            finally:
+                db.close()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    background = [threading.Thread(target=reader) for _ in range(readers)]
+    for thread in background:
+        thread.start()
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    writing.clear()
+    for thread in background:
+        thread.join()
+    engine.dispose()
+
+    attempted = threads * logs_per_thread
+    written = attempted - sum(count for error, count in errors.items() if not error.startswith("read: "))
+    return {
+        "profile": profile,
+        "written": written,
+        "failed": sum(errors.values()),
+        "seconds": elapsed,
+        "logs_per_second": written / elapsed,
+        "errors": errors
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m backend.db.benchmark")
+    parser.add_argument("--url", help="database to benchmark; defaults to a temporary SQLite file")
+    parser.add_argument("--profiles", nargs="+", default=["basic", "auto"])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--logs", type=int, default=50, help="log_progress calls per thread")
+    parser.add_argument("--readers", type=int, default=4, help="threads reading the case's logs meanwhile")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        for profile in args.profiles:
+            url = args.url or f"sqlite:///{os.path.join(scratch, f'bench-{profile}.db')}"
+            result = run_profile(url, profile, args.threads, args.logs, args.readers)
+            print(
+                f"{'✅' if not result['failed'] else '⚠️'} {profile:<10} "
+                f"{result['written']:>6} written  {result['failed']:>6} failed  "
+                f"{result['seconds']:7.2f}s  {result['logs_per_second']:8.1f} logs/s"
+            )
+            for error, count in result["errors"].most_common(3):
+                print(f"    {count} x {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,134 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./test.db")
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+# "auto" picks the profile matching DATABASE_URL; "basic" is a plain engine with no tuning
+DB_PROFILE = os.getenv("DB_PROFILE", "auto")
+
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "30000"))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+SQLITE_MMAP_SIZE_MB = int(os.getenv("SQLITE_MMAP_SIZE_MB", "256"))
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+DB_POOL_RECYCLE_SECONDS = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "15000"))
+DB_LOCK_TIMEOUT_MS = int(os.getenv("DB_LOCK_TIMEOUT_MS", "5000"))
+
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def _profile(url, profile):
+    backend = make_url(url).get_backend_name()
+    if profile == "auto":
+        return backend if backend in ("sqlite", "postgresql") else "basic"
+    if profile not in ("sqlite", "postgresql", "basic"):
+        raise ValueError(f"Unknown DB_PROFILE '{profile}'")
+    return profile
+
+
+def _pool_options():
+    return {"pool_size": DB_POOL_SIZE, "max_overflow": DB_MAX_OVERFLOW, "pool_timeout": DB_POOL_TIMEOUT_SECONDS}
+
+
+def _set_sqlite_pragmas(engine, url):
+    """
+    File-backed SQLite tuned for concurrent requests: WAL lets readers run
+    alongside the writer (and the writer commit while they read), and
+    busy_timeout makes writers queue for the write lock instead of failing
+    with "database is locked".
+    """
+    in_memory = make_url(url).database in (None, "", ":memory:")
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if not in_memory:
+            cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")  # durable at checkpoints; safe with WAL
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE_MB * 1024 * 1024}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+
+def make_engine(url: str = DATABASE_URL, profile: str = DB_PROFILE):
+    """Engine for url with the given profile: auto, sqlite, postgresql or basic."""
+    profile = _profile(url, profile)
+    if profile == "sqlite":
+        engine = create_engine(url, connect_args={"check_same_thread": False}, **_pool_options())
+        _set_sqlite_pragmas(engine, url)
+        return engine
+    if profile == "postgresql":
+        # Pooled; statements and lock waits are bounded so a stuck query cannot hold a connection
+        return create_engine(
+            url,
+            pool_recycle=DB_POOL_RECYCLE_SECONDS,
+            pool_pre_ping=True,
+            connect_args={
+                "options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS} -c lock_timeout={DB_LOCK_TIMEOUT_MS}"
+            },
+            **_pool_options()
+        )
+    connect_args = {"check_same_thread": False} if make_url(url).get_backend_name() == "sqlite" else {}
+    return create_engine(url, connect_args=connect_args)
+
+
+def async_database_url(url: str = DATABASE_URL) -> str:
+    """The same database through its asyncio driver (aiosqlite / asyncpg)."""
+    url = make_url(url)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver for '{url.get_backend_name()}'; set ASYNC_DATABASE_URL")
+    return url.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def make_async_engine(url: str, profile: str = DB_PROFILE):
+    """Async counterpart of make_engine, with the same profiles."""
+    profile = _profile(url, profile)
+    if profile == "sqlite":
+        engine = create_async_engine(url, **_pool_options())
+        _set_sqlite_pragmas(engine.sync_engine, url)
+        return engine
+    if profile == "postgresql":
+        return create_async_engine(
+            url,
+            pool_recycle=DB_POOL_RECYCLE_SECONDS,
+            pool_pre_ping=True,
+            connect_args={"server_settings": {
+                "statement_timeout": str(DB_STATEMENT_TIMEOUT_MS),
+                "lock_timeout": str(DB_LOCK_TIMEOUT_MS)
+            }},
+            **_pool_options()
+        )
+    return create_async_engine(url)
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or async_database_url(DATABASE_URL)
+
+engine = make_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Read routes await the database on the event loop instead of holding a threadpool thread.
+# Nothing may lazy-load in an async session, so objects stay loaded after commit.
+async_engine = make_async_engine(ASYNC_DATABASE_URL)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
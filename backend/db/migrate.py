@@ -0,0 +1,136 @@
+"""
+Schema migrations (Alembic, scripts in backend/migrations).
+
+    python -m backend.db.migrate upgrade              # apply pending migrations
+    python -m backend.db.migrate revision -m "..."    # autogenerate a migration from models.py
+    python -m backend.db.migrate current
+    python -m backend.db.migrate explain              # check the hot queries use indexes
+"""
+import argparse
+import os
+import sys
+from datetime import datetime
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect, text
+
+from backend.db import queries
+from backend.db.database import engine
+from backend.utils.pagination import keyset_statement
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_REVISION = "0001"
+RUN_MIGRATIONS_ON_STARTUP = os.getenv("RUN_MIGRATIONS_ON_STARTUP", "true").lower() == "true"
+
+
+def alembic_config() -> Config:
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    return config
+
+
+def _next_revision_id() -> str:
+    versions = os.path.join(BACKEND_DIR, "migrations", "versions")
+    existing = [name for name in os.listdir(versions) if name[:4].isdigit()]
+    return f"{len(existing) + 1:04d}"
+
+
+def upgrade_database(configure_logger: bool = True):
+    """
+    Bring the database to the latest revision. A database created by the old
+    create_all() startup has tables but no alembic_version; it is stamped
+    with the baseline first so only the later migrations run.
+    """
+    config = alembic_config()
+    # Leave the server's logging setup alone when called from startup
+    config.attributes["configure_logger"] = configure_logger
+    tables = inspect(engine).get_table_names()
+    if "users" in tables and "alembic_version" not in tables:
+        print("⚠️ Existing schema without migration history; stamping baseline")
+        command.stamp(config, BASELINE_REVISION)
+    command.upgrade(config, "head")
+
+
+def hot_queries() -> dict:
+    """
+    The statements of the hot routes, built by the same functions the routes
+    call, first page and a later one (keyset cursor), with sample values.
+    """
+    some_time = datetime(2026, 1, 1)
+    case_logs = queries.case_logs("C-1-2-01")
+    status_history = queries.case_status_history("C-1-2-01")
+    return {
+        "case_logs": keyset_statement(*case_logs),
+        "case_logs (later page)": keyset_statement(*case_logs, after=(some_time, 1)),
+        "case_logs (lite)": keyset_statement(*queries.case_logs("C-1-2-01", lite=True)),
+        "audit my_grants": queries.auditor_grants("a@x", some_time),
+        "case_status_history": keyset_statement(*status_history, descending=True),
+        "case_status_history (later page)": keyset_statement(*status_history, after=(some_time, 10), descending=True),
+        "my_cases (lawyer)": keyset_statement(*queries.my_cases("lawyer", 1)),
+        "my_cases (lawyer, later page)": keyset_statement(*queries.my_cases("lawyer", 1), after=(some_time, "C-1-2-01")),
+        "my_cases (client)": keyset_statement(*queries.my_cases("client", 2)),
+        "log_history": queries.log_history("L-C-1-2-01-01"),
+    }
+
+
+def _plan(connection, statement) -> str:
+    sql = str(statement.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True}))
+    if connection.dialect.name == "sqlite":
+        return "\n".join(row[-1] for row in connection.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+    return "\n".join(row[0] for row in connection.execute(text(f"EXPLAIN {sql}")))
+
+
+def _uses_index(dialect: str, plan: str) -> bool:
+    if dialect == "sqlite":
+        # Every table access must be an index SEARCH, with no full SCAN and no sort
+        return all(line.startswith("SEARCH") for line in plan.splitlines())
+    return "Seq Scan" not in plan and "Sort" not in plan.split("Index")[0]
+
+
+def explain_hot_queries() -> bool:
+    """Print the plan of every hot query; False if any of them scans a table."""
+    ok = True
+    with engine.connect() as connection:
+        if connection.dialect.name == "postgresql":
+            # Tiny dev tables are cheaper to scan; ask for the plan the index allows
+            connection.execute(text("SET enable_seqscan = off"))
+        for name, statement in hot_queries().items():
+            plan = _plan(connection, statement)
+            indexed = _uses_index(connection.dialect.name, plan)
+            ok = ok and indexed
+            print(f"{'✅' if indexed else '⚠️'} {name}")
+            for line in plan.splitlines():
+                print(f"    {line}")
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m backend.db.migrate")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("upgrade")
+    sub.add_parser("current")
+    downgrade = sub.add_parser("downgrade")
+    downgrade.add_argument("revision")
+    revision = sub.add_parser("revision")
+    revision.add_argument("-m", "--message", required=True)
+    sub.add_parser("explain")
+    args = parser.parse_args(argv)
+
+    config = alembic_config()
+    if args.command == "upgrade":
+        upgrade_database()
+    elif args.command == "current":
+        command.current(config, verbose=True)
+    elif args.command == "downgrade":
+        command.downgrade(config, args.revision)
+    elif args.command == "revision":
+        command.revision(config, message=args.message, autogenerate=True, rev_id=_next_revision_id())
+    elif args.command == "explain":
+        upgrade_database()
+        sys.exit(0 if explain_hot_queries() else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, Index
+from sqlalchemy.orm import backref, relationship
+from typing import NamedTuple
 from backend.db.database import Base
 from sqlalchemy import DateTime
 from datetime import datetime, timezone
@@ -19,8 +20,27 @@ class User(Base):
     cases_as_client = relationship("Case", back_populates="client", foreign_keys='Case.client_id')
 
 
+class AuthSession(Base):
+    """A signed-in session behind a refresh token (see backend.services.sessions)."""
+    __tablename__ = "auth_sessions"
+
+    id = Column(String, primary_key=True)  # first part of the refresh token
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    token_hash = Column(String)  # sha256 of the current refresh token secret
+    previous_token_hash = Column(String, nullable=True)  # the secret it was rotated from, to spot reuse
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    rotated_at = Column(DateTime, nullable=True)
+    expires_at = Column(DateTime)  # moves forward on each refresh
+    revoked_at = Column(DateTime, nullable=True)
+
+
 class Case(Base):
     __tablename__ = 'cases'
+    __table_args__ = (
+        Index("ix_cases_lawyer_client", "lawyer_id", "client_id"),  # case numbering
+        Index("ix_cases_lawyer_created", "lawyer_id", "created_at", "id"),  # my_cases (lawyer), in page order
+        Index("ix_cases_client_created", "client_id", "created_at", "id"),  # my_cases (client), in page order
+    )
 
     id = Column(String, primary_key=True, index=True)
     title = Column(String)
@@ -28,6 +48,9 @@ class Case(Base):
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))  # 👈 Add this line
     on_chain_address = Column(String, nullable=True)  # store case contract address
     on_chain_tx = Column(String, nullable=True)
+    final_hash = Column(String, nullable=True)  # hex; recorded on-chain when the case is closed
+    archived_at = Column(DateTime, nullable=True)  # rows moved to the archived_* tables (see case_tables)
+    version = Column(Integer, nullable=False, default=0, server_default="0")  # bumped by each change; ETags of the read routes
     
     lawyer_id = Column(Integer, ForeignKey("users.id"))
     client_id = Column(Integer, ForeignKey("users.id"))
@@ -59,9 +82,13 @@ class CaseContract(Base):
 
 class ProgressLog(Base):
     __tablename__ = 'progress_logs'
+    __table_args__ = (
+        Index("ix_progress_logs_case_timestamp_sequence", "case_id", "timestamp", "sequence"),  # case_logs, in page order
+    )
 
     id = Column(String, primary_key=True, index=True)
     case_id = Column(String, ForeignKey("cases.id"))
+    sequence = Column(Integer, nullable=True)  # per-case number from id_sequences; the numeric suffix of id
     lawyer_id = Column(Integer, ForeignKey("users.id"))
     description = Column(String)
     time_spent = Column(Integer)  # minutes
@@ -76,7 +103,7 @@ class ProgressLogHistory(Base):
     __tablename__ = 'progress_log_history'
 
     id = Column(Integer, primary_key=True, index=True)
-    log_id = Column(String, ForeignKey("progress_logs.id"))
+    log_id = Column(String, ForeignKey("progress_logs.id"), index=True)
     old_description = Column(String)
     old_time_spent = Column(Integer)
     edited_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
@@ -93,11 +120,18 @@ class CaseSummary(Base):
     summary_text = Column(String)
     total_logs = Column(Integer, default=0)
     total_time_spent = Column(Integer, default=0)
+    edit_count = Column(Integer, default=0, server_default="0")
+    last_activity_at = Column(DateTime, nullable=True)
+    status_since = Column(DateTime, nullable=True)  # when the case entered its current status
+    status_durations = Column(String, nullable=True)  # JSON {status: seconds} of the statuses it has left
 
-    case = relationship("Case", backref="summary")
+    case = relationship("Case", backref=backref("summary", uselist=False))
 
 class CaseStatusChange(Base):
     __tablename__ = "case_status_changes"
+    __table_args__ = (
+        Index("ix_case_status_changes_case_changed_at_id", "case_id", "changed_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     case_id = Column(String, ForeignKey("cases.id"))
@@ -113,6 +147,11 @@ class CaseStatusChange(Base):
 
 class CaseAuditAccess(Base):
     __tablename__ = "case_audit_access"
+    __table_args__ = (
+        Index("uq_case_audit_access_case_auditor", "case_id", "auditor_email", unique=True),  # one grant each
+        Index("ix_case_audit_access_expires_at", "expires_at"),  # the sweeper
+        Index("ix_case_audit_access_auditor_expires_at", "auditor_email", "expires_at"),  # /audit/my_grants
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     case_id = Column(String, ForeignKey("cases.id"))
@@ -120,3 +159,188 @@ class CaseAuditAccess(Base):
     granted_by = Column(Integer, ForeignKey("users.id"))
     granted_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     expires_at = Column(DateTime, nullable=True)  # optional expiry
+
+
+class ChainAnchor(Base):
+    __tablename__ = "chain_anchors"
+
+    id = Column(Integer, primary_key=True, index=True)
+    case_id = Column(String, ForeignKey("cases.id"), index=True)
+    log_id = Column(String, ForeignKey("progress_logs.id"), index=True)
+    kind = Column(String)  # "add_log" or "add_log_version"
+    mode = Column(String, default="direct")  # "direct" (own tx) or "batch" (Merkle batch)
+    log_hash = Column(String)  # hex, computed when the log row is written
+    status = Column(String, default="pending", index=True)  # pending / submitted / confirmed / failed
+    attempts = Column(Integer, default=0)
+    last_error = Column(String, nullable=True)
+    next_attempt_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    chain_index = Column(Integer, nullable=True)  # position in CaseContract.logs once confirmed
+    batch_id = Column(Integer, ForeignKey("merkle_batches.id"), nullable=True, index=True)
+    leaf_index = Column(Integer, nullable=True)
+    proof = Column(String, nullable=True)  # JSON list of hex sibling hashes
+    tx_hash = Column(String, nullable=True)
+    replaced_tx_hashes = Column(String, nullable=True)  # comma-separated earlier broadcasts at the same nonce
+    block_number = Column(Integer, nullable=True)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    submitted_at = Column(DateTime, nullable=True)
+    confirmed_at = Column(DateTime, nullable=True)
+
+    log = relationship("ProgressLog")
+    batch = relationship("MerkleBatch", back_populates="anchors")
+
+
+class MerkleBatch(Base):
+    __tablename__ = "merkle_batches"
+
+    id = Column(Integer, primary_key=True, index=True)
+    case_id = Column(String, ForeignKey("cases.id"), index=True)
+    root = Column(String)  # hex
+    size = Column(Integer)
+    status = Column(String, default="pending", index=True)  # pending / submitted / confirmed / failed
+    attempts = Column(Integer, default=0)
+    last_error = Column(String, nullable=True)
+    next_attempt_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    batch_index = Column(Integer, nullable=True)  # position in CaseContract.batches once confirmed
+    tx_hash = Column(String, nullable=True)
+    replaced_tx_hashes = Column(String, nullable=True)  # comma-separated earlier broadcasts at the same nonce
+    block_number = Column(Integer, nullable=True)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    submitted_at = Column(DateTime, nullable=True)
+    confirmed_at = Column(DateTime, nullable=True)
+
+    anchors = relationship("ChainAnchor", back_populates="batch")
+
+
+class IdSequence(Base):
+    __tablename__ = "id_sequences"
+
+    name = Column(String, primary_key=True)  # "case:<lawyer_id>-<client_id>" or "log:<case_id>"
+    value = Column(Integer, nullable=False)  # last number handed out
+
+
+class ChainCursor(Base):
+    __tablename__ = "chain_cursors"
+
+    name = Column(String, primary_key=True)
+    block_number = Column(Integer)  # last block fully scanned
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+
+class IndexedCase(Base):
+    __tablename__ = "indexed_cases"
+
+    address = Column(String, primary_key=True)
+    case_id = Column(String, index=True)
+    deployed_block = Column(Integer)
+
+
+class ChainEvent(Base):
+    """Local mirror of CaseContract events, written by the chain indexer."""
+    __tablename__ = "chain_events"
+    __table_args__ = (
+        Index("ix_chain_events_address_event_entry", "case_address", "event", "entry_index"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    case_address = Column(String)
+    event = Column(String)  # LogAdded / StatusUpdated / CaseClosed / BatchAnchored
+    entry_index = Column(Integer, nullable=True)  # position in logs / statusHistory / batches
+    block_number = Column(Integer, index=True)
+    block_hash = Column(String)
+    tx_hash = Column(String)
+    log_index = Column(Integer)
+    event_hash = Column(String)  # logHash / statusHash / finalHash / batch root (hex)
+    version = Column(Integer, nullable=True)
+    parent_index = Column(Integer, nullable=True)
+    batch_size = Column(Integer, nullable=True)
+    chain_timestamp = Column(Integer)
+
+
+# Closed cases are moved out of the hot tables by `python -m backend.services.archive`.
+# The archived_* tables have the same columns (and row IDs) as their hot counterparts,
+# so a row of either kind reads the same; pick the tables of a case with case_tables().
+
+class ArchivedProgressLog(Base):
+    __tablename__ = "archived_progress_logs"
+    __table_args__ = (
+        Index("ix_archived_progress_logs_case_timestamp_sequence", "case_id", "timestamp", "sequence"),
+    )
+
+    id = Column(String, primary_key=True)
+    case_id = Column(String, ForeignKey("cases.id"))
+    sequence = Column(Integer, nullable=True)
+    lawyer_id = Column(Integer, ForeignKey("users.id"))
+    description = Column(String)
+    time_spent = Column(Integer)
+    timestamp = Column(DateTime)
+    is_edited = Column(Boolean, default=False)
+
+
+class ArchivedProgressLogHistory(Base):
+    __tablename__ = "archived_progress_log_history"
+
+    id = Column(Integer, primary_key=True)
+    log_id = Column(String, ForeignKey("archived_progress_logs.id"), index=True)
+    old_description = Column(String)
+    old_time_spent = Column(Integer)
+    edited_at = Column(DateTime)
+    edited_by = Column(Integer, ForeignKey("users.id"))
+    old_timestamp = Column(DateTime, nullable=False)
+
+
+class ArchivedCaseStatusChange(Base):
+    __tablename__ = "archived_case_status_changes"
+    __table_args__ = (
+        Index("ix_archived_case_status_changes_case_changed_at_id", "case_id", "changed_at", "id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    case_id = Column(String, ForeignKey("cases.id"))
+    old_status = Column(String)
+    new_status = Column(String)
+    changed_by = Column(Integer, ForeignKey("users.id"))
+    changed_at = Column(DateTime)
+    reason = Column(String, nullable=True)
+
+
+class ArchivedChainAnchor(Base):
+    __tablename__ = "archived_chain_anchors"
+
+    id = Column(Integer, primary_key=True)
+    case_id = Column(String, ForeignKey("cases.id"), index=True)
+    log_id = Column(String, ForeignKey("archived_progress_logs.id"), index=True)
+    kind = Column(String)
+    mode = Column(String)
+    log_hash = Column(String)
+    status = Column(String)
+    attempts = Column(Integer)
+    last_error = Column(String, nullable=True)
+    next_attempt_at = Column(DateTime)
+    chain_index = Column(Integer, nullable=True)
+    batch_id = Column(Integer, ForeignKey("merkle_batches.id"), nullable=True)
+    leaf_index = Column(Integer, nullable=True)
+    proof = Column(String, nullable=True)
+    tx_hash = Column(String, nullable=True)
+    replaced_tx_hashes = Column(String, nullable=True)
+    block_number = Column(Integer, nullable=True)
+    created_at = Column(DateTime)
+    submitted_at = Column(DateTime, nullable=True)
+    confirmed_at = Column(DateTime, nullable=True)
+
+    batch = relationship("MerkleBatch")
+
+
+class CaseTables(NamedTuple):
+    log: type
+    history: type
+    status_change: type
+    anchor: type
+
+
+HOT_TABLES = CaseTables(ProgressLog, ProgressLogHistory, CaseStatusChange, ChainAnchor)
+ARCHIVE_TABLES = CaseTables(ArchivedProgressLog, ArchivedProgressLogHistory, ArchivedCaseStatusChange, ArchivedChainAnchor)
+
+
+def case_tables(case: Case) -> CaseTables:
+    """Where the logs, edit history, status changes and anchors of a case live."""
+    return ARCHIVE_TABLES if case.archived_at is not None else HOT_TABLES
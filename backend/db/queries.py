@@ -0,0 +1,68 @@
+"""
+The statements behind the hot read routes. The routes run them and
+`python -m backend.db.migrate explain` checks their plans, so an index is
+only ever judged against the SQL that is actually sent.
+
+Paged reads return (statement, sort column, id column) for keyset_page().
+"""
+from datetime import datetime
+
+from sqlalchemy import select
+
+from backend.db.models import HOT_TABLES, Case, CaseAuditAccess, CaseTables
+
+
+def my_cases(role: str, user_id: int, case_status: str = None):
+    """Cases of a lawyer or client, oldest first."""
+    party = Case.lawyer_id if role == "lawyer" else Case.client_id
+    statement = select(Case).where(party == user_id)
+    if case_status:
+        statement = statement.where(Case.status == case_status)
+    return statement, Case.created_at, Case.id
+
+
+def case_logs(case_id: str, tables: CaseTables = HOT_TABLES, from_date: datetime = None, to_date: datetime = None,
+              is_edited: bool = None, lite: bool = False):
+    """
+    Logs of a case in (timestamp, sequence) order; lite leaves out the
+    descriptions. Ties are broken on sequence, not id: imported logs often
+    share a timestamp, and IDs compare as strings ("...-100" < "...-99").
+    """
+    Log = tables.log
+    if lite:
+        statement = select(Log.id, Log.case_id, Log.sequence, Log.time_spent, Log.timestamp, Log.is_edited)
+    else:
+        statement = select(Log)
+    statement = statement.where(Log.case_id == case_id)
+    if from_date:
+        statement = statement.where(Log.timestamp >= from_date)
+    if to_date:
+        statement = statement.where(Log.timestamp < to_date)
+    if is_edited is not None:
+        statement = statement.where(Log.is_edited == is_edited)
+    return statement, Log.timestamp, Log.sequence
+
+
+def case_status_history(case_id: str, tables: CaseTables = HOT_TABLES, from_date: datetime = None,
+                        to_date: datetime = None):
+    """Status changes of a case; paged newest first."""
+    StatusChange = tables.status_change
+    statement = select(StatusChange).where(StatusChange.case_id == case_id)
+    if from_date:
+        statement = statement.where(StatusChange.changed_at >= from_date)
+    if to_date:
+        statement = statement.where(StatusChange.changed_at < to_date)
+    return statement, StatusChange.changed_at, StatusChange.id
+
+
+def log_history(log_id: str, tables: CaseTables = HOT_TABLES):
+    History = tables.history
+    return select(History).where(History.log_id == log_id)
+
+
+def auditor_grants(auditor_email: str, now: datetime):
+    """The auditor's active grants, soonest expiry first."""
+    return select(CaseAuditAccess).where(
+        CaseAuditAccess.auditor_email == auditor_email,
+        CaseAuditAccess.expires_at > now
+    ).order_by(CaseAuditAccess.expires_at)
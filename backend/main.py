@@ -1,10 +1,17 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from backend.api import routes
-from backend.db.database import engine, Base
+from backend.db.migrate import RUN_MIGRATIONS_ON_STARTUP, upgrade_database
+from backend.services.anchoring import anchor_worker, ANCHOR_WORKER_ENABLED
+from backend.services.audit_grants import audit_grant_sweeper, load_index, AUDIT_GRANT_SWEEPER_ENABLED
+from backend.services.indexer import chain_indexer, INDEXER_ENABLED
+from backend.utils.passwords import password_hasher
+from backend.utils.query_stats import QUERY_COUNT_HEADER, QUERY_TIME_HEADER, QueryStatsMiddleware
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+# Create / upgrade tables (backend/migrations); with RUN_MIGRATIONS_ON_STARTUP=false run
+# `python -m backend.db.migrate upgrade` as a deploy step instead
+if RUN_MIGRATIONS_ON_STARTUP:
+    upgrade_database(configure_logger=False)
 
 app = FastAPI()
 
@@ -15,9 +22,29 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", QUERY_COUNT_HEADER, QUERY_TIME_HEADER],  # paging cursor, case versions, SQL stats
 )
+app.add_middleware(QueryStatsMiddleware)
 
 
 # Include API routes
 app.include_router(routes.router)
 
+
+@app.on_event("startup")
+def start_background_workers():
+    if ANCHOR_WORKER_ENABLED:
+        anchor_worker.start()
+    if INDEXER_ENABLED:
+        chain_indexer.start()
+    load_index()  # audit access checks are served from memory
+    if AUDIT_GRANT_SWEEPER_ENABLED:
+        audit_grant_sweeper.start()
+
+
+@app.on_event("shutdown")
+def stop_background_workers():
+    anchor_worker.stop()
+    chain_indexer.stop()
+    audit_grant_sweeper.stop()
+    password_hasher.shutdown()
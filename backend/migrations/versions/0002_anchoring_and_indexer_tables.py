@@ -0,0 +1,176 @@
+"""anchoring and indexer tables
+
+The tables added on top of the baseline before migrations existed: the
+anchoring outbox (chain_anchors, merkle_batches), the ID counters
+(id_sequences, progress_logs.sequence) and the chain indexer's mirror
+(chain_cursors, chain_events, indexed_cases).
+
+Databases created by create_all() are stamped at 0001 whatever version of
+the models made them, so they may have none, some or older versions of these
+tables. Missing tables, columns and indexes are created; what exists is
+left alone. progress_logs.sequence is backfilled from the numeric suffix of
+the log IDs.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 12:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, columns, indexes as (name, columns)), in foreign key order
+TABLES = [
+    ('chain_cursors', [
+        sa.Column('name', sa.String(), nullable=False, primary_key=True),
+        sa.Column('block_number', sa.Integer(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    ], []),
+    ('chain_events', [
+        sa.Column('id', sa.Integer(), nullable=False, primary_key=True),
+        sa.Column('case_address', sa.String(), nullable=True),
+        sa.Column('event', sa.String(), nullable=True),
+        sa.Column('entry_index', sa.Integer(), nullable=True),
+        sa.Column('block_number', sa.Integer(), nullable=True),
+        sa.Column('block_hash', sa.String(), nullable=True),
+        sa.Column('tx_hash', sa.String(), nullable=True),
+        sa.Column('log_index', sa.Integer(), nullable=True),
+        sa.Column('event_hash', sa.String(), nullable=True),
+        sa.Column('version', sa.Integer(), nullable=True),
+        sa.Column('parent_index', sa.Integer(), nullable=True),
+        sa.Column('batch_size', sa.Integer(), nullable=True),
+        sa.Column('chain_timestamp', sa.Integer(), nullable=True),
+    ], [
+        ('ix_chain_events_address_event_entry', ['case_address', 'event', 'entry_index']),
+        ('ix_chain_events_block_number', ['block_number']),
+        ('ix_chain_events_id', ['id']),
+    ]),
+    ('id_sequences', [
+        sa.Column('name', sa.String(), nullable=False, primary_key=True),
+        sa.Column('value', sa.Integer(), nullable=False),
+    ], []),
+    ('indexed_cases', [
+        sa.Column('address', sa.String(), nullable=False, primary_key=True),
+        sa.Column('case_id', sa.String(), nullable=True),
+        sa.Column('deployed_block', sa.Integer(), nullable=True),
+    ], [
+        ('ix_indexed_cases_case_id', ['case_id']),
+    ]),
+    ('merkle_batches', [
+        sa.Column('id', sa.Integer(), nullable=False, primary_key=True),
+        sa.Column('case_id', sa.String(), sa.ForeignKey('cases.id'), nullable=True),
+        sa.Column('root', sa.String(), nullable=True),
+        sa.Column('size', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=True),
+        sa.Column('last_error', sa.String(), nullable=True),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=True),
+        sa.Column('batch_index', sa.Integer(), nullable=True),
+        sa.Column('tx_hash', sa.String(), nullable=True),
+        sa.Column('replaced_tx_hashes', sa.String(), nullable=True),
+        sa.Column('block_number', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('submitted_at', sa.DateTime(), nullable=True),
+        sa.Column('confirmed_at', sa.DateTime(), nullable=True),
+    ], [
+        ('ix_merkle_batches_case_id', ['case_id']),
+        ('ix_merkle_batches_id', ['id']),
+        ('ix_merkle_batches_status', ['status']),
+    ]),
+    ('chain_anchors', [
+        sa.Column('id', sa.Integer(), nullable=False, primary_key=True),
+        sa.Column('case_id', sa.String(), sa.ForeignKey('cases.id'), nullable=True),
+        sa.Column('log_id', sa.String(), sa.ForeignKey('progress_logs.id'), nullable=True),
+        sa.Column('kind', sa.String(), nullable=True),
+        sa.Column('mode', sa.String(), nullable=True),
+        sa.Column('log_hash', sa.String(), nullable=True),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=True),
+        sa.Column('last_error', sa.String(), nullable=True),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=True),
+        sa.Column('chain_index', sa.Integer(), nullable=True),
+        sa.Column('batch_id', sa.Integer(), sa.ForeignKey('merkle_batches.id'), nullable=True),
+        sa.Column('leaf_index', sa.Integer(), nullable=True),
+        sa.Column('proof', sa.String(), nullable=True),
+        sa.Column('tx_hash', sa.String(), nullable=True),
+        sa.Column('replaced_tx_hashes', sa.String(), nullable=True),
+        sa.Column('block_number', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('submitted_at', sa.DateTime(), nullable=True),
+        sa.Column('confirmed_at', sa.DateTime(), nullable=True),
+    ], [
+        ('ix_chain_anchors_batch_id', ['batch_id']),
+        ('ix_chain_anchors_case_id', ['case_id']),
+        ('ix_chain_anchors_id', ['id']),
+        ('ix_chain_anchors_log_id', ['log_id']),
+        ('ix_chain_anchors_status', ['status']),
+    ]),
+]
+
+
+def _backfill_log_sequences(bind):
+    logs = sa.table('progress_logs', sa.column('id', sa.String()), sa.column('sequence', sa.Integer()))
+    ids = bind.execute(sa.select(logs.c.id).where(logs.c.sequence.is_(None))).scalars().all()
+    rows = []
+    for log_id in ids:
+        suffix = log_id.rsplit('-', 1)[-1]
+        if suffix.isdigit():
+            rows.append({'log_id': log_id, 'sequence': int(suffix)})
+    if rows:
+        bind.execute(
+            logs.update().where(logs.c.id == sa.bindparam('log_id')).values(sequence=sa.bindparam('sequence')),
+            rows
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    tables = set(inspector.get_table_names())
+    for name, columns, indexes in TABLES:
+        missing_columns, existing_indexes = [], set()
+        if name not in tables:
+            op.create_table(name, *columns)
+        else:
+            existing_columns = {column['name'] for column in inspector.get_columns(name)}
+            missing_columns = [column for column in columns if column.name not in existing_columns]
+            existing_indexes = {index['name'] for index in inspector.get_indexes(name)}
+        with op.batch_alter_table(name, schema=None) as batch_op:
+            for column in missing_columns:
+                # Added to an older version of the table: nullable, with its foreign key
+                batch_op.add_column(sa.Column(column.name, column.type, nullable=True))
+                for key in column.foreign_keys:
+                    referent, referent_column = key.target_fullname.split('.')
+                    batch_op.create_foreign_key(
+                        f'fk_{name}_{column.name}', referent, [column.name], [referent_column]
+                    )
+            for index_name, index_columns in indexes:
+                if index_name not in existing_indexes:
+                    batch_op.create_index(index_name, index_columns, unique=False)
+
+    if 'sequence' not in {column['name'] for column in inspector.get_columns('progress_logs')}:
+        with op.batch_alter_table('progress_logs', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('sequence', sa.Integer(), nullable=True))
+    _backfill_log_sequences(bind)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('progress_logs', schema=None) as batch_op:
+        batch_op.drop_column('sequence')
+    for name, _, indexes in reversed(TABLES):
+        with op.batch_alter_table(name, schema=None) as batch_op:
+            for index_name, _ in indexes:
+                batch_op.drop_index(index_name)
+        op.drop_table(name)
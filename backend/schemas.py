@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
 from typing import Optional
 from enum import Enum
@@ -17,6 +17,9 @@ class LoginData(BaseModel):
     email: str
     password: str
 
+class RefreshData(BaseModel):
+    refresh_token: str
+
 class CaseData(BaseModel):
     title: str
     client_id: int
@@ -39,6 +42,9 @@ class CaseOut(BaseModel):
     client_id: int
     on_chain_address: Optional[str]
     on_chain_tx: Optional[str] 
+    final_hash: Optional[str] = None
+    archived_at: Optional[datetime] = None
+    version: int = 0
 
     class Config:
         from_attributes = True
@@ -83,10 +89,26 @@ class ProgressLogOut(BaseModel):
     class Config:
         from_attributes = True
 
+class ProgressLogLiteOut(BaseModel):
+    """/case_logs?view=lite: everything but the description, for list views."""
+    id: str
+    case_id: str
+    time_spent: int
+    timestamp: datetime
+    is_edited: bool
+
+    class Config:
+        from_attributes = True
+
 class EditProgressLogData(BaseModel):
     description: str
     time_spent: int
 
+class ProgressLogImportRow(BaseModel):
+    description: str = Field(min_length=1)
+    time_spent: int = Field(gt=0)  # minutes
+    timestamp: Optional[datetime] = None  # when the work was done; defaults to the import time
+
 class ProgressLogHistoryOut(BaseModel):
     id: int
     log_id: str
@@ -107,6 +129,10 @@ class CaseSummaryOut(BaseModel):
     client_email: str
     total_logs: int
     total_time_spent: int
+    edit_count: int
+    last_activity_at: datetime
+    status_since: datetime
+    status_durations: dict  # seconds spent in each status, the current one up to now
 
     class Config:
         from_attributes = True
@@ -140,3 +166,30 @@ class CaseStatusChangeOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+class ChainAnchorOut(BaseModel):
+    id: int
+    log_id: str
+    kind: str
+    mode: str
+    status: str
+    attempts: int
+    last_error: Optional[str] = None
+    tx_hash: Optional[str] = None
+    block_number: Optional[int] = None
+    chain_index: Optional[int] = None
+    batch_id: Optional[int] = None
+    leaf_index: Optional[int] = None
+    created_at: datetime
+    submitted_at: Optional[datetime] = None
+    confirmed_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class AuditGrantOut(BaseModel):
+    case_id: str
+    expires_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,483 @@
+import argparse
+import os
+import sys
+import threading
+from datetime import datetime, timezone, timedelta
+from itertools import groupby
+
+from sqlalchemy.orm import Session
+
+from backend.db.database import SessionLocal
+from backend.db.models import Case, ChainAnchor, MerkleBatch, ProgressLog
+from backend.utils import blockchain
+from backend.utils.blockchain import (
+    batch_index_from_receipt,
+    generate_log_hash,
+    get_receipt,
+    is_tx_known,
+    log_index_from_receipt,
+    nonce_manager,
+    replace_tx,
+    send_batch_to_case,
+    send_log_to_case,
+    send_log_version_to_case
+)
+from backend.utils.fees import TX_MAX_REPLACEMENTS, TX_PENDING_DEADLINE_SECONDS
+from backend.utils.merkle import build_merkle_tree, encode_proof, merkle_proof, merkle_root
+
+
+ANCHOR_WORKER_ENABLED = os.getenv("ANCHOR_WORKER_ENABLED", "true").lower() == "true"
+ANCHOR_POLL_SECONDS = float(os.getenv("ANCHOR_POLL_SECONDS", "2"))
+ANCHOR_MAX_ATTEMPTS = int(os.getenv("ANCHOR_MAX_ATTEMPTS", "10"))
+ANCHOR_RETRY_BASE_SECONDS = float(os.getenv("ANCHOR_RETRY_BASE_SECONDS", "5"))
+ANCHOR_RETRY_MAX_SECONDS = float(os.getenv("ANCHOR_RETRY_MAX_SECONDS", "300"))
+ANCHOR_MAX_IN_FLIGHT = int(os.getenv("ANCHOR_MAX_IN_FLIGHT", "64"))
+ANCHOR_RESUBMIT_SECONDS = float(os.getenv("ANCHOR_RESUBMIT_SECONDS", "600"))
+
+# "direct": one addLog/addLogVersion transaction per log
+# "batch": logs of a case are collected for a window and anchored as one Merkle root
+ANCHOR_MODE = os.getenv("ANCHOR_MODE", "direct").lower()
+ANCHOR_BATCH_WINDOW_SECONDS = float(os.getenv("ANCHOR_BATCH_WINDOW_SECONDS", "60"))
+ANCHOR_BATCH_MAX_LOGS = int(os.getenv("ANCHOR_BATCH_MAX_LOGS", "1000"))
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands datetimes back without tzinfo; everything we store is UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def enqueue_anchor(db: Session, log: ProgressLog, kind: str = "add_log", mode: str = None) -> ChainAnchor:
+    """Queue a log (or a new version of it) for on-chain anchoring in the caller's transaction."""
+    if mode is None:
+        mode = ANCHOR_MODE
+        if kind == "add_log_version":
+            # A new version is anchored the same way as the original it links to
+            original = db.query(ChainAnchor).filter(
+                ChainAnchor.log_id == log.id,
+                ChainAnchor.kind == "add_log"
+            ).order_by(ChainAnchor.id).first()
+            if original:
+                mode = original.mode
+
+    log_hash = generate_log_hash(log.case_id, log.id, log.description, log.time_spent, log.timestamp)
+    anchor = ChainAnchor(
+        case_id=log.case_id,
+        log_id=log.id,
+        kind=kind,
+        mode=mode,
+        log_hash=log_hash.hex(),
+        status="pending",
+        next_attempt_at=datetime.now(timezone.utc)
+    )
+    db.add(anchor)
+    return anchor
+
+
+def has_pending_anchors(db: Session, case_id: str) -> bool:
+    return db.query(ChainAnchor).filter(
+        ChainAnchor.case_id == case_id,
+        ChainAnchor.status.in_(["pending", "submitted"])
+    ).first() is not None
+
+
+def failed_anchor_log_ids(db: Session, case_id: str) -> list:
+    """IDs of the case's logs whose anchoring gave up after ANCHOR_MAX_ATTEMPTS (see requeue_failed)."""
+    rows = db.query(ChainAnchor.log_id).filter(
+        ChainAnchor.case_id == case_id,
+        ChainAnchor.status == "failed"
+    ).order_by(ChainAnchor.id)
+    return list(dict.fromkeys(log_id for (log_id,) in rows))  # a log and its versions once
+
+
+def unanchored_error(db: Session, case_id: str):
+    """Why the case's logs cannot be sealed yet (failed or pending anchors), or None."""
+    failed = failed_anchor_log_ids(db, case_id)
+    if failed:
+        shown = ", ".join(failed[:10]) + (f" and {len(failed) - 10} more" if len(failed) > 10 else "")
+        return (f"log anchoring failed for {shown}; requeue with "
+                f"`python -m backend.services.anchoring requeue {case_id}`")
+    if has_pending_anchors(db, case_id):
+        return "log anchoring is pending"
+    return None
+
+
+def _parent_index(db: Session, anchor: ChainAnchor):
+    """On-chain index of the original log, or None while it is not confirmed yet."""
+    original = db.query(ChainAnchor).filter(
+        ChainAnchor.log_id == anchor.log_id,
+        ChainAnchor.kind == "add_log"
+    ).order_by(ChainAnchor.id).first()
+    if not original:
+        # Logs written before the outbox existed: index = sequence - 1
+        return int(anchor.log_id.split('-')[-1]) - 1
+    if original.status != "confirmed":
+        return None
+    return original.chain_index
+
+
+def _case_address(db: Session, case_id: str) -> str:
+    case = db.query(Case).filter(Case.id == case_id).first()
+    if not case or not case.on_chain_address:
+        raise RuntimeError("Case not on blockchain")
+    return case.on_chain_address
+
+
+def _submit(db: Session, anchor: ChainAnchor, parent_index=None):
+    case_address = _case_address(db, anchor.case_id)
+    log_hash = bytes.fromhex(anchor.log_hash)
+    if anchor.kind == "add_log_version":
+        tx_hash = send_log_version_to_case(case_address, parent_index, log_hash)
+    else:
+        tx_hash = send_log_to_case(case_address, log_hash)
+
+    anchor.tx_hash = tx_hash.hex()
+    anchor.status = "submitted"
+    anchor.submitted_at = datetime.now(timezone.utc)
+
+
+def _submit_batch(db: Session, batch: MerkleBatch):
+    case_address = _case_address(db, batch.case_id)
+    tx_hash = send_batch_to_case(case_address, bytes.fromhex(batch.root), batch.size)
+
+    batch.tx_hash = tx_hash.hex()
+    batch.status = "submitted"
+    batch.submitted_at = datetime.now(timezone.utc)
+
+
+def _record_failure(entry, error: Exception):
+    """Schedule a retry with exponential backoff (works for anchors and batches)."""
+    entry.attempts = (entry.attempts or 0) + 1
+    entry.last_error = str(error)
+    entry.tx_hash = None
+    entry.replaced_tx_hashes = None
+    if entry.attempts >= ANCHOR_MAX_ATTEMPTS:
+        entry.status = "failed"
+        return
+    delay = min(ANCHOR_RETRY_BASE_SECONDS * 2 ** (entry.attempts - 1), ANCHOR_RETRY_MAX_SECONDS)
+    entry.status = "pending"
+    entry.next_attempt_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+
+
+def _sync_batch_anchors(db: Session, batch: MerkleBatch):
+    # Logs in a batch share its transaction and state; one UPDATE however large the batch
+    db.query(ChainAnchor).filter(ChainAnchor.batch_id == batch.id).update({
+        ChainAnchor.status: batch.status,
+        ChainAnchor.tx_hash: batch.tx_hash,
+        ChainAnchor.block_number: batch.block_number,
+        ChainAnchor.submitted_at: batch.submitted_at,
+        ChainAnchor.confirmed_at: batch.confirmed_at,
+        ChainAnchor.last_error: batch.last_error
+    })
+
+
+def _sent_hashes(entry) -> list:
+    earlier = entry.replaced_tx_hashes.split(",") if entry.replaced_tx_hashes else []
+    return [entry.tx_hash] + earlier
+
+
+def _find_receipt(entry):
+    """Receipt of whichever broadcast of the entry got mined, or None."""
+    for tx_hash in _sent_hashes(entry):
+        receipt = get_receipt(bytes.fromhex(tx_hash))
+        if receipt is not None:
+            entry.tx_hash = tx_hash
+            return receipt
+    return None
+
+
+def _replace(entry):
+    """Rebroadcast a stuck entry at the same nonce with bumped fees."""
+    new_hash = replace_tx(bytes.fromhex(entry.tx_hash))
+    entry.replaced_tx_hashes = ",".join(_sent_hashes(entry))
+    entry.tx_hash = new_hash.hex()
+    entry.submitted_at = datetime.now(timezone.utc)
+
+
+def _collect(db: Session, entries, next_index) -> int:
+    """
+    Resolve submitted anchors or batches whose transactions have been mined,
+    in outbox order per case. next_index(db, entry, receipt) records the
+    on-chain position of a newly confirmed entry.
+    """
+    now = datetime.now(timezone.utc)
+    waiting_cases = set()
+    confirmed = 0
+    for entry in entries:
+        if entry.case_id in waiting_cases:
+            continue
+
+        receipt = _find_receipt(entry)
+        if receipt is None:
+            waiting_cases.add(entry.case_id)
+            age = (now - _as_utc(entry.submitted_at)).total_seconds()
+            if age <= min(ANCHOR_RESUBMIT_SECONDS, TX_PENDING_DEADLINE_SECONDS):
+                continue
+            known = is_tx_known(bytes.fromhex(entry.tx_hash))
+            if not known and age > ANCHOR_RESUBMIT_SECONDS:
+                # Dropped by the node: its nonce is free again, so resend from scratch
+                nonce_manager.resync()
+                _record_failure(entry, RuntimeError(f"Transaction {entry.tx_hash} was dropped"))
+            elif known and age > TX_PENDING_DEADLINE_SECONDS and len(_sent_hashes(entry)) <= TX_MAX_REPLACEMENTS:
+                # Still pending: most likely underpriced, so outbid it at the same nonce
+                try:
+                    _replace(entry)
+                except Exception as e:
+                    print(f"⚠️ Transaction replacement failed: {e}")
+                    continue
+            else:
+                continue
+            if isinstance(entry, MerkleBatch):
+                _sync_batch_anchors(db, entry)
+            db.commit()
+            continue
+
+        if receipt["status"] != 1:
+            _record_failure(entry, RuntimeError(f"Transaction {entry.tx_hash} reverted"))
+        else:
+            next_index(db, entry, receipt)
+            entry.block_number = receipt["blockNumber"]
+            entry.status = "confirmed"
+            entry.confirmed_at = now
+            entry.last_error = None
+            confirmed += 1
+        if isinstance(entry, MerkleBatch):
+            _sync_batch_anchors(db, entry)
+        db.commit()
+    return confirmed
+
+
+def _set_chain_index(db: Session, anchor: ChainAnchor, receipt):
+    # Read from the chain: the contract may hold logs this outbox never sent
+    anchor.chain_index = log_index_from_receipt(_case_address(db, anchor.case_id), receipt)
+
+
+def _set_batch_index(db: Session, batch: MerkleBatch, receipt):
+    batch.batch_index = batch_index_from_receipt(_case_address(db, batch.case_id), receipt)
+
+
+def collect_receipts(db: Session) -> int:
+    anchors = db.query(ChainAnchor).filter(
+        ChainAnchor.mode == "direct",
+        ChainAnchor.status == "submitted"
+    ).order_by(ChainAnchor.id).all()
+    batches = db.query(MerkleBatch).filter(MerkleBatch.status == "submitted").order_by(MerkleBatch.id).all()
+    return _collect(db, anchors, _set_chain_index) + _collect(db, batches, _set_batch_index)
+
+
+def create_merkle_batch(db: Session, case_id: str, log_hashes: list):
+    """
+    Add a pending MerkleBatch over log_hashes (in leaf order). Returns the
+    batch and the encoded inclusion proof of each leaf.
+    """
+    levels = build_merkle_tree(log_hashes)
+    batch = MerkleBatch(
+        case_id=case_id,
+        root=merkle_root(levels).hex(),
+        size=len(log_hashes),
+        status="pending",
+        next_attempt_at=datetime.now(timezone.utc)
+    )
+    db.add(batch)
+    return batch, [encode_proof(merkle_proof(levels, index)) for index in range(len(log_hashes))]
+
+
+def build_due_batches(db: Session) -> int:
+    """
+    Group pending batch-mode anchors of each case into Merkle batches once the
+    oldest has waited ANCHOR_BATCH_WINDOW_SECONDS or ANCHOR_BATCH_MAX_LOGS are queued.
+    Each anchor gets its leaf index and inclusion proof right away.
+    """
+    now = datetime.now(timezone.utc)
+    pending = db.query(ChainAnchor).filter(
+        ChainAnchor.mode == "batch",
+        ChainAnchor.status == "pending",
+        ChainAnchor.batch_id.is_(None)
+    ).order_by(ChainAnchor.case_id, ChainAnchor.id).all()
+
+    built = 0
+    for case_id, group in groupby(pending, key=lambda a: a.case_id):
+        anchors = list(group)
+        age = (now - _as_utc(anchors[0].created_at)).total_seconds()
+        if len(anchors) < ANCHOR_BATCH_MAX_LOGS and age < ANCHOR_BATCH_WINDOW_SECONDS:
+            continue
+
+        for start in range(0, len(anchors), ANCHOR_BATCH_MAX_LOGS):
+            chunk = anchors[start:start + ANCHOR_BATCH_MAX_LOGS]
+            batch, proofs = create_merkle_batch(db, case_id, [bytes.fromhex(a.log_hash) for a in chunk])
+            for leaf_index, anchor in enumerate(chunk):
+                anchor.batch = batch
+                anchor.leaf_index = leaf_index
+                anchor.proof = proofs[leaf_index]
+            built += 1
+    db.commit()
+    return built
+
+
+def submit_due_anchors(db: Session) -> int:
+    """
+    Broadcast every due outbox entry (direct anchors and Merkle batches)
+    without waiting for it to be mined; the nonce order keeps each case's
+    entries in outbox order on-chain. Once an entry of a case is waiting for
+    a retry (or has failed), the rest of that case is held back.
+    """
+    now = datetime.now(timezone.utc)
+    blocked_cases = {
+        case_id for (case_id,) in db.query(ChainAnchor.case_id).filter(
+            ChainAnchor.mode == "direct",
+            ChainAnchor.status == "failed"
+        ).distinct()
+    }
+    blocked_batch_cases = {
+        case_id for (case_id,) in db.query(MerkleBatch.case_id).filter(MerkleBatch.status == "failed").distinct()
+    }
+    in_flight = (
+        db.query(ChainAnchor).filter(ChainAnchor.mode == "direct", ChainAnchor.status == "submitted").count()
+        + db.query(MerkleBatch).filter(MerkleBatch.status == "submitted").count()
+    )
+    pending = db.query(ChainAnchor).filter(
+        ChainAnchor.mode == "direct",
+        ChainAnchor.status == "pending"
+    ).order_by(ChainAnchor.id).all()
+    pending_batches = db.query(MerkleBatch).filter(MerkleBatch.status == "pending").order_by(MerkleBatch.id).all()
+
+    sent = 0
+    for anchor in pending:
+        if in_flight >= ANCHOR_MAX_IN_FLIGHT:
+            break
+        if anchor.case_id in blocked_cases:
+            continue
+        if _as_utc(anchor.next_attempt_at) > now:
+            blocked_cases.add(anchor.case_id)
+            continue
+
+        parent_index = None
+        if anchor.kind == "add_log_version":
+            parent_index = _parent_index(db, anchor)
+            if parent_index is None:
+                # The original is still in flight; send the new version next round
+                blocked_cases.add(anchor.case_id)
+                continue
+
+        try:
+            _submit(db, anchor, parent_index)
+            in_flight += 1
+            sent += 1
+        except Exception as e:
+            _record_failure(anchor, e)
+            blocked_cases.add(anchor.case_id)
+        db.commit()
+
+    for batch in pending_batches:
+        if in_flight >= ANCHOR_MAX_IN_FLIGHT:
+            break
+        if batch.case_id in blocked_batch_cases:
+            continue
+        if _as_utc(batch.next_attempt_at) > now:
+            blocked_batch_cases.add(batch.case_id)
+            continue
+
+        try:
+            _submit_batch(db, batch)
+            in_flight += 1
+            sent += 1
+        except Exception as e:
+            _record_failure(batch, e)
+            blocked_batch_cases.add(batch.case_id)
+        _sync_batch_anchors(db, batch)
+        db.commit()
+    return sent
+
+
+def requeue_failed(db: Session, case_id: str) -> int:
+    """
+    Put the case's failed anchors and batches back in the outbox with fresh
+    attempts, due now; returns how many were requeued. The caller commits.
+    """
+    now = datetime.now(timezone.utc)
+    reset = {"status": "pending", "attempts": 0, "next_attempt_at": now}
+    anchors = db.query(ChainAnchor).filter(
+        ChainAnchor.case_id == case_id,
+        ChainAnchor.mode == "direct",
+        ChainAnchor.status == "failed"
+    ).update(reset)
+    batches = db.query(MerkleBatch).filter(
+        MerkleBatch.case_id == case_id,
+        MerkleBatch.status == "failed"
+    ).all()
+    for batch in batches:
+        for column, value in reset.items():
+            setattr(batch, column, value)
+        _sync_batch_anchors(db, batch)
+    return anchors + len(batches)
+
+
+def process_pending_anchors(db: Session) -> int:
+    if not blockchain.client.w3:
+        return 0
+    confirmed = collect_receipts(db)
+    build_due_batches(db)
+    submit_due_anchors(db)
+    return confirmed
+
+
+class AnchorWorker:
+    """Background thread that drains the anchoring outbox."""
+
+    def __init__(self, interval: float = ANCHOR_POLL_SECONDS):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="anchor-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 5)
+
+    def _run(self):
+        while not self._stop.is_set():
+            db = SessionLocal()
+            try:
+                process_pending_anchors(db)
+            except Exception as e:
+                db.rollback()
+                print(f"⚠️ Anchor worker error: {e}")
+            finally:
+                db.close()
+            self._stop.wait(self.interval)
+
+
+anchor_worker = AnchorWorker()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m backend.services.anchoring")
+    sub = parser.add_subparsers(dest="command", required=True)
+    requeue = sub.add_parser("requeue", help="retry the failed anchors of the given cases")
+    requeue.add_argument("case_ids", nargs="+")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        ok = True
+        for case_id in args.case_ids:
+            if not db.query(Case).filter(Case.id == case_id).first():
+                print(f"⚠️ {case_id}: case not found")
+                ok = False
+                continue
+            count = requeue_failed(db, case_id)
+            db.commit()
+            print(f"✅ {case_id}: {count} failed anchors or batches requeued")
+        sys.exit(0 if ok else 1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Hot/cold archival of closed cases.
+
+Once a case has been closed for ARCHIVE_AFTER_DAYS, its logs, their edit
+history, its status changes and its chain anchors are moved out of the hot
+tables into the archived_* tables in one transaction, and cases.archived_at
+is set. Reads pick the tables of a case with case_tables(), so archived
+cases read (and verify) the same, while the hot tables and their indexes
+only grow with open matters.
+
+Before anything moves, the final hash is recomputed from the logs and must
+match the one recorded when the case was closed (or, for cases closed before
+it was recorded, the CaseClosed event mirrored by the chain indexer).
+
+    python -m backend.services.archive run [--older-than-days N] [--limit N]
+    python -m backend.services.archive case CASE_ID [CASE_ID ...]
+    python -m backend.services.archive restore CASE_ID [CASE_ID ...]
+"""
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from backend.db.database import SessionLocal
+from backend.db.models import ARCHIVE_TABLES, HOT_TABLES, Case, CaseStatusChange, CaseTables, ChainEvent, ProgressLog
+from backend.services.anchoring import unanchored_error
+from backend.services.case_cache import bump_version
+from backend.utils.blockchain import generate_final_hash
+
+
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "30"))
+
+
+def _move(db: Session, case_id: str, source: CaseTables, target: CaseTables) -> dict:
+    """Copy the rows of a case from source to target tables, then delete them from source."""
+    log_ids = select(source.log.id).where(source.log.case_id == case_id)
+    rows_of_case = {
+        "log": source.log.case_id == case_id,
+        "history": source.history.log_id.in_(log_ids),
+        "anchor": source.anchor.case_id == case_id,
+        "status_change": source.status_change.case_id == case_id,
+    }
+    counts = {}
+    # Logs go in before the rows pointing at them, and come out after them
+    for name in ("log", "history", "anchor", "status_change"):
+        table = getattr(source, name).__table__
+        columns = [column.name for column in table.columns]
+        result = db.execute(insert(getattr(target, name)).from_select(
+            columns, select(*table.columns).where(rows_of_case[name])
+        ))
+        counts[name] = result.rowcount
+    for name in ("history", "anchor", "log", "status_change"):
+        db.execute(
+            delete(getattr(source, name)).where(rows_of_case[name]).execution_options(synchronize_session=False)
+        )
+    bump_version(db, case_id)  # reads switch tables
+    return counts
+
+
+def _mirrored_final_hash(db: Session, case: Case):
+    event = db.query(ChainEvent).filter(
+        ChainEvent.case_address == case.on_chain_address,
+        ChainEvent.event == "CaseClosed"
+    ).order_by(ChainEvent.block_number.desc()).first()
+    return event.event_hash if event else None
+
+
+def archive_case(db: Session, case_id: str) -> dict:
+    """Move a closed case into the archive tables; returns the rows moved per table. The caller commits."""
+    case = db.query(Case).filter(Case.id == case_id).with_for_update().first()
+    if not case:
+        raise ValueError("case not found")
+    if case.archived_at is not None:
+        raise ValueError("already archived")
+    if case.status != "closed":
+        raise ValueError(f"case is '{case.status}', not closed")
+    error = unanchored_error(db, case.id)
+    if error:
+        raise ValueError(error)
+
+    # Same order as at closing (see generate_final_hash), not the sequence order of the reads
+    logs = db.query(ProgressLog).filter(
+        ProgressLog.case_id == case.id
+    ).order_by(ProgressLog.timestamp, ProgressLog.id).yield_per(1000)
+    final_hash = generate_final_hash(logs).hex()
+    recorded = case.final_hash or _mirrored_final_hash(db, case)
+    if recorded and recorded != final_hash:
+        raise ValueError(f"logs hash to {final_hash} but {recorded} was recorded when the case was closed")
+
+    counts = _move(db, case.id, HOT_TABLES, ARCHIVE_TABLES)
+    case.final_hash = final_hash
+    case.archived_at = datetime.now(timezone.utc)
+    return counts
+
+
+def restore_case(db: Session, case_id: str) -> dict:
+    """Move an archived case back into the hot tables. The caller commits."""
+    case = db.query(Case).filter(Case.id == case_id).with_for_update().first()
+    if not case:
+        raise ValueError("case not found")
+    if case.archived_at is None:
+        raise ValueError("not archived")
+    counts = _move(db, case.id, ARCHIVE_TABLES, HOT_TABLES)
+    case.archived_at = None
+    return counts
+
+
+def archivable_case_ids(db: Session, older_than_days: int = ARCHIVE_AFTER_DAYS, limit: int = None) -> list:
+    """Cases closed at least older_than_days ago and not archived yet."""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+    closed = select(CaseStatusChange.case_id).where(
+        CaseStatusChange.new_status == "closed",
+        CaseStatusChange.changed_at <= cutoff
+    )
+    query = select(Case.id).where(
+        Case.status == "closed",
+        Case.archived_at.is_(None),
+        Case.id.in_(closed)
+    ).order_by(Case.id).limit(limit)
+    return db.scalars(query).all()
+
+
+def _run(db: Session, case_ids: list, move) -> bool:
+    ok = True
+    for case_id in case_ids:
+        try:
+            counts = move(db, case_id)
+            db.commit()
+        except ValueError as e:
+            db.rollback()
+            print(f"⚠️ {case_id}: {e}")
+            ok = False
+            continue
+        print(f"✅ {case_id}: {counts['log']} logs, {counts['history']} edits, "
+              f"{counts['status_change']} status changes, {counts['anchor']} anchors")
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m backend.services.archive")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run", help="archive every case closed long enough ago")
+    run.add_argument("--older-than-days", type=int, default=ARCHIVE_AFTER_DAYS)
+    run.add_argument("--limit", type=int, default=None, help="archive at most this many cases")
+    case = sub.add_parser("case", help="archive the given closed cases now")
+    case.add_argument("case_ids", nargs="+")
+    restore = sub.add_parser("restore", help="move archived cases back into the hot tables")
+    restore.add_argument("case_ids", nargs="+")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        if args.command == "restore":
+            ok = _run(db, args.case_ids, restore_case)
+        else:
+            case_ids = args.case_ids if args.command == "case" else archivable_case_ids(
+                db, args.older_than_days, args.limit
+            )
+            if not case_ids:
+                print("✅ No closed cases to archive")
+            ok = _run(db, case_ids, archive_case)
+        sys.exit(0 if ok else 1)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Audit access grants, checked from memory.
+
+Every active grant is kept in an index keyed by (case_id, auditor_email),
+loaded at startup and updated on each grant, so the check on the audit
+routes is a dict lookup. Expiries sit in a min-heap: checks pop the grants
+that have run out off its head.
+
+A case has one grant row per auditor: granting again replaces its expiry,
+which may shorten it. Every change to the grants bumps the "audit_grants"
+counter in id_sequences, in its transaction. A check reads the counter
+first (a primary key lookup) and reloads the index when it has moved, so a
+grant replaced by another process is never honoured from memory. The
+sweeper deletes expired rows every AUDIT_GRANT_SWEEP_SECONDS.
+"""
+import heapq
+import os
+import threading
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from backend.db import queries
+from backend.db.database import SessionLocal
+from backend.db.models import CaseAuditAccess, IdSequence
+from backend.utils.id_generator import next_sequence
+
+
+AUDIT_GRANT_SWEEPER_ENABLED = os.getenv("AUDIT_GRANT_SWEEPER_ENABLED", "true").lower() == "true"
+AUDIT_GRANT_SWEEP_SECONDS = float(os.getenv("AUDIT_GRANT_SWEEP_SECONDS", "300"))
+
+GRANTS_VERSION = "audit_grants"  # id_sequences counter of grant changes
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Stored naive, in UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def grants_version(db: Session) -> int:
+    return db.scalar(select(IdSequence.value).where(IdSequence.name == GRANTS_VERSION)) or 0
+
+
+class AuditGrantIndex:
+    def __init__(self):
+        self._expires = {}  # (case_id, auditor_email) -> expires_at
+        self._heap = []  # (expires_at, case_id, auditor_email); stale once the grant is replaced
+        self.version = None  # of the grants counter when the index was last in sync with the table
+        self._lock = threading.Lock()
+
+    def load(self, db: Session):
+        """Replace the index with the active grants in the table."""
+        # Read before the rows: a change committed in between only causes another reload
+        version = grants_version(db)
+        rows = db.execute(select(
+            CaseAuditAccess.case_id, CaseAuditAccess.auditor_email, CaseAuditAccess.expires_at
+        ).where(CaseAuditAccess.expires_at > datetime.now(timezone.utc))).all()
+        with self._lock:
+            self._expires.clear()
+            self._heap = []
+            for case_id, auditor_email, expires_at in rows:
+                self._put((case_id, auditor_email), _as_utc(expires_at))
+            heapq.heapify(self._heap)
+            self.version = version
+
+    def put(self, case_id: str, auditor_email: str, expires_at: datetime, version: int):
+        """Record a grant committed with the counter at version."""
+        with self._lock:
+            self._put((case_id, auditor_email), _as_utc(expires_at))
+            if self.version == version - 1:
+                self.version = version  # no other change in between
+
+    def _put(self, key: tuple, expires_at: datetime):
+        self._expires[key] = expires_at
+        heapq.heappush(self._heap, (expires_at, *key))
+
+    def _expire(self, now: datetime):
+        while self._heap and self._heap[0][0] <= now:
+            expires_at, *key = heapq.heappop(self._heap)
+            key = tuple(key)
+            if self._expires.get(key) != expires_at:
+                continue  # replaced by a later grant
+            del self._expires[key]
+
+    def has_access(self, case_id: str, auditor_email: str) -> bool:
+        with self._lock:
+            self._expire(datetime.now(timezone.utc))
+            return (case_id, auditor_email) in self._expires
+
+    def __len__(self):
+        return len(self._expires)
+
+
+audit_grant_index = AuditGrantIndex()
+
+
+def grant_access(db: Session, case_id: str, auditor_email: str, granted_by: int, expires_at: datetime):
+    """Create or replace the auditor's grant on the case; commits."""
+    access = db.query(CaseAuditAccess).filter(
+        CaseAuditAccess.case_id == case_id,
+        CaseAuditAccess.auditor_email == auditor_email
+    ).with_for_update().first()
+    if access is None:
+        access = CaseAuditAccess(case_id=case_id, auditor_email=auditor_email)
+        db.add(access)
+    access.granted_by = granted_by
+    access.granted_at = datetime.now(timezone.utc)
+    access.expires_at = expires_at
+    try:
+        db.flush()
+        version = next_sequence(db, GRANTS_VERSION, lambda: 0)
+        db.commit()
+    except IntegrityError:
+        # Granted by a concurrent request meanwhile; replace that one
+        db.rollback()
+        return grant_access(db, case_id, auditor_email, granted_by, expires_at)
+    audit_grant_index.put(case_id, auditor_email, expires_at, version)
+
+
+def has_access(db: Session, case_id: str, auditor_email: str) -> bool:
+    if grants_version(db) != audit_grant_index.version:
+        # Grants changed by another process: replaced, shortened or new
+        audit_grant_index.load(db)
+    return audit_grant_index.has_access(case_id, auditor_email)
+
+
+def grants_of(db: Session, auditor_email: str) -> list:
+    """The auditor's active grants, soonest expiry first."""
+    return db.scalars(queries.auditor_grants(auditor_email, datetime.now(timezone.utc))).all()
+
+
+def load_index():
+    db = SessionLocal()
+    try:
+        audit_grant_index.load(db)
+    finally:
+        db.close()
+
+
+def sweep(db: Session) -> int:
+    """Delete expired grants and reload the index; returns the rows deleted."""
+    result = db.execute(delete(CaseAuditAccess).where(CaseAuditAccess.expires_at <= datetime.now(timezone.utc)))
+    db.commit()
+    audit_grant_index.load(db)
+    return result.rowcount
+
+
+class AuditGrantSweeper:
+    """Background thread that purges expired grants and resyncs the index."""
+
+    def __init__(self, interval: float = AUDIT_GRANT_SWEEP_SECONDS):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="audit-grant-sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            db = SessionLocal()
+            try:
+                sweep(db)
+            except Exception as e:
+                db.rollback()
+                print(f"⚠️ Audit grant sweeper error: {e}")
+            finally:
+                db.close()
+
+
+audit_grant_sweeper = AuditGrantSweeper()
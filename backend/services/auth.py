@@ -1,24 +1,57 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 from backend.db.models import User
-from backend.utils.security import verify_password, create_access_token
+from backend.utils import passwords
+from backend.services import sessions
+from backend.utils.security import ACCESS_TOKEN_EXPIRE_MINUTES, create_access_token
 from datetime import timedelta
 
 
-def authenticate_user(db: Session, email: str, password: str):
-    user = db.query(User).filter(User.email == email).first()
-    if not user or not verify_password(password, user.password):
+async def authenticate_user(db: AsyncSession, email: str, password: str):
+    user = await db.scalar(select(User).where(User.email == email))
+    # Hand the connection back while the password is checked; the user stays loaded
+    await db.commit()
+    if not user:
+        return None
+    valid, new_hash = await passwords.password_hasher.verify_and_update(password, user.password)
+    if not valid:
         return None
+    if new_hash:
+        # Stored at another bcrypt cost than BCRYPT_ROUNDS; rehash while we have the password
+        user.password = new_hash
+        await db.commit()
     return user
 
 
-def login_user(db: Session, email: str, password: str):
-    user = authenticate_user(db, email, password)
+def _access_token(user: User) -> dict:
+    access_token = create_access_token(
+        data={"sub": str(user.id), "role": user.role, "verified": bool(user.is_verified)},
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    return {"access_token": access_token, "token_type": "bearer", "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60}
+
+
+async def login_user(db: AsyncSession, email: str, password: str):
+    user = await authenticate_user(db, email, password)
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    access_token = create_access_token(
-        data={"sub": str(user.id), "role": user.role},
-        expires_delta=timedelta(minutes=30)
-    )
-    return {"access_token": access_token, "token_type": "bearer"}
+    refresh_token = await sessions.session_store.create(db, user.id)
+    return {**_access_token(user), "refresh_token": refresh_token}
+
+
+async def refresh_session(db: AsyncSession, refresh_token: str):
+    """New access and refresh tokens for a refresh token; no password check."""
+    user_id, refresh_token = await sessions.session_store.rotate(db, refresh_token)
+    # Fresh role and verification claims
+    user = await db.get(User, user_id)
+    await db.commit()
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found")
+    return {**_access_token(user), "refresh_token": refresh_token}
+
+
+async def logout_user(db: AsyncSession, refresh_token: str, everywhere: bool = False):
+    await sessions.session_store.revoke(db, refresh_token, everywhere)
+    return {"msg": "Signed out everywhere" if everywhere else "Signed out"}
@@ -0,0 +1,127 @@
+"""
+Conditional GETs and a response cache for the case read routes.
+
+cases.version is bumped in the transaction of every write that changes what
+those routes return: logs added, imported or edited, status changes,
+contract signatures, archiving and summary rebuilds. A response's ETag is
+derived from the version, the URL and the user's role. A request whose
+If-None-Match names it gets a 304 once the case row is read and access is
+checked, without the main query. Other requests are served from an
+in-process LRU keyed the same way, of at most CASE_RESPONSE_CACHE_MAX_ENTRIES
+bodies and CASE_RESPONSE_CACHE_MAX_BYTES in all (0 disables it); a body
+larger than a quarter of the byte budget is not cached. A stale entry is
+never served: the version in its key comes from the case row read by the
+request.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from backend.db.models import Case
+
+
+CASE_RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("CASE_RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+CASE_RESPONSE_CACHE_MAX_BYTES = int(os.getenv("CASE_RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# /case_summary includes the time spent so far in the current status, so its
+# ETag also changes every this many seconds
+SUMMARY_ETAG_SECONDS = 60
+
+
+def bump_version(db: Session, case_id: str):
+    """Mark the case as changed; run in the transaction of the change."""
+    db.execute(
+        update(Case).where(Case.id == case_id).values(version=Case.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+class ResponseCache:
+    """LRU of (body, headers) by request key, bounded by entries and by body bytes."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0  # bytes of the cached bodies
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: tuple, entry: tuple):
+        size = len(entry[0])
+        if self.max_entries <= 0 or size > self.max_bytes // 4:
+            return  # one large export-sized page would otherwise flush everything else
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous[0])
+            self._entries[key] = entry
+            self.size += size
+            while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+                _, (body, _) = self._entries.popitem(last=False)
+                self.size -= len(body)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+response_cache = ResponseCache(CASE_RESPONSE_CACHE_MAX_ENTRIES, CASE_RESPONSE_CACHE_MAX_BYTES)
+
+
+@lru_cache(maxsize=None)
+def _adapter(response_type) -> TypeAdapter:
+    return TypeAdapter(response_type)
+
+
+def _etag(key: tuple) -> str:
+    return f'"{key[1]}-{hashlib.blake2b(repr(key).encode(), digest_size=8).hexdigest()}"'
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as If-None-Match calls for
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+async def case_response(request: Request, response: Response, case: Case, role: str, response_type, build,
+                        summary: bool = False) -> Response:
+    """
+    The response of a case read route, for a case the user may read: a 304
+    when the client's copy is current, else the cached body, else the result
+    of await build() serialized as response_type (and cached). Headers build
+    sets on response (e.g. X-Next-Cursor) are kept with the body.
+    """
+    key = (case.id, case.version, role, request.url.path, request.url.query)
+    if summary:
+        key += (int(time.time() // SUMMARY_ETAG_SECONDS),)
+    headers = {"ETag": _etag(key), "Cache-Control": "private, no-cache"}  # browsers revalidate each time
+    if _matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    entry = response_cache.get(key)
+    if entry is None:
+        adapter = _adapter(response_type)
+        body = adapter.dump_json(adapter.validate_python(await build(), from_attributes=True))
+        entry = (body, dict(response.headers))
+        response_cache.put(key, entry)
+    body, route_headers = entry
+    return Response(body, media_type="application/json", headers={**route_headers, **headers})
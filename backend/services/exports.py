@@ -0,0 +1,120 @@
+"""
+Streaming export of a whole case: the case itself, its logs, their edit
+history and its status changes, as NDJSON or CSV, optionally gzipped.
+
+Rows are read with server-side cursors (stream_results) EXPORT_FETCH_SIZE
+at a time and written out in chunks of about EXPORT_CHUNK_BYTES, so memory
+stays flat however large the case is. The export runs on a session of its
+own because it outlives the request's.
+"""
+import csv
+import io
+import json
+import os
+import zlib
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, aliased
+
+from backend.db.database import SessionLocal
+from backend.db.models import Case, User, case_tables
+
+
+EXPORT_FETCH_SIZE = int(os.getenv("EXPORT_FETCH_SIZE", "1000"))
+EXPORT_CHUNK_BYTES = int(os.getenv("EXPORT_CHUNK_BYTES", "65536"))
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# Fields of each record type, in CSV column order; a CSV row leaves the other types' columns empty
+RECORD_FIELDS = {
+    "case": ["id", "title", "status", "created_at", "lawyer_email", "client_email", "on_chain_address"],
+    "log": ["id", "sequence", "lawyer_id", "description", "time_spent", "timestamp", "is_edited"],
+    "log_edit": ["id", "log_id", "old_description", "old_time_spent", "old_timestamp", "edited_at", "edited_by"],
+    "status_change": ["id", "old_status", "new_status", "changed_by", "changed_at", "reason"],
+}
+CSV_COLUMNS = ["record_type"] + list(dict.fromkeys(field for fields in RECORD_FIELDS.values() for field in fields))
+
+
+def _stream(db: Session, statement):
+    result = db.execute(statement.execution_options(stream_results=True, max_row_buffer=EXPORT_FETCH_SIZE))
+    for rows in result.partitions(EXPORT_FETCH_SIZE):
+        yield from rows
+
+
+def _records(db: Session, case_id: str):
+    lawyer, client = aliased(User), aliased(User)
+    case = db.execute(
+        select(
+            Case.id, Case.title, Case.status, Case.created_at,
+            lawyer.email.label("lawyer_email"), client.email.label("client_email"), Case.on_chain_address,
+            Case.archived_at
+        )
+        .join(lawyer, lawyer.id == Case.lawyer_id)
+        .join(client, client.id == Case.client_id)
+        .where(Case.id == case_id)
+    ).one()
+    yield "case", case
+
+    Log, History, StatusChange, _ = case_tables(case)
+    for row in _stream(db, select(
+        Log.id, Log.sequence, Log.lawyer_id, Log.description, Log.time_spent, Log.timestamp, Log.is_edited
+    ).where(Log.case_id == case_id).order_by(Log.timestamp, Log.sequence)):
+        yield "log", row
+
+    for row in _stream(db, select(
+        History.id, History.log_id, History.old_description, History.old_time_spent, History.old_timestamp,
+        History.edited_at, History.edited_by
+    ).join(Log, Log.id == History.log_id).where(Log.case_id == case_id).order_by(History.edited_at, History.id)):
+        yield "log_edit", row
+
+    for row in _stream(db, select(
+        StatusChange.id, StatusChange.old_status, StatusChange.new_status,
+        StatusChange.changed_by, StatusChange.changed_at, StatusChange.reason
+    ).where(StatusChange.case_id == case_id).order_by(StatusChange.changed_at, StatusChange.id)):
+        yield "status_change", row
+
+
+def _value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _ndjson_lines(records):
+    for record_type, row in records:
+        yield json.dumps({"type": record_type, **{field: _value(row._mapping[field]) for field in RECORD_FIELDS[record_type]}}) + "\n"
+
+
+def _csv_lines(records):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS)
+    writer.writeheader()
+    for record_type, row in records:
+        writer.writerow({"record_type": record_type, **{field: _value(row._mapping[field]) for field in RECORD_FIELDS[record_type]}})
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def stream_case_export(case_id: str, export_format: str = "ndjson", gzip: bool = False):
+    """Yield the export of a case as bytes chunks of about EXPORT_CHUNK_BYTES."""
+    db = SessionLocal()
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16) if gzip else None  # gzip container
+    lines = _csv_lines if export_format == "csv" else _ndjson_lines
+    try:
+        chunk, size = [], 0
+        for line in lines(_records(db, case_id)):
+            data = line.encode()
+            chunk.append(data)
+            size += len(data)
+            if size >= EXPORT_CHUNK_BYTES:
+                data = b"".join(chunk)
+                chunk, size = [], 0
+                if compressor:
+                    data = compressor.compress(data)
+                if data:
+                    yield data
+        data = b"".join(chunk)
+        yield compressor.compress(data) + compressor.flush() if compressor else data
+    finally:
+        db.close()
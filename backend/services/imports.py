@@ -0,0 +1,154 @@
+"""
+Bulk import of time entries into a case.
+
+Rows come as a JSON array or CSV (header: description,time_spent[,timestamp]).
+All rows are validated before anything is written; then the log IDs are
+reserved with one counter UPDATE, logs and anchors are inserted with one
+executemany each, the case summary is updated once, and every imported log
+is anchored through a single Merkle batch (one chain transaction) whatever
+ANCHOR_MODE is.
+"""
+import csv
+import io
+import json
+import os
+from datetime import datetime, timezone
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from backend.db.database import SessionLocal
+from backend.db.models import Case, ChainAnchor, ProgressLog
+from backend.schemas import ProgressLogImportRow
+from backend.services import summaries
+from backend.services.case_cache import bump_version
+from backend.services.anchoring import create_merkle_batch
+from backend.utils.blockchain import generate_log_hash
+from backend.utils.id_generator import generate_log_ids
+
+
+IMPORT_MAX_ROWS = int(os.getenv("IMPORT_MAX_ROWS", "10000"))
+IMPORT_MAX_ERRORS = 100  # row errors reported back
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Naive timestamps are taken as UTC, like everything stored
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _raw_rows(body: bytes, content_type: str) -> list:
+    try:
+        if "csv" in content_type:
+            reader = csv.DictReader(io.StringIO(body.decode("utf-8-sig")))
+            # Empty cells mean "not given", e.g. a blank timestamp
+            return [{key: value for key, value in row.items() if value not in ("", None)} for row in reader]
+        rows = json.loads(body)
+    except (UnicodeDecodeError, ValueError, csv.Error) as e:
+        raise HTTPException(status_code=400, detail=f"Could not parse import: {e}")
+    if not isinstance(rows, list):
+        raise HTTPException(status_code=400, detail="Expected a JSON array of time entries")
+    return rows
+
+
+def parse_import(body: bytes, content_type: str) -> list:
+    """Validated ProgressLogImportRow list; a 422 lists the failing rows (numbered from 1)."""
+    raw_rows = _raw_rows(body, content_type)
+    if not raw_rows:
+        raise HTTPException(status_code=400, detail="No time entries to import")
+    if len(raw_rows) > IMPORT_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"At most {IMPORT_MAX_ROWS} time entries per import")
+
+    now = datetime.now(timezone.utc)
+    rows, errors = [], []
+    for number, raw in enumerate(raw_rows, start=1):
+        try:
+            row = ProgressLogImportRow.model_validate(raw)
+        except ValidationError as e:
+            errors.append({"row": number, "errors": [
+                f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}" for error in e.errors()
+            ]})
+            continue
+        if row.timestamp and _as_utc(row.timestamp) > now:
+            errors.append({"row": number, "errors": ["timestamp: must not be in the future"]})
+            continue
+        rows.append(row)
+    if errors:
+        raise HTTPException(status_code=422, detail={
+            "msg": f"{len(errors)} of {len(raw_rows)} time entries are invalid; nothing was imported",
+            "errors": errors[:IMPORT_MAX_ERRORS]
+        })
+    return rows
+
+
+def import_logs(db: Session, case: Case, lawyer_id: int, rows: list) -> dict:
+    """Write the validated rows as logs of case in one transaction and queue their anchoring."""
+    now = datetime.now(timezone.utc)
+    ids = generate_log_ids(db, case.id, len(rows))
+
+    logs, log_hashes = [], []
+    for (log_id, sequence), row in zip(ids, rows):
+        timestamp = _as_utc(row.timestamp) if row.timestamp else now
+        logs.append({
+            "id": log_id,
+            "case_id": case.id,
+            "sequence": sequence,
+            "lawyer_id": lawyer_id,
+            "description": row.description,
+            "time_spent": row.time_spent,
+            "timestamp": timestamp,
+            "is_edited": False
+        })
+        log_hashes.append(generate_log_hash(case.id, log_id, row.description, row.time_spent, timestamp))
+    db.execute(insert(ProgressLog), logs)
+
+    batch, proofs = create_merkle_batch(db, case.id, [bytes(log_hash) for log_hash in log_hashes])
+    db.flush()
+    db.execute(insert(ChainAnchor), [
+        {
+            "case_id": case.id,
+            "log_id": log["id"],
+            "kind": "add_log",
+            "mode": "batch",
+            "log_hash": log_hash.hex(),
+            "status": "pending",
+            "batch_id": batch.id,
+            "leaf_index": leaf_index,
+            "proof": proofs[leaf_index],
+            "next_attempt_at": now,
+            "created_at": now
+        }
+        for leaf_index, (log, log_hash) in enumerate(zip(logs, log_hashes))
+    ])
+
+    summaries.record_logs_added(
+        db, case.id, len(logs), sum(log["time_spent"] for log in logs), max(log["timestamp"] for log in logs)
+    )
+    bump_version(db, case.id)
+    db.commit()
+    return {
+        "imported": len(logs),
+        "first_log_id": logs[0]["id"],
+        "last_log_id": logs[-1]["id"],
+        "batch_id": batch.id
+    }
+
+
+def import_into_case(case_id: str, lawyer_id: int, body: bytes, content_type: str) -> dict:
+    """
+    Check the lawyer may import into the case, then parse body and import it,
+    on a session of its own; meant to run in a worker thread.
+    """
+    db = SessionLocal()
+    try:
+        case = db.query(Case).filter(Case.id == case_id, Case.lawyer_id == lawyer_id).first()
+        if not case:
+            raise HTTPException(status_code=404, detail="Case not found or unauthorized")
+        if not case.on_chain_address:
+            raise HTTPException(status_code=400, detail="Case not on blockchain")
+        if case.archived_at:
+            raise HTTPException(status_code=409, detail="Case is archived")
+        return import_logs(db, case, lawyer_id, parse_import(body, content_type))
+    finally:
+        db.close()
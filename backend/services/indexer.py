@@ -0,0 +1,217 @@
+import os
+import threading
+import time
+
+from sqlalchemy.orm import Session
+from web3 import Web3
+
+from backend.db.database import SessionLocal
+from backend.db.models import Case, ChainCursor, ChainEvent, IndexedCase
+from backend.utils import blockchain
+
+
+INDEXER_ENABLED = os.getenv("INDEXER_ENABLED", "true").lower() == "true"
+INDEXER_POLL_SECONDS = float(os.getenv("INDEXER_POLL_SECONDS", "5"))
+INDEXER_START_BLOCK = int(os.getenv("INDEXER_START_BLOCK", "0"))
+INDEXER_REORG_DEPTH = int(os.getenv("INDEXER_REORG_DEPTH", "12"))
+INDEXER_BLOCK_RANGE = max(int(os.getenv("INDEXER_BLOCK_RANGE", "2000")), INDEXER_REORG_DEPTH + 1)
+INDEXER_ADDRESS_CHUNK = int(os.getenv("INDEXER_ADDRESS_CHUNK", "500"))
+INDEXER_RECONCILE_SECONDS = float(os.getenv("INDEXER_RECONCILE_SECONDS", "300"))
+
+CURSOR_NAME = "case_events"
+CASE_EVENTS = ("LogAdded", "StatusUpdated", "CaseClosed", "BatchAnchored")
+
+
+def _case_events():
+    events = blockchain.client.w3.eth.contract(abi=blockchain.load_abi("CaseContract")).events
+    return {getattr(events, name).topic: getattr(events, name)() for name in CASE_EVENTS}
+
+
+def _known_addresses(db: Session) -> list:
+    addresses = {address for (address,) in db.query(IndexedCase.address)}
+    # Cases deployed before the factory emitted CaseCreated
+    addresses.update(
+        address for (address,) in db.query(Case.on_chain_address).filter(Case.on_chain_address.isnot(None))
+    )
+    return sorted(addresses)
+
+
+def _index_factory(db: Session, from_block: int, to_block: int):
+    for event in blockchain.client.factory_contract.events.CaseCreated.get_logs(from_block=from_block, to_block=to_block):
+        db.merge(IndexedCase(
+            address=event["args"]["caseAddress"],
+            case_id=event["args"]["caseId"],
+            deployed_block=event["blockNumber"]
+        ))
+    db.flush()
+
+
+def _entry_counter(db: Session):
+    counts = {}
+
+    def next_index(address, event):
+        key = (address, event)
+        if key not in counts:
+            counts[key] = db.query(ChainEvent).filter(
+                ChainEvent.case_address == address,
+                ChainEvent.event == event
+            ).count()
+        index = counts[key]
+        counts[key] += 1
+        return index
+
+    return next_index
+
+
+def _index_cases(db: Session, addresses: list, from_block: int, to_block: int) -> int:
+    """Mirror CaseContract events of the given addresses in [from_block, to_block]."""
+    events_by_topic = _case_events()
+    next_index = _entry_counter(db)
+
+    raw_logs = []
+    for start in range(0, len(addresses), INDEXER_ADDRESS_CHUNK):
+        raw_logs.extend(blockchain.client.w3.eth.get_logs({
+            "fromBlock": from_block,
+            "toBlock": to_block,
+            "address": addresses[start:start + INDEXER_ADDRESS_CHUNK],
+            "topics": [list(events_by_topic)]
+        }))
+    raw_logs.sort(key=lambda raw: (raw["blockNumber"], raw["logIndex"]))
+
+    for raw in raw_logs:
+        event = events_by_topic[Web3.to_hex(raw["topics"][0])].process_log(raw)
+        args = event["args"]
+        row = ChainEvent(
+            case_address=event["address"],
+            event=event["event"],
+            block_number=event["blockNumber"],
+            block_hash=Web3.to_hex(event["blockHash"]),
+            tx_hash=Web3.to_hex(event["transactionHash"]),
+            log_index=event["logIndex"],
+            chain_timestamp=args["timestamp"]
+        )
+        if event["event"] == "LogAdded":
+            row.entry_index = next_index(row.case_address, "LogAdded")
+            row.event_hash = args["logHash"].hex()
+            row.version = args["version"]
+            row.parent_index = args["parentLogIndex"]
+        elif event["event"] == "StatusUpdated":
+            row.entry_index = next_index(row.case_address, "StatusUpdated")
+            row.event_hash = args["statusHash"].hex()
+        elif event["event"] == "BatchAnchored":
+            row.entry_index = args["batchIndex"]
+            row.event_hash = args["root"].hex()
+            row.batch_size = args["size"]
+        else:
+            row.event_hash = args["finalHash"].hex()
+        db.add(row)
+    db.flush()
+    return len(raw_logs)
+
+
+def scan_once(db: Session) -> bool:
+    """
+    Index one block range past the checkpoint. The last INDEXER_REORG_DEPTH
+    blocks before the checkpoint are dropped and re-read on every pass, so a
+    reorg no deeper than that is replaced by the canonical events.
+    Returns True while the mirror is still behind the chain head.
+    """
+    head = blockchain.client.w3.eth.block_number
+    cursor = db.get(ChainCursor, CURSOR_NAME)
+    if cursor is None:
+        cursor = ChainCursor(name=CURSOR_NAME, block_number=INDEXER_START_BLOCK - 1)
+        db.add(cursor)
+
+    from_block = max(INDEXER_START_BLOCK, cursor.block_number - INDEXER_REORG_DEPTH + 1)
+    to_block = min(head, from_block + INDEXER_BLOCK_RANGE - 1)
+    if from_block > to_block:
+        return False
+
+    db.query(ChainEvent).filter(ChainEvent.block_number >= from_block).delete()
+    db.query(IndexedCase).filter(IndexedCase.deployed_block >= from_block).delete()
+    db.flush()
+
+    # Deployments first, so events of cases created in this range are picked up too
+    _index_factory(db, from_block, to_block)
+    _index_cases(db, _known_addresses(db), from_block, to_block)
+
+    cursor.block_number = to_block
+    db.commit()
+    return to_block < head
+
+
+def reconcile(db: Session) -> list:
+    """
+    Compare the mirrored log and status counts of every case with the
+    contract and re-index any case that disagrees. Returns the addresses fixed.
+    """
+    cursor = db.get(ChainCursor, CURSOR_NAME)
+    if cursor is None:
+        return []
+
+    repaired = []
+    for address in _known_addresses(db):
+        case_contract = blockchain.get_case_contract(address)
+        expected = {
+            "LogAdded": case_contract.functions.getLogCount().call(block_identifier=cursor.block_number),
+            "StatusUpdated": case_contract.functions.getStatusCount().call(block_identifier=cursor.block_number),
+        }
+        mismatched = any(
+            db.query(ChainEvent).filter(ChainEvent.case_address == address, ChainEvent.event == event).count() != count
+            for event, count in expected.items()
+        )
+        if not mismatched:
+            continue
+
+        print(f"⚠️ Chain mirror out of sync for {address}; re-indexing")
+        indexed_case = db.get(IndexedCase, address)
+        start = indexed_case.deployed_block if indexed_case else INDEXER_START_BLOCK
+        db.query(ChainEvent).filter(ChainEvent.case_address == address).delete()
+        for from_block in range(start, cursor.block_number + 1, INDEXER_BLOCK_RANGE):
+            _index_cases(db, [address], from_block, min(from_block + INDEXER_BLOCK_RANGE - 1, cursor.block_number))
+        db.commit()
+        repaired.append(address)
+    return repaired
+
+
+class ChainIndexer:
+    """Background thread that keeps the chain_events mirror up to date."""
+
+    def __init__(self, interval: float = INDEXER_POLL_SECONDS):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._last_reconcile = time.monotonic()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="chain-indexer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 5)
+
+    def _run(self):
+        while not self._stop.is_set():
+            if blockchain.client.w3:
+                db = SessionLocal()
+                try:
+                    # Catch up in consecutive ranges, then wait for new blocks
+                    while scan_once(db) and not self._stop.is_set():
+                        pass
+                    if time.monotonic() - self._last_reconcile > INDEXER_RECONCILE_SECONDS:
+                        reconcile(db)
+                        self._last_reconcile = time.monotonic()
+                except Exception as e:
+                    db.rollback()
+                    print(f"⚠️ Chain indexer error: {e}")
+                finally:
+                    db.close()
+            self._stop.wait(self.interval)
+
+
+chain_indexer = ChainIndexer()
@@ -0,0 +1,221 @@
+"""
+Refresh tokens and the server-side sessions behind them.
+
+/login opens a session and returns a refresh token, "<session id>.<secret>",
+along with the short-lived access token. POST /refresh exchanges the refresh
+token for a new access token and a new refresh token (rotation) without
+checking the password again; the old refresh token stops working. A refresh
+token that was already rotated away has leaked, or two tabs refreshed at
+once: used more than REFRESH_REUSE_GRACE_SECONDS after its rotation, it
+revokes the whole session. POST /logout revokes the session, or every
+session of the user. Access tokens already issued stay valid until they
+expire.
+
+Only a sha256 of the secret is stored. A session expires
+REFRESH_TOKEN_EXPIRE_DAYS after its last refresh.
+
+SESSION_STORE picks where sessions live: "database" (auth_sessions; shared
+by every process and kept across restarts) or "memory" (this process only;
+for development and single-process deployments).
+"""
+import hashlib
+import os
+import secrets
+import threading
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from fastapi import HTTPException
+from sqlalchemy import delete, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.db.models import AuthSession
+
+
+SESSION_STORE = os.getenv("SESSION_STORE", "database")  # "database" or "memory"
+REFRESH_TOKEN_EXPIRE_DAYS = float(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14"))
+REFRESH_REUSE_GRACE_SECONDS = float(os.getenv("REFRESH_REUSE_GRACE_SECONDS", "10"))
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Stored naive, in UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def _digest(secret: str) -> str:
+    return hashlib.sha256(secret.encode()).hexdigest()
+
+
+def _split(token: str):
+    session_id, _, secret = token.partition(".")
+    if not session_id or not secret:
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    return session_id, secret
+
+
+def _expired():
+    return HTTPException(status_code=401, detail="Session expired or signed out; sign in again")
+
+
+def _reused(session_id: str, rotated_at: datetime):
+    """The error for a rotated-away token; True as second value if the session must be revoked."""
+    if rotated_at and _now() - _as_utc(rotated_at) <= timedelta(seconds=REFRESH_REUSE_GRACE_SECONDS):
+        # Most likely a concurrent refresh from another tab of the same client
+        return HTTPException(status_code=401, detail="Refresh token already used"), False
+    print(f"⚠️ Refresh token of session {session_id} reused after rotation; revoking the session")
+    return HTTPException(status_code=401, detail="Refresh token reused; session revoked, sign in again"), True
+
+
+class DatabaseSessionStore:
+    """Sessions in the auth_sessions table. Each method commits."""
+
+    async def create(self, db: AsyncSession, user_id: int) -> str:
+        now = _now()
+        # Keep the table compact: the user's dead sessions go when a new one starts
+        await db.execute(delete(AuthSession).where(
+            AuthSession.user_id == user_id,
+            or_(AuthSession.expires_at <= now, AuthSession.revoked_at.is_not(None))
+        ))
+        session_id, secret = uuid4().hex, secrets.token_urlsafe(32)
+        db.add(AuthSession(
+            id=session_id,
+            user_id=user_id,
+            token_hash=_digest(secret),
+            created_at=now,
+            expires_at=now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+        ))
+        await db.commit()
+        return f"{session_id}.{secret}"
+
+    async def rotate(self, db: AsyncSession, token: str):
+        """(user id, new refresh token) for a current refresh token."""
+        session_id, secret = _split(token)
+        digest = _digest(secret)
+        row = await db.get(AuthSession, session_id)
+        now = _now()
+        if row is None or row.revoked_at is not None or _as_utc(row.expires_at) <= now:
+            await db.commit()
+            raise _expired()
+        if digest == row.previous_token_hash:
+            error, revoke = _reused(session_id, row.rotated_at)
+            if revoke:
+                row.revoked_at = now
+            await db.commit()
+            raise error
+        if digest != row.token_hash:
+            await db.commit()
+            raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+        new_secret = secrets.token_urlsafe(32)
+        # Conditional on the current hash, so of two concurrent refreshes only one rotates
+        result = await db.execute(
+            update(AuthSession)
+            .where(AuthSession.id == session_id, AuthSession.token_hash == digest)
+            .values(
+                token_hash=_digest(new_secret),
+                previous_token_hash=digest,
+                rotated_at=now,
+                expires_at=now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        if result.rowcount != 1:
+            raise HTTPException(status_code=401, detail="Refresh token already used")
+        return row.user_id, f"{session_id}.{new_secret}"
+
+    async def revoke(self, db: AsyncSession, token: str, everywhere: bool = False) -> int:
+        """Revoke the session of token (or every session of its user); returns the user id."""
+        session_id, secret = _split(token)
+        row = await db.get(AuthSession, session_id)
+        if row is None or _digest(secret) not in (row.token_hash, row.previous_token_hash):
+            await db.commit()
+            raise HTTPException(status_code=401, detail="Invalid refresh token")
+        which = AuthSession.user_id == row.user_id if everywhere else AuthSession.id == session_id
+        await db.execute(
+            update(AuthSession)
+            .where(which, AuthSession.revoked_at.is_(None))
+            .values(revoked_at=_now())
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return row.user_id
+
+
+class MemorySessionStore:
+    """Sessions in a dict of this process; same behaviour as DatabaseSessionStore, db is not used."""
+
+    def __init__(self):
+        self._sessions = {}  # session id -> dict of the AuthSession columns
+        self._ids_by_user = {}
+        self._lock = threading.Lock()
+
+    async def create(self, db, user_id: int) -> str:
+        now = _now()
+        session_id, secret = uuid4().hex, secrets.token_urlsafe(32)
+        with self._lock:
+            ids = self._ids_by_user.setdefault(user_id, set())
+            for dead in [i for i in ids if self._sessions[i]["revoked_at"] or self._sessions[i]["expires_at"] <= now]:
+                ids.discard(dead)
+                del self._sessions[dead]
+            self._sessions[session_id] = {
+                "user_id": user_id,
+                "token_hash": _digest(secret),
+                "previous_token_hash": None,
+                "rotated_at": None,
+                "expires_at": now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+                "revoked_at": None,
+            }
+            ids.add(session_id)
+        return f"{session_id}.{secret}"
+
+    async def rotate(self, db, token: str):
+        session_id, secret = _split(token)
+        digest = _digest(secret)
+        now = _now()
+        with self._lock:
+            row = self._sessions.get(session_id)
+            if row is None or row["revoked_at"] or row["expires_at"] <= now:
+                raise _expired()
+            if digest == row["previous_token_hash"]:
+                error, revoke = _reused(session_id, row["rotated_at"])
+                if revoke:
+                    row["revoked_at"] = now
+                raise error
+            if digest != row["token_hash"]:
+                raise HTTPException(status_code=401, detail="Invalid refresh token")
+            new_secret = secrets.token_urlsafe(32)
+            row.update(
+                token_hash=_digest(new_secret),
+                previous_token_hash=digest,
+                rotated_at=now,
+                expires_at=now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+            )
+            return row["user_id"], f"{session_id}.{new_secret}"
+
+    async def revoke(self, db, token: str, everywhere: bool = False) -> int:
+        session_id, secret = _split(token)
+        now = _now()
+        with self._lock:
+            row = self._sessions.get(session_id)
+            if row is None or _digest(secret) not in (row["token_hash"], row["previous_token_hash"]):
+                raise HTTPException(status_code=401, detail="Invalid refresh token")
+            ids = self._ids_by_user.get(row["user_id"], ()) if everywhere else (session_id,)
+            for i in ids:
+                self._sessions[i]["revoked_at"] = self._sessions[i]["revoked_at"] or now
+            return row["user_id"]
+
+
+def make_session_store(kind: str = SESSION_STORE):
+    if kind == "database":
+        return DatabaseSessionStore()
+    if kind == "memory":
+        return MemorySessionStore()
+    raise ValueError(f"Unknown SESSION_STORE '{kind}'; use 'database' or 'memory'")
+
+
+session_store = make_session_store()
@@ -0,0 +1,235 @@
+"""
+Per-case aggregates in case_summaries.
+
+The summary row is updated in the same transaction as the write it reflects
+(a log added or edited, a status change), so /case_summary is a single row
+read instead of an aggregate over progress_logs. Counters are bumped with a
+SQL-side UPDATE so concurrent writers cannot lose increments.
+
+    python -m backend.services.summaries check          # report summaries that drifted
+    python -m backend.services.summaries check --fix    # ... and rebuild them
+    python -m backend.services.summaries rebuild [CASE_ID ...]
+"""
+import argparse
+import json
+import sys
+from datetime import datetime, timezone
+
+from sqlalchemy import case as sql_case, func, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from backend.db.database import SessionLocal
+from backend.db.models import Case, CaseSummary, ProgressLog, case_tables
+from backend.services.case_cache import bump_version
+
+
+def _utc(value: datetime):
+    # SQLite hands datetimes back naive; they were written as UTC
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def compute_summary(db: Session, case: Case) -> dict:
+    """The summary values of a case, recomputed from the source tables (or the archive tables)."""
+    Log, History, StatusChange, _ = case_tables(case)
+    total_logs, total_time_spent, last_log_at = db.query(
+        func.count(Log.id), func.sum(Log.time_spent), func.max(Log.timestamp)
+    ).filter(Log.case_id == case.id).one()
+    edit_count, last_edit_at = db.query(
+        func.count(History.id), func.max(History.edited_at)
+    ).join(Log, Log.id == History.log_id).filter(Log.case_id == case.id).one()
+
+    changes = db.query(StatusChange).filter(
+        StatusChange.case_id == case.id
+    ).order_by(StatusChange.changed_at, StatusChange.id).all()
+    durations = {}
+    since = _utc(case.created_at)
+    for change in changes:
+        changed_at = _utc(change.changed_at)
+        durations[change.old_status] = durations.get(change.old_status, 0) + (changed_at - since).total_seconds()
+        since = changed_at
+
+    activity = [_utc(at) for at in (case.created_at, last_log_at, last_edit_at) if at is not None] + [since]
+    return {
+        "total_logs": total_logs,
+        "total_time_spent": total_time_spent or 0,
+        "edit_count": edit_count,
+        "last_activity_at": max(activity),
+        "status_since": since,
+        "status_durations": json.dumps(durations)
+    }
+
+
+def rebuild_summary(db: Session, case: Case) -> CaseSummary:
+    """Recompute the summary of a case and write it, creating the row if needed."""
+    db.flush()
+    values = compute_summary(db, case)
+    bump_version(db, case.id)
+    summary = db.query(CaseSummary).filter(CaseSummary.case_id == case.id).first()
+    if summary:
+        for name, value in values.items():
+            setattr(summary, name, value)
+        return summary
+
+    try:
+        with db.begin_nested():
+            db.add(CaseSummary(case_id=case.id, summary_text="", **values))
+    except IntegrityError:
+        # Another writer created the row first; ours has the same values
+        pass
+    return db.query(CaseSummary).filter(CaseSummary.case_id == case.id).one()
+
+
+def create_summary(db: Session, case: Case) -> CaseSummary:
+    """Summary row of a new case; case must be flushed so created_at is set."""
+    summary = CaseSummary(
+        case_id=case.id,
+        summary_text="",
+        total_logs=0,
+        total_time_spent=0,
+        edit_count=0,
+        last_activity_at=case.created_at,
+        status_since=case.created_at,
+        status_durations="{}"
+    )
+    db.add(summary)
+    return summary
+
+
+def get_summary(db: Session, case: Case) -> CaseSummary:
+    """The summary of a case; rows missing or written before the summary columns existed are rebuilt."""
+    summary = case.summary  # eager-load Case.summary to make this free
+    if summary is None or summary.status_since is None:
+        summary = rebuild_summary(db, case)
+        db.commit()
+    return summary
+
+
+def _bump(db: Session, case_id: str, **values) -> bool:
+    result = db.execute(update(CaseSummary).where(CaseSummary.case_id == case_id).values(**values))
+    return result.rowcount > 0
+
+
+def record_log_added(db: Session, log: ProgressLog):
+    record_logs_added(db, log.case_id, 1, log.time_spent, log.timestamp)
+
+
+def record_logs_added(db: Session, case_id: str, count: int, time_spent: int, latest: datetime):
+    """count new logs of a case (e.g. an import) totalling time_spent, the newest stamped latest."""
+    if not _bump(
+        db,
+        case_id,
+        total_logs=CaseSummary.total_logs + count,
+        total_time_spent=CaseSummary.total_time_spent + time_spent,
+        # Imported logs can be older than the last activity
+        last_activity_at=sql_case(
+            (CaseSummary.last_activity_at > latest, CaseSummary.last_activity_at), else_=latest
+        )
+    ):
+        rebuild_summary(db, db.get(Case, case_id))
+
+
+def record_log_edited(db: Session, log: ProgressLog, old_time_spent: int, edited_at: datetime):
+    if not _bump(
+        db,
+        log.case_id,
+        total_time_spent=CaseSummary.total_time_spent + (log.time_spent - old_time_spent),
+        edit_count=CaseSummary.edit_count + 1,
+        last_activity_at=edited_at
+    ):
+        rebuild_summary(db, log.case)
+
+
+def record_status_change(db: Session, case: Case, old_status: str, changed_at: datetime):
+    """Close the period spent in old_status; call with the changed_at of the CaseStatusChange row."""
+    summary = db.query(CaseSummary).filter(CaseSummary.case_id == case.id).with_for_update().first()
+    if summary is None or summary.status_since is None:
+        rebuild_summary(db, case)
+        return
+    durations = json.loads(summary.status_durations or "{}")
+    elapsed = (_utc(changed_at) - _utc(summary.status_since)).total_seconds()
+    durations[old_status] = durations.get(old_status, 0) + elapsed
+    summary.status_durations = json.dumps(durations)
+    summary.status_since = changed_at
+    summary.last_activity_at = changed_at
+
+
+def status_durations(summary: CaseSummary, status: str, now: datetime = None) -> dict:
+    """Seconds spent in each status, including the time so far in the current one."""
+    durations = json.loads(summary.status_durations or "{}")
+    now = now or datetime.now(timezone.utc)
+    durations[status] = durations.get(status, 0) + (now - _utc(summary.status_since)).total_seconds()
+    return {name: round(seconds) for name, seconds in durations.items()}
+
+
+def _drift(stored: CaseSummary, expected: dict) -> list:
+    fields = []
+    for name in ("total_logs", "total_time_spent", "edit_count"):
+        if getattr(stored, name) != expected[name]:
+            fields.append(name)
+    for name in ("last_activity_at", "status_since"):
+        value = _utc(getattr(stored, name))
+        if value is None or abs((value - expected[name]).total_seconds()) > 1:
+            fields.append(name)
+    stored_durations = json.loads(stored.status_durations or "{}")
+    expected_durations = json.loads(expected["status_durations"])
+    if stored_durations.keys() != expected_durations.keys() or any(
+        abs(stored_durations[name] - seconds) > 1 for name, seconds in expected_durations.items()
+    ):
+        fields.append("status_durations")
+    return fields
+
+
+def check_summaries(db: Session, fix: bool = False) -> dict:
+    """
+    Compare every stored summary with one recomputed from the source tables.
+    Returns {case_id: [drifted fields]}; with fix=True the drifted rows are rebuilt.
+    """
+    drifted = {}
+    for case in db.query(Case).order_by(Case.id).yield_per(500):
+        stored = db.query(CaseSummary).filter(CaseSummary.case_id == case.id).first()
+        fields = _drift(stored, compute_summary(db, case)) if stored else ["missing"]
+        if fields:
+            drifted[case.id] = fields
+    if fix:
+        for case_id in drifted:
+            rebuild_summary(db, db.get(Case, case_id))
+        db.commit()
+    return drifted
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m backend.services.summaries")
+    sub = parser.add_subparsers(dest="command", required=True)
+    check = sub.add_parser("check")
+    check.add_argument("--fix", action="store_true", help="rebuild the summaries that drifted")
+    rebuild = sub.add_parser("rebuild")
+    rebuild.add_argument("case_ids", nargs="*", help="cases to rebuild; all cases when omitted")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        if args.command == "check":
+            drifted = check_summaries(db, fix=args.fix)
+            for case_id, fields in drifted.items():
+                print(f"⚠️ {case_id}: {', '.join(fields)}{' (rebuilt)' if args.fix else ''}")
+            if not drifted:
+                print("✅ All case summaries match their logs")
+            sys.exit(1 if drifted and not args.fix else 0)
+
+        query = db.query(Case)
+        if args.case_ids:
+            query = query.filter(Case.id.in_(args.case_ids))
+        cases = query.order_by(Case.id).all()
+        for case in cases:
+            rebuild_summary(db, case)
+        db.commit()
+        print(f"✅ Rebuilt {len(cases)} case summaries")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,378 @@
+import asyncio
+import json
+import os
+import time
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, joinedload
+
+from backend.db.database import SessionLocal
+from backend.db.models import HOT_TABLES, CaseTables, ChainAnchor, ChainEvent, ProgressLog
+from backend.utils import blockchain_async
+from backend.utils.blockchain import LOG_READ_PAGE_SIZE, generate_log_hash
+from backend.utils.merkle import decode_proof, verify_merkle_proof
+
+
+VERIFY_CHUNK_SIZE = int(os.getenv("VERIFY_CHUNK_SIZE", "500"))
+VERIFY_CONCURRENCY = int(os.getenv("VERIFY_CONCURRENCY", "8"))
+
+
+class NotIndexedError(LookupError):
+    """A confirmed anchor the chain indexer has not mirrored yet."""
+
+
+def latest_anchors(db: Session, case_id: str, log_ids: list = None, tables: CaseTables = HOT_TABLES) -> dict:
+    """Map log_id -> (latest anchor, number of anchored versions) for a case (or some of its logs)."""
+    Anchor = tables.anchor
+    query = db.query(Anchor).options(joinedload(Anchor.batch)).filter(Anchor.case_id == case_id)
+    if log_ids is not None:
+        query = query.filter(Anchor.log_id.in_(log_ids))
+    anchors = query.order_by(Anchor.id).all()
+    result = {}
+    for anchor in anchors:
+        _, versions = result.get(anchor.log_id, (None, 0))
+        result[anchor.log_id] = (anchor, versions + 1)
+    return result
+
+
+def latest_anchor(db: Session, log_id: str, tables: CaseTables = HOT_TABLES):
+    """(latest anchor, number of anchored versions) for a single log."""
+    Anchor = tables.anchor
+    anchors = db.query(Anchor).options(joinedload(Anchor.batch)).filter(
+        Anchor.log_id == log_id
+    ).order_by(Anchor.id).all()
+    if not anchors:
+        return None, 0
+    return anchors[-1], len(anchors)
+
+
+def chain_index_to_log_id(db: Session, logs, tables: CaseTables = HOT_TABLES) -> dict:
+    """Map on-chain log index -> log ID for the original (version 1) entry of each log."""
+    index_to_log_id = {log_sequence(log) - 1: log.id for log in logs}
+    if logs:
+        Anchor = tables.anchor
+        originals = db.query(Anchor).filter(
+            Anchor.case_id == logs[0].case_id,
+            Anchor.kind == "add_log",
+            Anchor.chain_index.isnot(None)
+        )
+        for anchor in originals:
+            index_to_log_id[anchor.chain_index] = anchor.log_id
+    return index_to_log_id
+
+
+def log_sequence(log: ProgressLog) -> int:
+    # Rows written before the sequence column existed carry it in the ID suffix
+    return log.sequence if log.sequence is not None else int(log.id.split('-')[-1])
+
+
+def log_chain_index(log: ProgressLog, anchor: ChainAnchor = None) -> int:
+    if anchor and anchor.chain_index is not None:
+        return anchor.chain_index
+    # logs are stored in order, log index = sequence - 1
+    return log_sequence(log) - 1
+
+
+def chain_read(log: ProgressLog, anchor: ChainAnchor = None):
+    """
+    The on-chain entry verify_log_entry needs for a log: ("log", index),
+    ("batch", batch_index), or None when the anchor is not confirmed yet.
+    """
+    if anchor and anchor.status != "confirmed":
+        return None
+    if anchor and anchor.mode == "batch":
+        return "batch", anchor.batch.batch_index
+    return "log", log_chain_index(log, anchor)
+
+
+def verify_log_entry(case_contract, log: ProgressLog, anchor: ChainAnchor = None, versions: int = 1,
+                     batch_roots: dict = None, chain_logs: list = None):
+    """
+    Recompute a log's hash and check it against what is anchored on-chain:
+    the entry in CaseContract.logs for direct anchors, or inclusion in the
+    batch root for Merkle-batched anchors. chain_logs, when given, is the
+    prefetched logs array and saves the per-log getLog call. Logs not
+    checked yet carry an anchor_status: that of an unconfirmed anchor, or
+    "not_indexed" when the mirror has not caught up with a confirmed one.
+    Returns (log_data, parent_log_index or None).
+    """
+    recomputed_hash = generate_log_hash(log.case_id, log.id, log.description, log.time_spent, log.timestamp)
+
+    def unchecked(anchor_status: str):
+        return {
+            "log_id": log.id,
+            "verified": False,
+            "recomputed_hash": recomputed_hash.hex(),
+            "anchor_status": anchor_status,
+            "version": versions
+        }, None
+
+    if anchor and anchor.status != "confirmed":
+        return unchecked(anchor.status)
+
+    if anchor and anchor.mode == "batch":
+        batch_index = anchor.batch.batch_index
+        if batch_roots is None:
+            batch_roots = {}
+        if batch_index not in batch_roots:
+            try:
+                batch_roots[batch_index] = case_contract.functions.getBatch(batch_index).call()[0]
+            except NotIndexedError:
+                return unchecked("not_indexed")  # the mirror lags the chain; pending, not failed
+        root = batch_roots[batch_index]
+        proof = decode_proof(anchor.proof)
+        return {
+            "log_id": log.id,
+            "verified": verify_merkle_proof(recomputed_hash, proof, root),
+            "merkle_root": root.hex(),
+            "recomputed_hash": recomputed_hash.hex(),
+            "batch_index": batch_index,
+            "leaf_index": anchor.leaf_index,
+            "proof": [p.hex() for p in proof],
+            "version": versions
+        }, None
+
+    log_index = log_chain_index(log, anchor)
+    if chain_logs is not None and log_index < len(chain_logs):
+        log_hash_on_chain, _, version, parent_index = chain_logs[log_index]
+    else:
+        try:
+            log_hash_on_chain, _, version, parent_index = case_contract.functions.getLog(log_index).call()
+        except NotIndexedError:
+            return unchecked("not_indexed")
+    log_data = {
+        "log_id": log.id,
+        "verified": recomputed_hash == log_hash_on_chain,
+        "on_chain_hash": log_hash_on_chain.hex(),
+        "recomputed_hash": recomputed_hash.hex(),
+        "version": version
+    }
+    return log_data, (parent_index if version > 1 else None)
+
+
+class _MirrorCall:
+    def __init__(self, fetch):
+        self._fetch = fetch
+
+    def call(self):
+        return self._fetch()
+
+
+class _MirrorFunctions:
+    def __init__(self, db: Session, address: str):
+        self._db = db
+        self._address = address
+
+    def _event(self, event: str, index: int) -> ChainEvent:
+        row = self._db.query(ChainEvent).filter(
+            ChainEvent.case_address == self._address,
+            ChainEvent.event == event,
+            ChainEvent.entry_index == index
+        ).first()
+        if not row:
+            raise NotIndexedError(f"{event} #{index} of {self._address} is not indexed yet")
+        return row
+
+    def getLog(self, index):
+        def fetch():
+            row = self._event("LogAdded", index)
+            return bytes.fromhex(row.event_hash), row.chain_timestamp, row.version, row.parent_index
+        return _MirrorCall(fetch)
+
+    def getBatch(self, index):
+        def fetch():
+            row = self._event("BatchAnchored", index)
+            return bytes.fromhex(row.event_hash), row.batch_size, row.chain_timestamp
+        return _MirrorCall(fetch)
+
+
+class MirrorCaseContract:
+    """
+    Read-only stand-in for a CaseContract that answers getLog/getBatch from
+    the chain_events mirror kept by the chain indexer, so audits run at DB speed.
+    """
+
+    def __init__(self, db: Session, address: str):
+        self.address = address
+        self.functions = _MirrorFunctions(db, address)
+
+
+class _PrefetchedFunctions:
+    def __init__(self, logs: dict, batches: dict):
+        self._logs = logs
+        self._batches = batches
+
+    @staticmethod
+    def _entry(entries: dict, kind: str, index: int):
+        if index not in entries:
+            raise LookupError(f"{kind} #{index} was not fetched")
+        return entries[index]
+
+    def getLog(self, index):
+        return _MirrorCall(lambda: self._entry(self._logs, "log", index))
+
+    def getBatch(self, index):
+        return _MirrorCall(lambda: self._entry(self._batches, "batch", index))
+
+
+class PrefetchedCaseContract:
+    """
+    Stand-in for a CaseContract that answers getLog/getBatch from entries
+    already read with the async helpers, so verify_log_entry stays synchronous.
+    """
+
+    def __init__(self, address: str, logs: dict = None, batches: dict = None):
+        self.address = address
+        self.functions = _PrefetchedFunctions(logs or {}, batches or {})
+
+
+def mirror_case_logs(db: Session, address: str) -> list:
+    """The mirrored CaseContract.logs array, in the same shape as get_case_logs_on_chain."""
+    rows = db.query(ChainEvent).filter(
+        ChainEvent.case_address == address,
+        ChainEvent.event == "LogAdded"
+    ).order_by(ChainEvent.entry_index).all()
+    return [(bytes.fromhex(r.event_hash), r.chain_timestamp, r.version, r.parent_index) for r in rows]
+
+
+def _load_chunk(db: Session, case_id: str, after: ProgressLog = None, tables: CaseTables = HOT_TABLES):
+    """Next VERIFY_CHUNK_SIZE logs of a case in (timestamp, sequence) order, with their anchors."""
+    Log = tables.log
+    query = db.query(Log).filter(Log.case_id == case_id)
+    if after is not None:
+        query = query.filter(or_(
+            Log.timestamp > after.timestamp,
+            and_(Log.timestamp == after.timestamp, Log.sequence > after.sequence)
+        ))
+    logs = query.order_by(Log.timestamp, Log.sequence).limit(VERIFY_CHUNK_SIZE).all()
+    anchors = latest_anchors(db, case_id, [log.id for log in logs], tables) if logs else {}
+    return logs, anchors
+
+
+def _index_ranges(indexes: list):
+    """Split sorted indexes into [start, end) runs of at most LOG_READ_PAGE_SIZE consecutive entries."""
+    ranges = []
+    for index in indexes:
+        if ranges and index == ranges[-1][1] and index - ranges[-1][0] < LOG_READ_PAGE_SIZE:
+            ranges[-1][1] = index + 1
+        else:
+            ranges.append([index, index + 1])
+    return ranges
+
+
+async def _fetch_chunk(case_address: str, logs: list, anchors: dict, batch_roots: dict,
+                       semaphore: asyncio.Semaphore) -> PrefetchedCaseContract:
+    """Read the on-chain entries a chunk needs, at most VERIFY_CONCURRENCY calls at a time."""
+    reads = {chain_read(log, anchors.get(log.id, (None, 1))[0]) for log in logs}
+    log_indexes = sorted(read[1] for read in reads if read and read[0] == "log")
+    batch_indexes = sorted({read[1] for read in reads if read and read[0] == "batch"} - batch_roots.keys())
+
+    async def limited(fetch, *args):
+        async with semaphore:
+            return await fetch(case_address, *args)
+
+    pages, roots = await asyncio.gather(
+        asyncio.gather(*(limited(blockchain_async.get_case_logs_on_chain, start, end)
+                         for start, end in _index_ranges(log_indexes))),
+        asyncio.gather(*(limited(blockchain_async.get_batch, index) for index in batch_indexes))
+    )
+    chain_logs = {}
+    for (start, _), page in zip(_index_ranges(log_indexes), pages):
+        chain_logs.update(enumerate(page, start))
+    for index, batch in zip(batch_indexes, roots):
+        batch_roots[index] = batch[0]
+    return PrefetchedCaseContract(case_address, chain_logs)
+
+
+def _group_ids(db: Session, case_id: str, logs: list, parents: dict, tables: CaseTables = HOT_TABLES) -> dict:
+    """Map log_id -> log_id of the original an edit belongs to, for the edits in parents."""
+    wanted = set(parents.values())
+    index_to_log_id = {}
+    if wanted:
+        Anchor = tables.anchor
+        originals = db.query(Anchor.chain_index, Anchor.log_id).filter(
+            Anchor.case_id == case_id,
+            Anchor.kind == "add_log",
+            Anchor.chain_index.in_(wanted)
+        )
+        index_to_log_id = {index: log_id for index, log_id in originals}
+        for log in logs:
+            index_to_log_id.setdefault(log_chain_index(log), log.id)
+    return {log_id: index_to_log_id.get(parent, log_id) for log_id, parent in parents.items()}
+
+
+async def stream_case_verification(case_id: str, case_address: str, source: str = "chain",
+                                   tables: CaseTables = HOT_TABLES):
+    """
+    Verify every log of a case and yield one NDJSON line per log as soon as
+    its chunk is checked, then a summary line. Logs are read in chunks of
+    VERIFY_CHUNK_SIZE on a session of its own; while one chunk is being
+    verified, the chain entries of the next are already being fetched.
+    The session is only used in worker threads, one call at a time, so the
+    event loop never waits on the database.
+    """
+    started = time.monotonic()
+    counts = {"total": 0, "verified": 0, "failed": 0, "pending": 0}
+    db = SessionLocal()
+    next_fetch = None
+    try:
+        semaphore = asyncio.Semaphore(VERIFY_CONCURRENCY)
+        batch_roots = {}  # each batch root is fetched from the chain once
+
+        def fetch(logs, anchors):
+            if source == "mirror":
+                return None
+            return asyncio.ensure_future(_fetch_chunk(case_address, logs, anchors, batch_roots, semaphore))
+
+        def verify(case_contract, logs, anchors):
+            results, parents = [], {}
+            for log in logs:
+                anchor, versions = anchors.get(log.id, (None, 1))
+                log_data, parent_index = verify_log_entry(case_contract, log, anchor, versions, batch_roots)
+                results.append(log_data)
+                if parent_index is not None:
+                    parents[log.id] = parent_index
+            return results, parents
+
+        logs, anchors = await asyncio.to_thread(_load_chunk, db, case_id, None, tables)
+        pending_fetch = fetch(logs, anchors) if logs else None
+        while logs:
+            next_logs, next_anchors = await asyncio.to_thread(_load_chunk, db, case_id, logs[-1], tables)
+            next_fetch = fetch(next_logs, next_anchors) if next_logs else None
+            try:
+                if source == "mirror":
+                    # The mirror answers from the database
+                    results, parents = await asyncio.to_thread(
+                        verify, MirrorCaseContract(db, case_address), logs, anchors
+                    )
+                else:
+                    results, parents = verify(await pending_fetch, logs, anchors)
+            except Exception as e:
+                yield json.dumps({"type": "error", "detail": f"Failed to fetch logs from blockchain: {e}"}) + "\n"
+                break
+            group_ids = await asyncio.to_thread(_group_ids, db, case_id, logs, parents, tables)
+
+            for log_data in results:
+                counts["total"] += 1
+                if "anchor_status" in log_data:
+                    counts["pending"] += 1
+                elif log_data["verified"]:
+                    counts["verified"] += 1
+                else:
+                    counts["failed"] += 1
+                line = {"type": "log", "group_id": group_ids.get(log_data["log_id"], log_data["log_id"]), **log_data}
+                yield json.dumps(line) + "\n"
+
+            logs, anchors, pending_fetch = next_logs, next_anchors, next_fetch
+
+        yield json.dumps({
+            "type": "summary",
+            "case_id": case_id,
+            **counts,
+            "elapsed_ms": round((time.monotonic() - started) * 1000)
+        }) + "\n"
+    finally:
+        # The client may have gone away mid-stream
+        if next_fetch:
+            next_fetch.cancel()
+        db.close()
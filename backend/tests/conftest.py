@@ -0,0 +1,77 @@
+"""
+The app on a throwaway SQLite database, with no chain and no background
+workers, and a case of a lawyer and a client with a few logs.
+"""
+import atexit
+import os
+import shutil
+import tempfile
+
+_db_dir = tempfile.mkdtemp(prefix="case-tests-")
+atexit.register(shutil.rmtree, _db_dir, ignore_errors=True)
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ["ANCHOR_WORKER_ENABLED"] = "false"
+os.environ["INDEXER_ENABLED"] = "false"
+os.environ["AUDIT_GRANT_SWEEPER_ENABLED"] = "false"
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.db.database import SessionLocal
+from backend.db.models import Case, CaseSummary
+from backend.main import app
+from backend.services import summaries
+from backend.services.case_cache import response_cache
+from backend.utils.security import principal_cache
+
+
+def _sign_up(client: TestClient, email: str, role: str) -> dict:
+    response = client.post("/register", json={"email": email, "password": "pw", "role": role})
+    assert response.status_code == 200, response.text
+    response = client.post("/login", json={"email": email, "password": "pw"})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def lawyer(client):
+    return _sign_up(client, "lawyer@example.com", "lawyer")
+
+
+@pytest.fixture(scope="session")
+def case_id(client, lawyer):
+    """An active on-chain case with three logs."""
+    client_auth = _sign_up(client, "client@example.com", "client")
+    client_id = client.get("/me", headers=client_auth).json()["id"]
+    lawyer_id = client.get("/me", headers=lawyer).json()["id"]
+
+    db = SessionLocal()
+    try:
+        case = Case(id="C-1-2-01", title="Case", lawyer_id=lawyer_id, client_id=client_id, status="active",
+                    on_chain_address="0x" + "11" * 20)
+        db.add(case)
+        db.flush()
+        summaries.create_summary(db, case)
+        db.commit()
+    finally:
+        db.close()
+
+    for i in range(3):
+        response = client.post("/log_progress", json={"case_id": "C-1-2-01", "description": f"log {i}",
+                                                      "time_spent": 10}, headers=lawyer)
+        assert response.status_code == 200, response.text
+    return "C-1-2-01"
+
+
+@pytest.fixture(autouse=True)
+def cold_caches():
+    """Each test starts without cached principals or responses."""
+    principal_cache.clear()
+    response_cache.clear()
+    yield
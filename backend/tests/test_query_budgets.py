@@ -0,0 +1,55 @@
+"""
+Statement budgets of the hot endpoints. A change that adds a query to one
+of them (an N+1 over logs, a lazy load in a response model, an extra check)
+fails here; raise a budget only on purpose.
+"""
+from backend.utils.query_stats import count_queries
+
+
+def _statements(client, url: str, headers: dict):
+    with count_queries() as stats:
+        response = client.get(url, headers=headers)
+    assert response.status_code in (200, 304), response.text
+    return response, stats
+
+
+def _warm_up(client, headers: dict):
+    # Load the caller's principal so the budgets below are the route's own
+    client.get("/me", headers=headers)
+
+
+def test_auth_dependency_reads_the_user_once_then_serves_from_cache(client, lawyer):
+    _, cold = _statements(client, "/me", lawyer)
+    _, warm = _statements(client, "/me", lawyer)
+    assert cold.count <= 1, cold.statements
+    assert warm.count == 0, warm.statements
+
+
+def test_case_summary(client, lawyer, case_id):
+    _warm_up(client, lawyer)
+    _, first = _statements(client, f"/case_summary/{case_id}", lawyer)
+    _, cached = _statements(client, f"/case_summary/{case_id}", lawyer)
+    assert first.count <= 1, first.statements
+    assert cached.count <= 1, cached.statements
+
+
+def test_case_logs(client, lawyer, case_id):
+    _warm_up(client, lawyer)
+    # The case row, then one page of logs, whatever the page holds
+    for url in (f"/case_logs/{case_id}", f"/case_logs/{case_id}?limit=1", f"/case_logs/{case_id}?view=lite"):
+        _, stats = _statements(client, url, lawyer)
+        assert stats.count <= 2, (url, stats.statements)
+
+
+def test_case_logs_cached_and_not_modified(client, lawyer, case_id):
+    _warm_up(client, lawyer)
+    response, _ = _statements(client, f"/case_logs/{case_id}", lawyer)
+    # Only the case row: for the version in the cache key and the ETag
+    _, cached = _statements(client, f"/case_logs/{case_id}", lawyer)
+    assert cached.count <= 1, cached.statements
+
+    response, not_modified = _statements(
+        client, f"/case_logs/{case_id}", {**lawyer, "If-None-Match": response.headers["ETag"]}
+    )
+    assert response.status_code == 304
+    assert not_modified.count <= 1, not_modified.statements
@@ -1,122 +1,331 @@
-from web3 import Web3
-import json
-import os
-from dotenv import load_dotenv
-from fastapi import HTTPException
-from datetime import datetime
-
-
-# Load environment variables
-load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), "..", ".env"))
-
-# Paths
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # backend/
-ARTIFACTS_DIR = os.path.join(BASE_DIR, "artifacts")
-
-# Env variables
-WEB3_PROVIDER = os.getenv("WEB3_PROVIDER")
-PRIVATE_KEY = os.getenv("PRIVATE_KEY")
-FACTORY_ADDRESS = os.getenv("FACTORY_ADDRESS")
-
-if not WEB3_PROVIDER or not PRIVATE_KEY or not FACTORY_ADDRESS:
-    raise ValueError("Missing one or more required environment variables: WEB3_PROVIDER, PRIVATE_KEY, FACTORY_ADDRESS")
-
-# Load ABIs
-with open(os.path.join(ARTIFACTS_DIR, "CaseFactory.json"), "r") as f:
-    FACTORY_ABI = json.load(f)["abi"]
-
-with open(os.path.join(ARTIFACTS_DIR, "CaseContract.json"), "r") as f:
-    CASE_ABI = json.load(f)["abi"]
-
-w3 = None
-factory_contract = None
-try:
-    temp_w3 = Web3(Web3.HTTPProvider(WEB3_PROVIDER))
-    if temp_w3.is_connected():
-        w3 = temp_w3
-        factory_contract = w3.eth.contract(address=FACTORY_ADDRESS, abi=FACTORY_ABI)
-        print("✅ Connected to Ethereum")
-    else:
-        print("⚠️ Blockchain not reachable. Blockchain features disabled.")
-except Exception as e:
-    print(f"⚠️ Blockchain init failed: {e}")
-    
-def ensure_blockchain():
-    if not w3 or not factory_contract:
-        raise HTTPException(status_code=503, detail="Blockchain service unavailable. Please try again later.")
-
-
-def _build_and_send_tx(contract_fn, acct, **kwargs):
-    """Helper to build, sign, and send a transaction."""
-    tx = contract_fn.build_transaction({
-        'from': acct.address,
-        'nonce': w3.eth.get_transaction_count(acct.address),
-        'gas': kwargs.get('gas', 300000),
-        'gasPrice': w3.eth.gas_price
-    })
-    signed_tx = w3.eth.account.sign_transaction(tx, PRIVATE_KEY)
-    tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)  # v6 uses raw_transaction
-    return w3.eth.wait_for_transaction_receipt(tx_hash)
-
-
-def create_case_on_chain(case_id, lawyer_email, client_email):
-    acct = w3.eth.account.from_key(PRIVATE_KEY)
-    case_contract = factory_contract
-    hashed_lawyer = Web3.keccak(text=lawyer_email)
-    hashed_client = Web3.keccak(text=client_email)
-
-    tx = case_contract.functions.createCase(case_id, hashed_lawyer, hashed_client).build_transaction({
-        'from': acct.address,
-        'nonce': w3.eth.get_transaction_count(acct.address),
-        'gas': 1000000,
-        'gasPrice': w3.eth.gas_price
-    })
-    signed_tx = w3.eth.account.sign_transaction(tx, PRIVATE_KEY)
-    tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
-    receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
-    return tx_hash.hex(), receipt
-
-
-def update_case_status_on_chain(case_address, new_status):
-    acct = w3.eth.account.from_key(PRIVATE_KEY)
-    case_contract = w3.eth.contract(address=case_address, abi=CASE_ABI)
-    return _build_and_send_tx(
-        case_contract.functions.updateStatus(new_status),
-        acct,
-        gas=200000
-    )
-
-
-def add_log_to_case(case_address, log_hash):
-    acct = w3.eth.account.from_key(PRIVATE_KEY)
-    case_contract = get_case_contract(case_address)  # <--- correct contract
-    return _build_and_send_tx(
-        case_contract.functions.addLog(log_hash),
-        acct, gas=150000
-    )
-
-def add_log_version_to_case(case_address, parent_index, new_log_hash):
-    acct = w3.eth.account.from_key(PRIVATE_KEY)
-    case_contract = get_case_contract(case_address)
-    return _build_and_send_tx(
-        case_contract.functions.addLogVersion(parent_index, new_log_hash),
-        acct,
-        gas=200000
-    )
-
-
-def finalize_case_on_chain(case_address, final_hash):
-    acct = w3.eth.account.from_key(PRIVATE_KEY)
-    case_contract = w3.eth.contract(address=case_address, abi=CASE_ABI)
-    return _build_and_send_tx(case_contract.functions.finalizeCase(final_hash), acct, gas=150000)
-
-def get_case_contract(case_address):
-    return w3.eth.contract(address=case_address, abi=CASE_ABI)
-
-def generate_log_string(case_id: str, log_id: str, description: str, time_spent: int, timestamp: datetime) -> str:
-    # Use the exact same canonical format everywhere
-    return f"{case_id}|{log_id}|{description}|{time_spent}|{timestamp.replace(tzinfo=None).isoformat()}"
-
-def generate_log_hash(case_id: str, log_id: str, description: str, time_spent: int, timestamp: datetime) -> bytes:
-    log_string = generate_log_string(case_id, log_id, description, time_spent, timestamp)
-    return Web3.keccak(text=log_string)
+from web3 import AsyncWeb3, Web3
+from web3.logs import DISCARD
+from web3.exceptions import TransactionNotFound
+from eth_account import Account
+from requests import Session
+from requests.adapters import HTTPAdapter
+from aiohttp import ClientTimeout
+from functools import lru_cache
+import hashlib
+import json
+import os
+import threading
+import time
+from dotenv import load_dotenv
+from fastapi import HTTPException
+from datetime import datetime
+from backend.utils.fees import bump_fees, fee_oracle, gas_limits
+
+
+# Load environment variables
+load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), "..", ".env"))
+
+# Paths
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # backend/
+ARTIFACTS_DIR = os.path.join(BASE_DIR, "artifacts")
+
+# Env variables
+WEB3_PROVIDER = os.getenv("WEB3_PROVIDER")
+PRIVATE_KEY = os.getenv("PRIVATE_KEY")
+FACTORY_ADDRESS = os.getenv("FACTORY_ADDRESS")
+LOG_READ_PAGE_SIZE = int(os.getenv("LOG_READ_PAGE_SIZE", "500"))
+LOG_READ_CONCURRENCY = int(os.getenv("LOG_READ_CONCURRENCY", "4"))
+WEB3_POOL_SIZE = int(os.getenv("WEB3_POOL_SIZE", "20"))
+WEB3_TIMEOUT_SECONDS = float(os.getenv("WEB3_TIMEOUT_SECONDS", "30"))
+WEB3_RECONNECT_SECONDS = float(os.getenv("WEB3_RECONNECT_SECONDS", "10"))
+CONTRACT_CACHE_SIZE = int(os.getenv("CONTRACT_CACHE_SIZE", "1024"))
+
+if not WEB3_PROVIDER or not PRIVATE_KEY or not FACTORY_ADDRESS:
+    raise ValueError("Missing one or more required environment variables: WEB3_PROVIDER, PRIVATE_KEY, FACTORY_ADDRESS")
+
+
+@lru_cache(maxsize=None)
+def load_abi(name):
+    with open(os.path.join(ARTIFACTS_DIR, f"{name}.json"), "r") as f:
+        return json.load(f)["abi"]
+
+
+class BlockchainClient:
+    """
+    Process-wide web3 client. Nothing touches the node until the client is
+    first used; a failed connection is retried after WEB3_RECONNECT_SECONDS.
+    Requests share one keep-alive HTTP session, and contract objects and the
+    signing account are built once and reused. async_w3 talks to the same
+    node for the async helpers in blockchain_async.
+    """
+
+    def __init__(self, provider_url, private_key, factory_address):
+        self.provider_url = provider_url
+        self.factory_address = factory_address
+        self._private_key = private_key
+        self._lock = threading.Lock()
+        self._w3 = None
+        self._factory = None
+        self._account = None
+        self._chain_id = None
+        self._async_w3 = None
+        self._last_attempt = None
+
+    def _connect(self):
+        session = Session()
+        adapter = HTTPAdapter(pool_connections=WEB3_POOL_SIZE, pool_maxsize=WEB3_POOL_SIZE)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        provider = Web3.HTTPProvider(
+            self.provider_url,
+            session=session,
+            request_kwargs={"timeout": WEB3_TIMEOUT_SECONDS}
+        )
+        w3 = Web3(provider)
+        if not w3.is_connected():
+            print("⚠️ Blockchain not reachable. Blockchain features disabled.")
+            return
+        self._factory = w3.eth.contract(address=self.factory_address, abi=load_abi("CaseFactory"))
+        _case_contract.cache_clear()
+        self._w3 = w3
+        print("✅ Connected to Ethereum")
+
+    @property
+    def w3(self):
+        """Connected Web3 instance, or None while the node is unreachable."""
+        if self._w3 is not None:
+            return self._w3
+        with self._lock:
+            now = time.monotonic()
+            if self._w3 is None and (self._last_attempt is None or now - self._last_attempt >= WEB3_RECONNECT_SECONDS):
+                self._last_attempt = now
+                try:
+                    self._connect()
+                except Exception as e:
+                    print(f"⚠️ Blockchain init failed: {e}")
+        return self._w3
+
+    @property
+    def connected(self):
+        """True once a connection has been made; never touches the node."""
+        return self._w3 is not None
+
+    @property
+    def async_w3(self):
+        if self._async_w3 is None:
+            provider = AsyncWeb3.AsyncHTTPProvider(
+                self.provider_url,
+                request_kwargs={"timeout": ClientTimeout(total=WEB3_TIMEOUT_SECONDS)}
+            )
+            self._async_w3 = AsyncWeb3(provider)
+        return self._async_w3
+
+    @property
+    def factory_contract(self):
+        return self._factory if self.w3 else None
+
+    @property
+    def chain_id(self):
+        if self._chain_id is None:
+            self._chain_id = self.w3.eth.chain_id
+        return self._chain_id
+
+    @property
+    def account(self):
+        if self._account is None:
+            self._account = Account.from_key(self._private_key)
+        return self._account
+
+    def case_contract(self, case_address):
+        return _case_contract(self.w3, case_address)
+
+
+@lru_cache(maxsize=CONTRACT_CACHE_SIZE)
+def _case_contract(w3, case_address):
+    return w3.eth.contract(address=case_address, abi=load_abi("CaseContract"))
+
+
+client = BlockchainClient(WEB3_PROVIDER, PRIVATE_KEY, FACTORY_ADDRESS)
+
+
+def ensure_blockchain():
+    if not client.w3 or not client.factory_contract:
+        raise HTTPException(status_code=503, detail="Blockchain service unavailable. Please try again later.")
+
+
+class NonceManager:
+    """
+    Hands out nonces for the signing account from a local counter so that
+    concurrent submitters never race for the same nonce and many transactions
+    can be in flight at once. The counter is seeded from the node's pending
+    transaction count and re-seeded after any failed send.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next = {}
+
+    def allocate(self, address):
+        with self._lock:
+            if address not in self._next:
+                self._next[address] = client.w3.eth.get_transaction_count(address, "pending")
+            nonce = self._next[address]
+            self._next[address] = nonce + 1
+            return nonce
+
+    async def allocate_async(self, address, async_w3):
+        """allocate() for async callers: seeding the counter is awaited instead of blocking."""
+        if address not in self._next:
+            pending = await async_w3.eth.get_transaction_count(address, "pending")
+            with self._lock:
+                self._next.setdefault(address, pending)
+        return self.allocate(address)
+
+    def resync(self, address=None):
+        """Forget the local counter; the next allocation re-reads the pending count."""
+        with self._lock:
+            if address is None:
+                self._next.clear()
+            else:
+                self._next.pop(address, None)
+
+
+nonce_manager = NonceManager()
+
+
+def _gas_limit(contract_fn, acct):
+    gas = gas_limits.get(contract_fn.fn_name)
+    if gas is None:
+        gas = gas_limits.remember(contract_fn.fn_name, contract_fn.estimate_gas({'from': acct.address}))
+    return gas
+
+
+def _send_tx(contract_fn):
+    """Build, sign and broadcast a transaction without waiting for it to be mined."""
+    w3 = client.w3
+    acct = client.account
+    gas = _gas_limit(contract_fn, acct)
+    nonce = nonce_manager.allocate(acct.address)
+    try:
+        # Every field is filled in locally, so building the transaction needs no RPC
+        tx = contract_fn.build_transaction({
+            'from': acct.address,
+            'nonce': nonce,
+            'gas': gas,
+            'chainId': client.chain_id,
+            **fee_oracle.fees(w3)
+        })
+        signed_tx = acct.sign_transaction(tx)
+        return w3.eth.send_raw_transaction(signed_tx.raw_transaction)  # v6 uses raw_transaction
+    except Exception:
+        # The nonce was not consumed (or ours was stale); re-read it from the node
+        nonce_manager.resync(acct.address)
+        raise
+
+
+def replace_tx(tx_hash):
+    """
+    Rebroadcast a pending transaction at the same nonce with bumped fees so it
+    replaces the original in the mempool. Returns the new transaction hash.
+    """
+    w3 = client.w3
+    sent = w3.eth.get_transaction(tx_hash)
+    tx = {
+        'to': sent['to'],
+        'data': sent['input'],
+        'value': sent['value'],
+        'gas': sent['gas'],
+        'nonce': sent['nonce'],
+        'chainId': client.chain_id,
+        **bump_fees(sent, fee_oracle.fees(w3))
+    }
+    signed_tx = client.account.sign_transaction(tx)
+    new_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+    # Underpriced for the current market; make the next transactions look again
+    fee_oracle.invalidate()
+    print(f"⚠️ Transaction {tx_hash.hex()} pending too long; replaced by {new_hash.hex()}")
+    return new_hash
+
+
+def get_receipt(tx_hash):
+    """Receipt of a mined transaction, or None while it is still pending."""
+    try:
+        return client.w3.eth.get_transaction_receipt(tx_hash)
+    except TransactionNotFound:
+        return None
+
+
+def is_tx_known(tx_hash):
+    """True while the node still has the transaction (pending or mined)."""
+    try:
+        client.w3.eth.get_transaction(tx_hash)
+        return True
+    except TransactionNotFound:
+        return False
+
+
+def case_address_from_receipt(factory_contract, receipt):
+    """Address of the case clone announced by CaseCreated, or None for factories that predate the event."""
+    events = factory_contract.events.CaseCreated().process_receipt(receipt, errors=DISCARD)
+    return events[0]["args"]["caseAddress"] if events else None
+
+
+def log_index_from_receipt(case_address, receipt):
+    """
+    Position in CaseContract.logs of the entry the transaction added.
+    LogAdded carries no index, so it is the log count at the receipt's block
+    minus the LogAdded events of the contract at or after this one in that block.
+    """
+    case_contract = get_case_contract(case_address)
+    added = case_contract.events.LogAdded().process_receipt(receipt, errors=DISCARD)
+    if not added:
+        raise RuntimeError(f"No LogAdded event in transaction {receipt['transactionHash'].hex()}")
+    position = (receipt["transactionIndex"], added[0]["logIndex"])
+    count = case_contract.functions.getLogCount().call(block_identifier=receipt["blockNumber"])
+    block_logs = case_contract.events.LogAdded.get_logs(
+        from_block=receipt["blockNumber"], to_block=receipt["blockNumber"]
+    )
+    return count - sum((log["transactionIndex"], log["logIndex"]) >= position for log in block_logs)
+
+
+def batch_index_from_receipt(case_address, receipt):
+    """Position in CaseContract.batches of the batch the transaction anchored."""
+    anchored = get_case_contract(case_address).events.BatchAnchored().process_receipt(receipt, errors=DISCARD)
+    if not anchored:
+        raise RuntimeError(f"No BatchAnchored event in transaction {receipt['transactionHash'].hex()}")
+    return anchored[0]["args"]["batchIndex"]
+
+
+# Log anchoring only broadcasts; the anchoring worker collects the receipts
+def send_log_to_case(case_address, log_hash):
+    case_contract = get_case_contract(case_address)
+    return _send_tx(case_contract.functions.addLog(log_hash))
+
+def send_log_version_to_case(case_address, parent_index, new_log_hash):
+    case_contract = get_case_contract(case_address)
+    return _send_tx(case_contract.functions.addLogVersion(parent_index, new_log_hash))
+
+def send_batch_to_case(case_address, root, size):
+    case_contract = get_case_contract(case_address)
+    return _send_tx(case_contract.functions.anchorBatch(root, size))
+
+
+def get_case_contract(case_address):
+    return client.case_contract(case_address)
+
+def generate_log_string(case_id: str, log_id: str, description: str, time_spent: int, timestamp: datetime) -> str:
+    # Use the exact same canonical format everywhere
+    return f"{case_id}|{log_id}|{description}|{time_spent}|{timestamp.replace(tzinfo=None).isoformat()}"
+
+def generate_log_hash(case_id: str, log_id: str, description: str, time_spent: int, timestamp: datetime) -> bytes:
+    log_string = generate_log_string(case_id, log_id, description, time_spent, timestamp)
+    return Web3.keccak(text=log_string)
+
+def generate_final_hash(logs) -> bytes:
+    """
+    The hash finalizeCase records when a case is closed; logs in (timestamp, id)
+    order. Unlike the log reads, which break ties on sequence, this order is
+    part of recorded hashes (archiving recomputes them), so it stays on id.
+    """
+    concatenated_hashes = ''.join([
+        hashlib.sha256(
+            f"{l.case_id}|{l.id}|{l.description}|{l.time_spent}|{l.timestamp.isoformat()}".encode()
+        ).hexdigest()
+        for l in logs
+    ])
+    return Web3.keccak(text=concatenated_hashes)
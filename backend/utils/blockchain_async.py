@@ -0,0 +1,217 @@
+"""
+AsyncWeb3 versions of the blockchain helpers used by request handlers.
+
+While a coroutine waits on the node it holds no threadpool worker, so slow
+confirmations no longer starve unrelated requests. Connection state, the
+signing account and nonces are shared with the sync client in blockchain.py,
+which the anchoring worker and chain indexer keep using.
+"""
+import asyncio
+import time
+from functools import lru_cache
+
+from fastapi import HTTPException
+from web3 import Web3
+from web3.exceptions import TimeExhausted, TransactionNotFound, Web3TypeError
+
+from backend.utils.blockchain import (
+    CONTRACT_CACHE_SIZE,
+    LOG_READ_CONCURRENCY,
+    LOG_READ_PAGE_SIZE,
+    case_address_from_receipt,
+    client,
+    load_abi,
+    nonce_manager
+)
+from backend.utils.fees import (
+    TX_MAX_REPLACEMENTS,
+    TX_PENDING_DEADLINE_SECONDS,
+    TX_POLL_SECONDS,
+    bump_fees,
+    fee_oracle,
+    gas_limits
+)
+
+
+async def ensure_blockchain():
+    if not client.connected:
+        # Only the first connect (or a reconnect) blocks, so do it off the event loop
+        await asyncio.to_thread(lambda: client.w3)
+    if not client.connected:
+        raise HTTPException(status_code=503, detail="Blockchain service unavailable. Please try again later.")
+
+
+@lru_cache(maxsize=None)
+def _factory_contract(async_w3):
+    return async_w3.eth.contract(address=client.factory_address, abi=load_abi("CaseFactory"))
+
+
+@lru_cache(maxsize=CONTRACT_CACHE_SIZE)
+def _case_contract(async_w3, case_address):
+    return async_w3.eth.contract(address=case_address, abi=load_abi("CaseContract"))
+
+
+def get_case_contract(case_address):
+    return _case_contract(client.async_w3, case_address)
+
+
+_cached_chain_id = None
+
+
+async def _chain_id():
+    global _cached_chain_id
+    if _cached_chain_id is None:
+        _cached_chain_id = await client.async_w3.eth.chain_id
+    return _cached_chain_id
+
+
+async def _gas_limit(contract_fn, acct):
+    gas = gas_limits.get(contract_fn.fn_name)
+    if gas is None:
+        gas = gas_limits.remember(contract_fn.fn_name, await contract_fn.estimate_gas({'from': acct.address}))
+    return gas
+
+
+async def _send_tx(contract_fn):
+    """Build, sign and broadcast a transaction without waiting for it to be mined."""
+    w3 = client.async_w3
+    acct = client.account
+    gas = await _gas_limit(contract_fn, acct)
+    nonce = await nonce_manager.allocate_async(acct.address, w3)
+    try:
+        tx = await contract_fn.build_transaction({
+            'from': acct.address,
+            'nonce': nonce,
+            'gas': gas,
+            'chainId': await _chain_id(),
+            **await fee_oracle.fees_async(w3)
+        })
+        signed_tx = acct.sign_transaction(tx)
+        return await w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+    except Exception:
+        nonce_manager.resync(acct.address)
+        raise
+
+
+async def _get_receipt(tx_hash):
+    try:
+        return await client.async_w3.eth.get_transaction_receipt(tx_hash)
+    except TransactionNotFound:
+        return None
+
+
+async def replace_tx(tx_hash):
+    """Async replace_tx: same nonce, bumped fees; returns the new transaction hash."""
+    w3 = client.async_w3
+    sent = await w3.eth.get_transaction(tx_hash)
+    tx = {
+        'to': sent['to'],
+        'data': sent['input'],
+        'value': sent['value'],
+        'gas': sent['gas'],
+        'nonce': sent['nonce'],
+        'chainId': await _chain_id(),
+        **bump_fees(sent, await fee_oracle.fees_async(w3))
+    }
+    signed_tx = client.account.sign_transaction(tx)
+    new_hash = await w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+    fee_oracle.invalidate()
+    print(f"⚠️ Transaction {tx_hash.hex()} pending too long; replaced by {new_hash.hex()}")
+    return new_hash
+
+
+async def _wait_for_receipt(contract_fn, tx_hash):
+    """
+    Wait for a transaction to be mined, replacing it with bumped fees each
+    time it stays pending for TX_PENDING_DEADLINE_SECONDS. Any of the
+    broadcast versions may be the one that gets mined.
+    """
+    hashes = [tx_hash]
+    for replacements in range(TX_MAX_REPLACEMENTS + 1):
+        deadline = time.monotonic() + TX_PENDING_DEADLINE_SECONDS
+        while time.monotonic() < deadline:
+            for receipt in await asyncio.gather(*(_get_receipt(sent_hash) for sent_hash in hashes)):
+                if receipt is not None:
+                    if receipt["status"] != 1:
+                        gas_limits.forget(contract_fn.fn_name)
+                    return receipt
+            await asyncio.sleep(TX_POLL_SECONDS)
+        if replacements < TX_MAX_REPLACEMENTS:
+            try:
+                hashes.append(await replace_tx(hashes[-1]))
+            except Exception as e:
+                # Most likely mined in the meantime; the next poll picks it up
+                print(f"⚠️ Transaction replacement failed: {e}")
+    raise TimeExhausted(f"Transaction {tx_hash.hex()} is not in the chain after {TX_MAX_REPLACEMENTS} replacements")
+
+
+async def _build_and_send_tx(contract_fn):
+    tx_hash = await _send_tx(contract_fn)
+    return await _wait_for_receipt(contract_fn, tx_hash)
+
+
+async def create_case_on_chain(case_id, lawyer_email, client_email):
+    """Deploy the case clone; returns (tx hash, case address)."""
+    hashed_lawyer = Web3.keccak(text=lawyer_email)
+    hashed_client = Web3.keccak(text=client_email)
+
+    factory = _factory_contract(client.async_w3)
+    receipt = await _build_and_send_tx(factory.functions.createCase(case_id, hashed_lawyer, hashed_client))
+    case_address = case_address_from_receipt(factory, receipt)
+    if case_address is None:
+        case_address = await factory.functions.getCaseAddress(case_id).call()
+    return receipt["transactionHash"].hex(), case_address
+
+
+async def update_case_status_on_chain(case_address, new_status):
+    case_contract = get_case_contract(case_address)
+    return await _build_and_send_tx(case_contract.functions.updateStatus(new_status))
+
+
+async def finalize_case_on_chain(case_address, final_hash):
+    case_contract = get_case_contract(case_address)
+    return await _build_and_send_tx(case_contract.functions.finalizeCase(final_hash))
+
+
+async def get_case_log(case_address, index):
+    return tuple(await get_case_contract(case_address).functions.getLog(index).call())
+
+
+async def get_batch(case_address, batch_index):
+    return tuple(await get_case_contract(case_address).functions.getBatch(batch_index).call())
+
+
+async def _get_logs_batched(case_contract, start, end):
+    """getLog for each index in [start, end) as one JSON-RPC batch."""
+    try:
+        async with client.async_w3.batch_requests() as batch:
+            for index in range(start, end):
+                batch.add(case_contract.functions.getLog(index))
+            return await batch.async_execute()
+    except Web3TypeError:
+        # Provider cannot batch; fall back to one call per log
+        return [await case_contract.functions.getLog(index).call() for index in range(start, end)]
+
+
+async def get_case_logs_on_chain(case_address, start=0, end=None):
+    """
+    Fetch CaseContract.logs[start:end] as (logHash, timestamp, version, parentLogIndex)
+    tuples, one getLogs call per LOG_READ_PAGE_SIZE entries, at most
+    LOG_READ_CONCURRENCY pages at a time. Contracts deployed before getLogs
+    existed are read with JSON-RPC batches of getLog calls.
+    """
+    case_contract = get_case_contract(case_address)
+    if end is None:
+        end = await case_contract.functions.getLogCount().call()
+    semaphore = asyncio.Semaphore(LOG_READ_CONCURRENCY)
+
+    async def read_page(page_start):
+        page_end = min(page_start + LOG_READ_PAGE_SIZE, end)
+        async with semaphore:
+            try:
+                return await case_contract.functions.getLogs(page_start, page_end).call()
+            except Exception:
+                return await _get_logs_batched(case_contract, page_start, page_end)
+
+    pages = await asyncio.gather(*(read_page(page_start) for page_start in range(start, end, LOG_READ_PAGE_SIZE)))
+    return [tuple(entry) for page in pages for entry in page]
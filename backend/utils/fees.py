@@ -0,0 +1,129 @@
+"""
+Transaction fees and gas limits.
+
+Fees come from a short-lived cache of the latest base fee and priority fee,
+so a burst of transactions costs one fee lookup instead of one per
+transaction. Transactions are sent as EIP-1559 (type 2) with a max fee of
+FEE_BASE_FEE_MULTIPLIER x base fee + tip, which keeps them includable while
+the base fee rises for a few blocks. Nodes without a base fee get a legacy
+gasPrice instead.
+"""
+import os
+import threading
+import time
+
+
+FEE_CACHE_SECONDS = float(os.getenv("FEE_CACHE_SECONDS", "6"))
+FEE_BASE_FEE_MULTIPLIER = float(os.getenv("FEE_BASE_FEE_MULTIPLIER", "2"))
+FEE_PRIORITY_GWEI = os.getenv("FEE_PRIORITY_GWEI")  # fixed tip; defaults to the node's suggestion
+FEE_BUMP_PERCENT = int(os.getenv("FEE_BUMP_PERCENT", "20"))  # nodes require >= 10% to replace
+GAS_LIMIT_MARGIN = float(os.getenv("GAS_LIMIT_MARGIN", "1.5"))
+TX_PENDING_DEADLINE_SECONDS = float(os.getenv("TX_PENDING_DEADLINE_SECONDS", "90"))
+TX_MAX_REPLACEMENTS = int(os.getenv("TX_MAX_REPLACEMENTS", "3"))
+TX_POLL_SECONDS = float(os.getenv("TX_POLL_SECONDS", "1"))
+
+GWEI = 10 ** 9
+
+
+def _fee_fields(base_fee, tip, gas_price):
+    if base_fee is None:
+        return {"gasPrice": gas_price}
+    return {
+        "maxFeePerGas": int(base_fee * FEE_BASE_FEE_MULTIPLIER) + tip,
+        "maxPriorityFeePerGas": tip
+    }
+
+
+class FeeOracle:
+    """Fee fields for new transactions, refreshed at most every FEE_CACHE_SECONDS."""
+
+    def __init__(self, ttl: float = FEE_CACHE_SECONDS):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._fees = None
+        self._fetched_at = 0.0
+
+    def _cached(self):
+        if self._fees is not None and time.monotonic() - self._fetched_at < self.ttl:
+            return self._fees
+        return None
+
+    def _store(self, fees):
+        with self._lock:
+            self._fees = fees
+            self._fetched_at = time.monotonic()
+        return fees
+
+    def fees(self, w3):
+        cached = self._cached()
+        if cached:
+            return cached
+        base_fee = w3.eth.get_block("latest").get("baseFeePerGas")
+        if base_fee is None:
+            return self._store(_fee_fields(None, None, w3.eth.gas_price))
+        tip = int(float(FEE_PRIORITY_GWEI) * GWEI) if FEE_PRIORITY_GWEI else w3.eth.max_priority_fee
+        return self._store(_fee_fields(base_fee, tip, None))
+
+    async def fees_async(self, async_w3):
+        cached = self._cached()
+        if cached:
+            return cached
+        base_fee = (await async_w3.eth.get_block("latest")).get("baseFeePerGas")
+        if base_fee is None:
+            return self._store(_fee_fields(None, None, await async_w3.eth.gas_price))
+        tip = int(float(FEE_PRIORITY_GWEI) * GWEI) if FEE_PRIORITY_GWEI else await async_w3.eth.max_priority_fee
+        return self._store(_fee_fields(base_fee, tip, None))
+
+    def invalidate(self):
+        with self._lock:
+            self._fees = None
+
+
+def _bump(value):
+    return value * (100 + FEE_BUMP_PERCENT) // 100
+
+
+def bump_fees(sent_tx, current_fees):
+    """
+    Fee fields for a replacement of sent_tx (as returned by eth_getTransactionByHash):
+    at least FEE_BUMP_PERCENT above what it paid, and never below current fees.
+    """
+    if "gasPrice" in current_fees and "maxFeePerGas" not in sent_tx:
+        return {"gasPrice": max(_bump(sent_tx["gasPrice"]), current_fees["gasPrice"])}
+    max_fee = sent_tx.get("maxFeePerGas", sent_tx.get("gasPrice"))
+    tip = sent_tx.get("maxPriorityFeePerGas", sent_tx.get("gasPrice"))
+    current_max_fee = current_fees.get("maxFeePerGas", current_fees.get("gasPrice"))
+    current_tip = current_fees.get("maxPriorityFeePerGas", current_fees.get("gasPrice"))
+    return {
+        "maxFeePerGas": max(_bump(max_fee), current_max_fee),
+        "maxPriorityFeePerGas": max(_bump(tip), current_tip)
+    }
+
+
+class GasLimits:
+    """
+    Gas limit per contract function, estimated on its first call and reused.
+    The estimate is scaled by GAS_LIMIT_MARGIN because later calls can touch
+    fresh storage (e.g. the first log of a new case) and cost more.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._limits = {}
+
+    def get(self, fn_name):
+        return self._limits.get(fn_name)
+
+    def remember(self, fn_name, estimate):
+        limit = int(estimate * GAS_LIMIT_MARGIN)
+        with self._lock:
+            self._limits[fn_name] = limit
+        return limit
+
+    def forget(self, fn_name):
+        with self._lock:
+            self._limits.pop(fn_name, None)
+
+
+fee_oracle = FeeOracle()
+gas_limits = GasLimits()
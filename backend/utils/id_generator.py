@@ -1,16 +1,63 @@
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from backend.db.models import Case, ProgressLog
+from backend.db.models import Case, IdSequence, ProgressLog
+
+
+def reserve_sequence(db: Session, name: str, seed, count: int = 1) -> int:
+    """
+    Advance the counter `name` by count and return the last number reserved
+    (the range is last - count + 1 .. last), inside the caller's transaction.
+    The single-row UPDATE locks the counter until the transaction ends, so
+    concurrent writers get distinct, increasing numbers. seed() gives the
+    starting value for a counter that does not exist yet (rows written
+    before id_sequences existed).
+    """
+    bump = (
+        update(IdSequence)
+        .where(IdSequence.name == name)
+        .values(value=IdSequence.value + count)
+        .returning(IdSequence.value)
+    )
+    value = db.execute(bump).scalar()
+    if value is not None:
+        return value
+
+    try:
+        with db.begin_nested():
+            db.add(IdSequence(name=name, value=seed() + count))
+        return db.get(IdSequence, name).value
+    except IntegrityError:
+        # Another writer created the counter first
+        return db.execute(bump).scalar()
+
+
+def next_sequence(db: Session, name: str, seed) -> int:
+    """Increment the counter `name` and return the new value (see reserve_sequence)."""
+    return reserve_sequence(db, name, seed)
 
 
 def generate_case_id(db: Session, lawyer_id: int, client_id: int) -> str:
     prefix = f"C-{lawyer_id}-{client_id}"
-    existing = db.query(Case).filter(
-        Case.lawyer_id == lawyer_id,
-        Case.client_id == client_id
-    ).count()
-    return f"{prefix}-{existing + 1:02d}"
+    number = next_sequence(
+        db,
+        f"case:{lawyer_id}-{client_id}",
+        lambda: db.query(Case).filter(Case.lawyer_id == lawyer_id, Case.client_id == client_id).count()
+    )
+    return f"{prefix}-{number:02d}"
+
+
+def generate_log_id(db: Session, case_id: str):
+    """Returns (log_id, sequence); the sequence orders logs numerically past 99."""
+    return generate_log_ids(db, case_id, 1)[0]
 
 
-def generate_log_id(db: Session, case_id: str) -> str:
-    existing = db.query(ProgressLog).filter_by(case_id=case_id).count()
-    return f"L-{case_id}-{existing + 1:02d}"
+def generate_log_ids(db: Session, case_id: str, count: int) -> list:
+    """[(log_id, sequence), ...] for count new logs of a case, reserved with one UPDATE."""
+    last = reserve_sequence(
+        db,
+        f"log:{case_id}",
+        lambda: db.query(ProgressLog).filter_by(case_id=case_id).count(),
+        count
+    )
+    return [(f"L-{case_id}-{number:02d}", number) for number in range(last - count + 1, last + 1)]
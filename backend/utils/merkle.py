@@ -0,0 +1,53 @@
+import json
+from typing import List
+
+from web3 import Web3
+
+
+# Sorted-pair keccak256 tree, the same scheme CaseContract.verifyInclusion checks.
+# An odd node at the end of a level is carried up unchanged.
+
+def _hash_pair(a: bytes, b: bytes) -> bytes:
+    return bytes(Web3.keccak(a + b if a < b else b + a))
+
+
+def build_merkle_tree(leaves: List[bytes]) -> List[List[bytes]]:
+    if not leaves:
+        raise ValueError("Cannot build a Merkle tree without leaves")
+    levels = [[bytes(leaf) for leaf in leaves]]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        parents = [_hash_pair(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            parents.append(level[-1])
+        levels.append(parents)
+    return levels
+
+
+def merkle_root(levels: List[List[bytes]]) -> bytes:
+    return levels[-1][0]
+
+
+def merkle_proof(levels: List[List[bytes]], index: int) -> List[bytes]:
+    proof = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append(level[sibling])
+        index //= 2
+    return proof
+
+
+def verify_merkle_proof(leaf: bytes, proof: List[bytes], root: bytes) -> bool:
+    computed = bytes(leaf)
+    for sibling in proof:
+        computed = _hash_pair(computed, bytes(sibling))
+    return computed == bytes(root)
+
+
+def encode_proof(proof: List[bytes]) -> str:
+    return json.dumps([p.hex() for p in proof])
+
+
+def decode_proof(encoded: str) -> List[bytes]:
+    return [bytes.fromhex(p) for p in json.loads(encoded or "[]")]
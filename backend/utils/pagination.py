@@ -0,0 +1,70 @@
+import base64
+import json
+import os
+from datetime import datetime
+
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "100"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "500"))
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(sort_value: datetime, row_id) -> str:
+    raw = json.dumps([sort_value.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_value, row_id = json.loads(raw)
+        return datetime.fromisoformat(sort_value), row_id
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_statement(statement, sort_column, id_column, after: tuple = None, limit: int = DEFAULT_PAGE_SIZE,
+                     descending: bool = False):
+    """
+    statement ordered by (sort_column, id_column), starting after the
+    (sort value, id) pair after, with one row more than limit so the caller
+    can tell whether another page follows.
+    """
+    if after:
+        after_value, after_id = after
+        if descending:
+            statement = statement.where(or_(
+                sort_column < after_value,
+                and_(sort_column == after_value, id_column < after_id)
+            ))
+        else:
+            statement = statement.where(or_(
+                sort_column > after_value,
+                and_(sort_column == after_value, id_column > after_id)
+            ))
+
+    order = (sort_column.desc(), id_column.desc()) if descending else (sort_column, id_column)
+    return statement.order_by(*order).limit(limit + 1)
+
+
+async def keyset_page(db: AsyncSession, statement, sort_column, id_column, response: Response,
+                      cursor: str = None, limit: int = None, descending: bool = False, scalars: bool = True) -> list:
+    """
+    One page of statement ordered by (sort_column, id_column), starting after
+    the row the cursor points at. Each page is an index range scan, however
+    deep it is. When more rows follow, the cursor of the next page is sent in
+    the X-Next-Cursor header. scalars=False returns rows for column selects.
+    """
+    limit = min(max(limit or DEFAULT_PAGE_SIZE, 1), MAX_PAGE_SIZE)
+    after = decode_cursor(cursor) if cursor else None
+    result = await db.execute(keyset_statement(statement, sort_column, id_column, after, limit, descending))
+    rows = result.scalars().all() if scalars else result.all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+    return rows
@@ -0,0 +1,172 @@
+"""
+Login throughput, and the latency of an unrelated endpoint, during a login storm.
+
+    python -m backend.utils.password_benchmark
+    python -m backend.utils.password_benchmark --logins 400 --concurrency 64 --rounds 12
+
+The app is served by uvicorn on a temporary SQLite database (the anchoring
+worker and indexer off) for each mode: "inline" hashes on the shared
+threadpool as before (PASSWORD_HASH_WORKERS=0), "pool" uses the password
+hashing process pool. --concurrency clients then sign in --logins times in
+all, while one client keeps calling GET /me. The run reports logins/s, login
+latency, /me latency and the hashing queue metrics.
+"""
+import argparse
+import os
+import socket
+import tempfile
+import threading
+import time
+from collections import Counter
+
+import requests
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _percentile(values: list, fraction: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] * 1000
+
+
+def run_mode(mode: str, users: int, logins: int, concurrency: int, rounds: int, workers: int) -> dict:
+    import uvicorn
+    from backend.db.database import SessionLocal, async_engine
+    from backend.db.models import User
+    from backend.main import app
+    from backend.utils import passwords
+
+    passwords.password_hasher.shutdown()
+    passwords.password_hasher = passwords.PasswordHasher(workers=0 if mode == "inline" else workers, rounds=rounds)
+
+    db = SessionLocal()
+    try:
+        hashed = passwords.password_context(rounds).hash("bench")
+        emails = [f"bench-{mode}-{i}@x" for i in range(users)]
+        db.add_all([User(email=email, password=hashed, role="client", is_verified=False) for email in emails])
+        db.commit()
+    finally:
+        db.close()
+
+    # Each mode serves on a loop of its own; async connections of the last one can't be reused
+    async_engine.sync_engine.dispose(close=False)
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    base = f"http://127.0.0.1:{port}"
+
+    try:
+        token = requests.post(f"{base}/login", json={"email": emails[0], "password": "bench"}).json()["access_token"]
+        probe_headers = {"Authorization": f"Bearer {token}"}
+        requests.get(f"{base}/me", headers=probe_headers)  # caches the principal
+
+        login_times, probe_times, failures = [], [], Counter()
+        next_login = iter(range(logins))
+        next_login_lock = threading.Lock()
+        storming = threading.Event()
+        storming.set()
+
+        def client():
+            with requests.Session() as session:
+                while True:
+                    with next_login_lock:
+                        i = next(next_login, None)
+                    if i is None:
+                        return
+                    started = time.perf_counter()
+                    try:
+                        r = session.post(f"{base}/login", json={"email": emails[i % users], "password": "bench"})
+                    except requests.RequestException as e:
+                        failures[type(e).__name__] += 1
+                        continue
+                    if r.status_code == 200:
+                        login_times.append(time.perf_counter() - started)
+                    else:
+                        failures[f"HTTP {r.status_code}: {r.text[:60]}"] += 1
+
+        def probe():
+            with requests.Session() as session:
+                while storming.is_set():
+                    started = time.perf_counter()
+                    session.get(f"{base}/me", headers=probe_headers)
+                    probe_times.append(time.perf_counter() - started)
+                    time.sleep(0.05)
+
+        prober = threading.Thread(target=probe)
+        prober.start()
+        clients = [threading.Thread(target=client) for _ in range(concurrency)]
+        started = time.perf_counter()
+        for c in clients:
+            c.start()
+        for c in clients:
+            c.join()
+        elapsed = time.perf_counter() - started
+        storming.clear()
+        prober.join()
+    finally:
+        server.should_exit = True
+        thread.join()
+        passwords.password_hasher.shutdown()
+
+    return {
+        "mode": mode,
+        "logins": len(login_times),
+        "failed": sum(failures.values()),
+        "failures": failures,
+        "seconds": elapsed,
+        "logins_per_second": len(login_times) / elapsed,
+        "login_p50_ms": _percentile(login_times, 0.5),
+        "login_p95_ms": _percentile(login_times, 0.95),
+        "probe_p50_ms": _percentile(probe_times, 0.5),
+        "probe_p95_ms": _percentile(probe_times, 0.95),
+        "probe_max_ms": max(probe_times, default=0) * 1000,
+        "hasher": passwords.password_hasher.stats()
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m backend.utils.password_benchmark")
+    parser.add_argument("--modes", nargs="+", default=["inline", "pool"], choices=["inline", "pool"])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--logins", type=int, default=200, help="logins in all")
+    parser.add_argument("--concurrency", type=int, default=64, help="clients signing in at once")
+    parser.add_argument("--rounds", type=int, default=None, help="bcrypt cost; defaults to BCRYPT_ROUNDS")
+    parser.add_argument("--workers", type=int, default=None, help="pool size; defaults to PASSWORD_HASH_WORKERS")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        # Before the app is imported: its engine and background workers are set up from these
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(scratch, 'bench-passwords.db')}"
+        os.environ["ANCHOR_WORKER_ENABLED"] = "false"
+        os.environ["INDEXER_ENABLED"] = "false"
+        from backend.utils.passwords import BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS
+
+        for mode in args.modes:
+            result = run_mode(
+                mode, args.users, args.logins, args.concurrency,
+                args.rounds or BCRYPT_ROUNDS, args.workers or PASSWORD_HASH_WORKERS
+            )
+            print(
+                f"{'✅' if not result['failed'] else '⚠️'} {mode:<7} "
+                f"{result['logins']:>5} logins  {result['failed']:>4} failed  {result['seconds']:6.2f}s  "
+                f"{result['logins_per_second']:6.1f} logins/s  "
+                f"login p50/p95 {result['login_p50_ms']:.0f}/{result['login_p95_ms']:.0f} ms  "
+                f"/me p50/p95/max {result['probe_p50_ms']:.0f}/{result['probe_p95_ms']:.0f}/{result['probe_max_ms']:.0f} ms"
+            )
+            for failure, count in result["failures"].most_common(3):
+                print(f"    {count} x {failure}")
+            if mode == "pool":
+                print(f"    hashing queue: {result['hasher']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Password hashing off the request path.
+
+bcrypt is slow on purpose (about 0.25 s per hash at cost 12). Run inline, a
+burst of logins would hold every threadpool thread and stall unrelated
+endpoints. Instead, hashes and checks run in a process pool of
+PASSWORD_HASH_WORKERS processes, at most that many at a time. Further
+sign-ins wait their turn on the event loop without holding a thread. At
+most PASSWORD_HASH_MAX_QUEUE may wait; beyond that they get a 503.
+
+BCRYPT_ROUNDS sets the cost of new hashes. A login whose stored hash has a
+different cost gets a new hash at BCRYPT_ROUNDS (see verify_and_update).
+PASSWORD_HASH_WORKERS=0 hashes on the shared threadpool as before, with no cap.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from fastapi import HTTPException
+from passlib.context import CryptContext
+from starlette.concurrency import run_in_threadpool
+
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "256"))
+PASSWORD_HASH_WARN_WAIT_MS = int(os.getenv("PASSWORD_HASH_WARN_WAIT_MS", "2000"))  # log sign-ins queued longer
+
+
+@lru_cache(maxsize=None)
+def password_context(rounds: int = BCRYPT_ROUNDS) -> CryptContext:
+    # min = max = default, so a hash of any other cost needs an update
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds
+    )
+
+
+# Run in the worker processes; module-level so they can be pickled
+
+def _hash(password: str, rounds: int) -> str:
+    return password_context(rounds).hash(password)
+
+
+def _verify_and_update(password: str, hashed: str, rounds: int):
+    try:
+        return password_context(rounds).verify_and_update(password, hashed)
+    except ValueError:
+        # Not a hash passlib knows (e.g. a placeholder); nothing can match it
+        return False, None
+
+
+class PasswordHasher:
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_queue: int = PASSWORD_HASH_MAX_QUEUE,
+                 rounds: int = BCRYPT_ROUNDS):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.rounds = rounds
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._loop = None
+        self._slots = None  # asyncio.Semaphore of the running loop
+
+        # Queueing metrics, see stats()
+        self.running = 0
+        self.queued = 0
+        self.peak_queued = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.hash_seconds = 0.0
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                # spawn, not fork: the app process runs threads (anchor worker, indexer)
+                self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop, self._slots = loop, asyncio.Semaphore(self.workers)
+        return self._slots
+
+    async def _run(self, fn, *args):
+        if self.workers <= 0:
+            return await run_in_threadpool(fn, *args)
+
+        slots = self._semaphore()
+        if slots.locked() and self.queued >= self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Too many sign-ins at once; try again shortly",
+                headers={"Retry-After": "1"}
+            )
+        queued_at = time.perf_counter()
+        self.queued += 1
+        self.peak_queued = max(self.peak_queued, self.queued)
+        try:
+            await slots.acquire()
+        finally:
+            self.queued -= 1
+
+        waited = time.perf_counter() - queued_at
+        self.wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        if waited * 1000 > PASSWORD_HASH_WARN_WAIT_MS:
+            print(f"⚠️ Password hashing queue: waited {waited * 1000:.0f} ms ({self.queued} still queued)")
+
+        self.running += 1
+        started = time.perf_counter()
+        try:
+            return await asyncio.wrap_future(self._executor().submit(fn, *args))
+        finally:
+            self.hash_seconds += time.perf_counter() - started
+            self.running -= 1
+            self.completed += 1
+            slots.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password, self.rounds)
+
+    async def verify_and_update(self, password: str, hashed: str):
+        """(matches, new hash or None); a new hash is returned when hashed has another cost than self.rounds."""
+        return await self._run(_verify_and_update, password, hashed, self.rounds)
+
+    def stats(self) -> dict:
+        done = self.completed or 1
+        return {
+            "workers": self.workers,
+            "rounds": self.rounds,
+            "running": self.running,
+            "queued": self.queued,
+            "peak_queued": self.peak_queued,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.wait_seconds / done * 1000, 1),
+            "max_wait_ms": round(self.max_wait_seconds * 1000, 1),
+            "avg_hash_ms": round(self.hash_seconds / done * 1000, 1),
+        }
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+password_hasher = PasswordHasher()
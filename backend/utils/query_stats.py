@@ -0,0 +1,117 @@
+"""
+SQL statement counts and time, per request or per block of code.
+
+Every statement run on any engine is added to the QueryStats active in the
+current context. QueryStatsMiddleware opens one per request and reports it
+in the X-Query-Count / X-Query-Time-Ms headers; count_queries() opens one
+around a block, and also receives the totals of requests served while it is
+open (TestClient runs the app in another thread), so tests can pin how many
+queries an endpoint may run:
+
+    with count_queries() as stats:
+        client.get(f"/case_summary/{case_id}", headers=auth)
+    assert stats.count <= 2
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+QUERY_STATS_ENABLED = os.getenv("QUERY_STATS_ENABLED", "true").lower() == "true"
+QUERY_STATS_WARN_COUNT = int(os.getenv("QUERY_STATS_WARN_COUNT", "20"))  # log requests running more statements
+QUERY_COUNT_HEADER = "X-Query-Count"
+QUERY_TIME_HEADER = "X-Query-Time-Ms"
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = []
+
+    @property
+    def milliseconds(self) -> float:
+        return self.seconds * 1000
+
+    def add(self, other: "QueryStats"):
+        self.count += other.count
+        self.seconds += other.seconds
+        self.statements.extend(other.statements)
+
+
+_current = ContextVar("query_stats", default=None)
+_watchers = []  # open count_queries() blocks
+_watchers_lock = threading.Lock()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None or not conn.info.get("query_started_at"):
+        return
+    stats.count += 1
+    stats.seconds += time.perf_counter() - conn.info["query_started_at"].pop()
+    stats.statements.append(statement)
+
+
+@contextmanager
+def count_queries():
+    """Collect the statements run inside the block and by requests served while it is open."""
+    stats = QueryStats()
+    token = _current.set(stats)
+    with _watchers_lock:
+        _watchers.append(stats)
+    try:
+        yield stats
+    finally:
+        with _watchers_lock:
+            _watchers.remove(stats)
+        _current.reset(token)
+
+
+class QueryStatsMiddleware:
+    """
+    Pure ASGI so the stats object is set in the request's own context; sync
+    routes and dependencies run in a threadpool with a copy of it and add to
+    the same object.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not (QUERY_STATS_ENABLED or _watchers):
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current.set(stats)
+        try:
+            async def send_with_stats(message):
+                if message["type"] == "http.response.start" and QUERY_STATS_ENABLED:
+                    headers = list(message.get("headers", []))
+                    headers.append((QUERY_COUNT_HEADER.lower().encode(), str(stats.count).encode()))
+                    headers.append((QUERY_TIME_HEADER.lower().encode(), f"{stats.milliseconds:.1f}".encode()))
+                    message = {**message, "headers": headers}
+                    if stats.count > QUERY_STATS_WARN_COUNT:
+                        print(f"⚠️ {scope['method']} {scope['path']} ran {stats.count} SQL statements "
+                              f"({stats.milliseconds:.1f} ms)")
+                await send(message)
+
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _current.reset(token)
+            with _watchers_lock:
+                for watcher in _watchers:
+                    watcher.add(stats)
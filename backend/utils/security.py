@@ -1,12 +1,20 @@
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from typing import NamedTuple
+from uuid import uuid4
+import os
+import threading
+import time
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from backend.db import database
 from backend.db.models import User
+from backend.utils.passwords import BCRYPT_ROUNDS, password_context
 
 
 # Settings
@@ -14,7 +22,12 @@ SECRET_KEY = "your-secret-key"  # Replace with env variable in production
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Authenticated users are cached per token for this long, so most requests skip the users query
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", "10000"))
+
+# Blocking; request handlers use backend.utils.passwords.password_hasher instead
+pwd_context = password_context(BCRYPT_ROUNDS)
 
 security = HTTPBearer()
 
@@ -28,24 +41,154 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode.update({"exp": expire})
+    to_encode.setdefault("jti", uuid4().hex)  # token id; keys the principal cache
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(database.get_db)
-):
+class Principal(NamedTuple):
+    """The authenticated user as routes see it: the User columns they read, detached from any session."""
+    id: int
+    email: str
+    role: str
+    is_verified: bool
+
+
+class PrincipalCache:
+    """
+    LRU of principals keyed by (user id, token id), each kept for at most
+    ttl seconds. A committed change to a user evicts its entries; lookups
+    that started before the change cannot put the old row back.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (user_id, jti) -> (principal, expires_at)
+        self._keys_by_user = {}
+        self._generations = {}  # user_id -> times invalidated
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def generation(self, user_id: int) -> int:
+        """Take before loading the user; pass to put()."""
+        with self._lock:
+            return self._generations.get(user_id, 0)
+
+    def put(self, key: tuple, principal: Principal, generation: int):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if self._generations.get(key[0], 0) != generation:
+                return  # the user changed while it was being loaded
+            self._entries[key] = (principal, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            self._keys_by_user.setdefault(key[0], set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            for key in self._keys_by_user.pop(user_id, ()):
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def _remove(self, key: tuple):
+        del self._entries[key]
+        keys = self._keys_by_user[key[0]]
+        keys.discard(key)
+        if not keys:
+            del self._keys_by_user[key[0]]
+
+
+principal_cache = PrincipalCache(PRINCIPAL_CACHE_TTL_SECONDS, PRINCIPAL_CACHE_MAX_ENTRIES)
+
+
+# Users changed through the ORM are evicted once the change commits. Bulk UPDATEs
+# bypass these events; call principal_cache.invalidate(user_id) after them.
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session, flush_context):
+    changed = {
+        obj.id for obj in list(session.dirty) + list(session.deleted)
+        if isinstance(obj, User) and (obj in session.deleted or session.is_modified(obj))
+    }
+    if changed:
+        session.info.setdefault("changed_user_ids", set()).update(changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session):
+    for user_id in session.info.pop("changed_user_ids", ()):
+        principal_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_changed_users(session, previous_transaction):
+    session.info.pop("changed_user_ids", None)
+
+
+def _decode_token(credentials: HTTPAuthorizationCredentials):
+    """(user id, claims) of a valid token."""
     token = credentials.credentials
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: int = int(payload.get("sub"))
         if user_id is None:
             raise HTTPException(status_code=401, detail="Invalid token payload")
-    except (JWTError, ValueError):
+    except (JWTError, ValueError, TypeError):
         raise HTTPException(status_code=401, detail="Invalid token")
+    return user_id, payload
+
 
-    user = db.query(User).filter(User.id == user_id).first()
+def _principal(user: User, claims: dict) -> Principal:
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
+    # Role and verification claims are trusted while the principal is cached,
+    # so a token issued before either changed is refused
+    verified = bool(user.is_verified)
+    if claims.get("role", user.role) != user.role or claims.get("verified", verified) != verified:
+        raise HTTPException(status_code=401, detail="Token is out of date; sign in again")
+    return Principal(user.id, user.email, user.role, verified)
 
-    return user
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(database.get_db)
+) -> Principal:
+    user_id, claims = _decode_token(credentials)
+    key = (user_id, claims.get("jti"))
+    principal = principal_cache.get(key)
+    if principal is None:
+        generation = principal_cache.generation(user_id)
+        principal = _principal(db.get(User, user_id), claims)
+        principal_cache.put(key, principal, generation)
+    return principal
+
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(database.get_async_db)
+) -> Principal:
+    """get_current_user for async routes; shares the route's async session."""
+    user_id, claims = _decode_token(credentials)
+    key = (user_id, claims.get("jti"))
+    principal = principal_cache.get(key)
+    if principal is None:
+        generation = principal_cache.generation(user_id)
+        principal = _principal(await db.get(User, user_id), claims)
+        principal_cache.put(key, principal, generation)
+    return principal
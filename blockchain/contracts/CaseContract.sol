@@ -1,13 +1,21 @@
 // SPDX-License-Identifier: UNLICENSED
 pragma solidity ^0.8.20;
 
+interface IOwned {
+    function owner() external view returns (address);
+}
+
+// Deployed once as an implementation; every case is an EIP-1167 clone of it
+// (see CaseFactory) and is set up through initialize() instead of a constructor.
 contract CaseContract {
+    bool private initialized;
     string public caseId;
     bytes32 public finalHash;
     bool public isClosed;
 
     bytes32 public lawyer;
     bytes32 public client;
+    address public factory;
 
     struct LogEntry {
         bytes32 logHash;
@@ -21,22 +29,45 @@ contract CaseContract {
         uint256 timestamp;
     }
 
+    // Merkle root committing to many log hashes at once
+    struct Batch {
+        bytes32 root;
+        uint256 size;
+        uint256 timestamp;
+    }
+
     LogEntry[] public logs;
     StatusChange[] public statusHistory;
+    Batch[] public batches;
 
     event LogAdded(bytes32 logHash, uint256 timestamp, uint256 version, uint256 parentLogIndex);
     event CaseClosed(string caseId, bytes32 finalHash, uint256 timestamp);
     event StatusUpdated(bytes32 statusHash, uint256 timestamp);
+    event BatchAnchored(uint256 batchIndex, bytes32 root, uint256 size, uint256 timestamp);
 
     modifier notClosed() {
         require(!isClosed, "Case is closed");
         _;
     }
 
-    constructor(string memory _caseId, bytes32 _lawyer, bytes32 _client) {
+    // The backend signer: the account that owns the factory which created this case
+    modifier onlyFactoryOwner() {
+        require(msg.sender == IOwned(factory).owner(), "Not owner");
+        _;
+    }
+
+    constructor() {
+        // Lock the implementation itself; clones start with empty storage
+        initialized = true;
+    }
+
+    function initialize(string calldata _caseId, bytes32 _lawyer, bytes32 _client) external {
+        require(!initialized, "Already initialized");
+        initialized = true;
         caseId = _caseId;
         lawyer = _lawyer;
         client = _client;
+        factory = msg.sender;
     }
 
     // Add a new log (version 1)
@@ -53,6 +84,13 @@ contract CaseContract {
         emit LogAdded(newLogHash, block.timestamp, newVersion, parentIndex);
     }
 
+    // Anchor a batch of log hashes with a single Merkle root
+    function anchorBatch(bytes32 root, uint256 size) external notClosed onlyFactoryOwner {
+        require(size > 0, "Empty batch");
+        batches.push(Batch(root, size, block.timestamp));
+        emit BatchAnchored(batches.length - 1, root, size, block.timestamp);
+    }
+
     function finalizeCase(bytes32 hash) external notClosed {
         finalHash = hash;
         isClosed = true;
@@ -73,6 +111,21 @@ contract CaseContract {
         return logs.length;
     }
 
+    // Read logs[start:end] in a single call (end is clamped to the log count)
+    function getLogs(uint256 start, uint256 end) external view returns (LogEntry[] memory) {
+        if (end > logs.length) {
+            end = logs.length;
+        }
+        if (start >= end) {
+            return new LogEntry[](0);
+        }
+        LogEntry[] memory page = new LogEntry[](end - start);
+        for (uint256 i = start; i < end; i++) {
+            page[i - start] = logs[i];
+        }
+        return page;
+    }
+
     function getStatus(uint256 index) external view returns (bytes32, uint256) {
         StatusChange memory s = statusHistory[index];
         return (s.statusHash, s.timestamp);
@@ -81,5 +134,26 @@ contract CaseContract {
     function getStatusCount() external view returns (uint256) {
         return statusHistory.length;
     }
+
+    function getBatch(uint256 index) external view returns (bytes32, uint256, uint256) {
+        Batch memory b = batches[index];
+        return (b.root, b.size, b.timestamp);
+    }
+
+    function getBatchCount() external view returns (uint256) {
+        return batches.length;
+    }
+
+    // Check that logHash is a leaf of a batch (sorted-pair keccak256 tree)
+    function verifyInclusion(uint256 batchIndex, bytes32 logHash, bytes32[] calldata proof) external view returns (bool) {
+        bytes32 computed = logHash;
+        for (uint256 i = 0; i < proof.length; i++) {
+            bytes32 sibling = proof[i];
+            computed = computed < sibling
+                ? keccak256(abi.encodePacked(computed, sibling))
+                : keccak256(abi.encodePacked(sibling, computed));
+        }
+        return computed == batches[batchIndex].root;
+    }
 }
 
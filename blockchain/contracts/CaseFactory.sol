@@ -5,8 +5,11 @@ import "./CaseContract.sol";
 
 contract CaseFactory {
     address public owner;
+    address public immutable implementation;
     mapping(string => address) public caseContracts;
 
+    event CaseCreated(string caseId, address caseAddress);
+
     modifier onlyOwner() {
         require(msg.sender == owner, "Not owner");
         _;
@@ -14,17 +17,30 @@ contract CaseFactory {
 
     constructor() {
         owner = msg.sender;
+        implementation = address(new CaseContract());
     }
 
     function createCase(string calldata caseId, bytes32 lawyer, bytes32 client) external onlyOwner returns (address) {
         require(caseContracts[caseId] == address(0), "Case already exists");
-        CaseContract newCase = new CaseContract(caseId, lawyer, client);
-        caseContracts[caseId] = address(newCase);
-        return address(newCase);
+        address newCase = _clone(implementation);
+        CaseContract(newCase).initialize(caseId, lawyer, client);
+        caseContracts[caseId] = newCase;
+        emit CaseCreated(caseId, newCase);
+        return newCase;
     }
 
     function getCaseAddress(string calldata caseId) external view returns (address) {
         return caseContracts[caseId];
     }
+
+    // EIP-1167 minimal proxy: 55 bytes of runtime code that delegatecalls everything to impl
+    function _clone(address impl) internal returns (address instance) {
+        assembly {
+            mstore(0x00, or(shr(0xe8, shl(0x60, impl)), 0x3d602d80600a3d3981f3363d3d373d3d3d363d73000000))
+            mstore(0x20, or(shl(0x78, impl), 0x5af43d82803e903d91602b57fd5bf3))
+            instance := create(0, 0x09, 0x37)
+        }
+        require(instance != address(0), "Clone failed");
+    }
 }
 
@@ -1,4 +1,4 @@
-require("@nomicfoundation/hardhat-ethers");
+require("@nomicfoundation/hardhat-toolbox"); // ethers, chai matchers for the tests
 require("dotenv").config();
 
 module.exports = {
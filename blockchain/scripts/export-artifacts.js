@@ -0,0 +1,16 @@
+// Copy the compiled contracts into backend/artifacts, which the backend loads
+// its ABIs from. Run through `npm run compile` so the two never drift apart.
+const fs = require("fs");
+const path = require("path");
+
+const CONTRACTS = ["CaseContract", "CaseFactory"];
+const BACKEND_ARTIFACTS = path.join(__dirname, "..", "..", "backend", "artifacts");
+
+for (const name of CONTRACTS) {
+  const source = path.join(__dirname, "..", "artifacts", "contracts", `${name}.sol`, `${name}.json`);
+  if (!fs.existsSync(source)) {
+    throw new Error(`${source} not found; run npx hardhat compile first`);
+  }
+  fs.copyFileSync(source, path.join(BACKEND_ARTIFACTS, `${name}.json`));
+  console.log(`Exported ${name} to backend/artifacts`);
+}
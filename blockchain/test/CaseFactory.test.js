@@ -0,0 +1,112 @@
+const { expect } = require("chai");
+const { ethers } = require("hardhat");
+const { anyValue } = require("@nomicfoundation/hardhat-chai-matchers/withArgs");
+
+const LAWYER = ethers.id("lawyer@example.com");
+const CLIENT = ethers.id("client@example.com");
+
+// Runtime code of an EIP-1167 minimal proxy pointing at impl
+function cloneCode(impl) {
+  return `0x363d3d373d3d3d363d73${impl.slice(2).toLowerCase()}5af43d82803e903d91602b57fd5bf3`;
+}
+
+describe("CaseFactory", function () {
+  let factory, other;
+
+  beforeEach(async function () {
+    [, other] = await ethers.getSigners();
+    factory = await ethers.deployContract("CaseFactory");
+  });
+
+  async function createCase(caseId) {
+    const address = await factory.createCase.staticCall(caseId, LAWYER, CLIENT);
+    await (await factory.createCase(caseId, LAWYER, CLIENT)).wait();
+    return ethers.getContractAt("CaseContract", address);
+  }
+
+  describe("createCase", function () {
+    it("deploys each case as a clone of the implementation", async function () {
+      const implementation = await factory.implementation();
+      const caseContract = await createCase("C-1-2-01");
+
+      expect(await ethers.provider.getCode(caseContract.target)).to.equal(cloneCode(implementation));
+      expect(await factory.getCaseAddress("C-1-2-01")).to.equal(caseContract.target);
+      expect(await caseContract.caseId()).to.equal("C-1-2-01");
+      expect(await caseContract.lawyer()).to.equal(LAWYER);
+      expect(await caseContract.client()).to.equal(CLIENT);
+      expect(await caseContract.factory()).to.equal(factory.target);
+    });
+
+    it("gives every clone its own storage", async function () {
+      const first = await createCase("C-1-2-01");
+      const second = await createCase("C-1-2-02");
+      expect(first.target).to.not.equal(second.target);
+
+      await first.addLog(ethers.id("log 1"));
+      expect(await first.getLogCount()).to.equal(1n);
+      expect(await second.getLogCount()).to.equal(0n);
+      expect(await second.caseId()).to.equal("C-1-2-02");
+    });
+
+    it("emits CaseCreated with the clone address", async function () {
+      const address = await factory.createCase.staticCall("C-1-2-01", LAWYER, CLIENT);
+      await expect(factory.createCase("C-1-2-01", LAWYER, CLIENT))
+        .to.emit(factory, "CaseCreated")
+        .withArgs("C-1-2-01", address);
+      expect(await factory.caseContracts("C-1-2-01")).to.equal(address);
+    });
+
+    it("refuses a case ID that already exists", async function () {
+      await createCase("C-1-2-01");
+      await expect(factory.createCase("C-1-2-01", LAWYER, CLIENT)).to.be.revertedWith("Case already exists");
+    });
+
+    it("is restricted to the owner", async function () {
+      await expect(factory.connect(other).createCase("C-1-2-01", LAWYER, CLIENT)).to.be.revertedWith("Not owner");
+    });
+  });
+
+  describe("initialize", function () {
+    it("reverts on a second call", async function () {
+      const caseContract = await createCase("C-1-2-01");
+      await expect(caseContract.initialize("C-9-9-99", CLIENT, LAWYER)).to.be.revertedWith("Already initialized");
+      await expect(caseContract.connect(other).initialize("C-9-9-99", CLIENT, LAWYER)).to.be.revertedWith(
+        "Already initialized"
+      );
+      expect(await caseContract.caseId()).to.equal("C-1-2-01");
+      expect(await caseContract.factory()).to.equal(factory.target);
+    });
+
+    it("reverts on the locked implementation", async function () {
+      const implementation = await ethers.getContractAt("CaseContract", await factory.implementation());
+      await expect(implementation.initialize("C-1-2-01", LAWYER, CLIENT)).to.be.revertedWith("Already initialized");
+      expect(await implementation.caseId()).to.equal("");
+    });
+  });
+
+  describe("anchorBatch", function () {
+    const root = ethers.id("root");
+
+    it("anchors a batch sent by the factory owner", async function () {
+      const caseContract = await createCase("C-1-2-01");
+      await expect(caseContract.anchorBatch(root, 3))
+        .to.emit(caseContract, "BatchAnchored")
+        .withArgs(0n, root, 3n, anyValue);
+      expect(await caseContract.getBatchCount()).to.equal(1n);
+      const [batchRoot, size] = await caseContract.getBatch(0);
+      expect(batchRoot).to.equal(root);
+      expect(size).to.equal(3n);
+    });
+
+    it("is restricted to the factory owner", async function () {
+      const caseContract = await createCase("C-1-2-01");
+      await expect(caseContract.connect(other).anchorBatch(root, 3)).to.be.revertedWith("Not owner");
+      expect(await caseContract.getBatchCount()).to.equal(0n);
+    });
+
+    it("refuses an empty batch", async function () {
+      const caseContract = await createCase("C-1-2-01");
+      await expect(caseContract.anchorBatch(root, 0)).to.be.revertedWith("Empty batch");
+    });
+  });
+});
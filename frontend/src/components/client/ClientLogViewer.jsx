@@ -8,10 +8,13 @@ import LogItem from "../common/LogItem";
  */
 export default function ClientLogViewer({ caseId, token, embedded = false }) {
   const [logs, setLogs] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [showLogs, setShowLogs] = useState(embedded);
 
-  async function fetchLogs() {
-    const res = await fetch(`/api/case_logs/${caseId}`, {
+  // Logs come in pages; X-Next-Cursor points at the next one
+  async function fetchLogs(cursor = null) {
+    const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
+    const res = await fetch(`/api/case_logs/${caseId}${query}`, {
       headers: { Authorization: `Bearer ${token}` },
     });
     if (!res.ok) {
@@ -19,27 +22,37 @@ export default function ClientLogViewer({ caseId, token, embedded = false }) {
       return;
     }
     const data = await res.json();
-    setLogs(data);
+    setLogs((prev) => (cursor ? [...prev, ...data] : data));
+    setNextCursor(res.headers.get("X-Next-Cursor"));
     setShowLogs(true);
   }
 
+  const loadMore = nextCursor && (
+    <button className="btn btn-secondary mt-3" onClick={() => fetchLogs(nextCursor)}>
+      Load more
+    </button>
+  );
+
   useEffect(() => {
     if (embedded) fetchLogs();
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [embedded, caseId, token]);
 
   if (embedded) {
-    // Just render the list (no buttons)
+    // Just render the list (no toggle)
     return (
-      <ul className="space-y-3 pl-0">
-        {logs.length === 0 ? (
-          <li className="text-sm text-slate-600">No logs yet.</li>
-        ) : (
-          logs.map((log) => (
-            <LogItem key={log.id} log={log} token={token} readOnly />
-          ))
-        )}
-      </ul>
+      <>
+        <ul className="space-y-3 pl-0">
+          {logs.length === 0 ? (
+            <li className="text-sm text-slate-600">No logs yet.</li>
+          ) : (
+            logs.map((log) => (
+              <LogItem key={log.id} log={log} token={token} readOnly />
+            ))
+          )}
+        </ul>
+        {loadMore}
+      </>
     );
   }
 
@@ -48,7 +61,7 @@ export default function ClientLogViewer({ caseId, token, embedded = false }) {
     <div className="mt-2">
       <button
         className="btn btn-secondary"
-        onClick={showLogs ? () => setShowLogs(false) : fetchLogs}
+        onClick={showLogs ? () => setShowLogs(false) : () => fetchLogs()}
       >
         {showLogs ? "Hide Logs" : "View Logs"}
       </button>
@@ -64,6 +77,7 @@ export default function ClientLogViewer({ caseId, token, embedded = false }) {
           )}
         </ul>
       )}
+      {showLogs && loadMore}
     </div>
   );
 }
@@ -3,21 +3,27 @@ import { useEffect, useState } from "react";
 
 export default function CaseStatusHistory({ caseId, token }) {
   const [history, setHistory] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [show, setShow] = useState(false);
 
-  useEffect(() => {
-    if (!show) return;
-    async function fetchHistory() {
-      const res = await fetch(`/api/case_status_history/${caseId}`, {
-        headers: { Authorization: `Bearer ${token}` },
-      });
-      if (res.ok) {
-        setHistory(await res.json());
-      } else {
-        alert("Failed to fetch status history");
-      }
+  // Newest first, in pages; X-Next-Cursor points at the next one
+  async function fetchHistory(cursor = null) {
+    const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
+    const res = await fetch(`/api/case_status_history/${caseId}${query}`, {
+      headers: { Authorization: `Bearer ${token}` },
+    });
+    if (res.ok) {
+      const data = await res.json();
+      setHistory((prev) => (cursor ? [...prev, ...data] : data));
+      setNextCursor(res.headers.get("X-Next-Cursor"));
+    } else {
+      alert("Failed to fetch status history");
     }
-    fetchHistory();
+  }
+
+  useEffect(() => {
+    if (show) fetchHistory();
+    // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [show, caseId, token]);
 
   return (
@@ -50,6 +56,11 @@ export default function CaseStatusHistory({ caseId, token }) {
               ))
             )}
           </ul>
+          {nextCursor && (
+            <button className="btn btn-secondary mt-3" onClick={() => fetchHistory(nextCursor)}>
+              Load more
+            </button>
+          )}
         </div>
       )}
     </div>
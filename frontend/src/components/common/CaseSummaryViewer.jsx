@@ -41,6 +41,13 @@ export default function CaseSummaryViewer({ caseId, token }) {
               <span className="font-medium">Total Time Spent:</span>{" "}
               {summary.total_time_spent} min
             </div>
+            <div>
+              <span className="font-medium">Edits:</span> {summary.edit_count}
+            </div>
+            <div>
+              <span className="font-medium">Last Activity:</span>{" "}
+              {new Date(summary.last_activity_at).toLocaleString()}
+            </div>
             <div>
               <span className="font-medium">Lawyer Email:</span>{" "}
               {summary.lawyer_email}
@@ -101,17 +101,21 @@ function GrantAuditAccess({ caseId, token }) {
 export default function CaseItem({ caseData, token, onRefresh }) {
   const [showLogs, setShowLogs] = useState(false);
   const [logs, setLogs] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [showLogForm, setShowLogForm] = useState(false);
   const [showAudit, setShowAudit] = useState(false);
   const [showStatus, setShowStatus] = useState(false);
 
-  async function fetchLogs() {
-    const res = await fetch(`/api/case_logs/${caseData.id}`, {
+  // Logs come in pages; X-Next-Cursor points at the next one
+  async function fetchLogs(cursor = null) {
+    const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
+    const res = await fetch(`/api/case_logs/${caseData.id}${query}`, {
       headers: { Authorization: `Bearer ${token}` },
     });
     if (!res.ok) return alert("Failed to fetch logs");
     const data = await res.json();
-    setLogs(data);
+    setLogs((prev) => (cursor ? [...prev, ...data] : data));
+    setNextCursor(res.headers.get("X-Next-Cursor"));
     setShowLogs(true);
   }
 
@@ -145,7 +149,7 @@ export default function CaseItem({ caseData, token, onRefresh }) {
 
           <button
             className="btn btn-secondary"
-            onClick={showLogs ? () => setShowLogs(false) : fetchLogs}
+            onClick={showLogs ? () => setShowLogs(false) : () => fetchLogs()}
           >
             {showLogs ? "Hide Logs" : "View Logs"}
           </button>
@@ -196,11 +200,19 @@ export default function CaseItem({ caseData, token, onRefresh }) {
                     key={log.id}
                     log={log}
                     token={token}
-                    onLogUpdated={fetchLogs}
+                    onLogUpdated={() => fetchLogs()}
                   />
                 ))
               )}
             </ul>
+            {nextCursor && (
+              <button
+                className="btn btn-secondary mt-3"
+                onClick={() => fetchLogs(nextCursor)}
+              >
+                Load more
+              </button>
+            )}
           </div>
         )}
 
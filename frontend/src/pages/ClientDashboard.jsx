@@ -9,17 +9,22 @@ import StatusBadge from "../components/lawyer/StatusBadge";
 
 export default function ClientDashboard() {
   const [cases, setCases] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const token = localStorage.getItem("token");
 
-  async function fetchCases() {
-    const res = await fetch("/api/my_cases", {
+  // Cases come in pages; X-Next-Cursor points at the next one
+  async function fetchCases(cursor = null) {
+    const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
+    const res = await fetch(`/api/my_cases${query}`, {
       headers: { Authorization: `Bearer ${token}` },
     });
     if (!res.ok) {
       alert("Failed to fetch cases");
       return;
     }
-    setCases(await res.json());
+    const data = await res.json();
+    setCases((prev) => (cursor ? [...prev, ...data] : data));
+    setNextCursor(res.headers.get("X-Next-Cursor"));
   }
 
   useEffect(() => {
@@ -65,7 +70,7 @@ export default function ClientDashboard() {
 
                   <div className="mt-4">
                     {/* ContractReview handles fetching + signing */}
-                    <ContractReview caseId={c.id} token={token} onSigned={fetchCases} />
+                    <ContractReview caseId={c.id} token={token} onSigned={() => fetchCases()} />
                   </div>
                 </div>
               </div>
@@ -87,6 +92,12 @@ export default function ClientDashboard() {
             ))}
           </div>
         )}
+
+        {nextCursor && (
+          <button className="btn btn-secondary mt-6" onClick={() => fetchCases(nextCursor)}>
+            Load more
+          </button>
+        )}
       </section>
     </div>
   );
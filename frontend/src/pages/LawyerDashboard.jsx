@@ -4,6 +4,7 @@ import CaseItem from "../components/lawyer/CaseItem";
 
 export default function LawyerDashboard() {
   const [cases, setCases] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [showCreate, setShowCreate] = useState(false);
 
   const [title, setTitle] = useState("");
@@ -16,13 +17,16 @@ export default function LawyerDashboard() {
 
   const token = localStorage.getItem("token");
 
-  async function fetchCases() {
-    const res = await fetch("/api/my_cases", {
+  // Cases come in pages; X-Next-Cursor points at the next one
+  async function fetchCases(cursor = null) {
+    const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
+    const res = await fetch(`/api/my_cases${query}`, {
       headers: { Authorization: `Bearer ${token}` },
     });
     if (!res.ok) return;
     const data = await res.json();
-    setCases(data);
+    setCases((prev) => (cursor ? [...prev, ...data] : data));
+    setNextCursor(res.headers.get("X-Next-Cursor"));
   }
 
   useEffect(() => {
@@ -125,10 +129,15 @@ export default function LawyerDashboard() {
       ) : (
         <div className="grid gap-6 sm:grid-cols-2 xl:grid-cols-3">
           {cases.map((c) => (
-            <CaseItem key={c.id} caseData={c} token={token} onRefresh={fetchCases} />
+            <CaseItem key={c.id} caseData={c} token={token} onRefresh={() => fetchCases()} />
           ))}
         </div>
       )}
+      {nextCursor && (
+        <button className="btn btn-secondary mt-6" onClick={() => fetchCases(nextCursor)}>
+          Load more
+        </button>
+      )}
     </div>
   );
 }